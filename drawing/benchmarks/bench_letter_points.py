@@ -0,0 +1,70 @@
+"""
+Micro-benchmark of the glyph to board points conversion.
+
+Compares the element by element loop the brain used to run in
+process_letter_points with the array version in drawing.glyphs, for glyphs
+of a few sizes. Glyphs are timed both as python lists (freshly traced) and
+as arrays (loaded from the glyph atlas).
+
+Run with: python3 benchmarks/bench_letter_points.py
+"""
+
+import timeit
+
+import numpy as np
+
+from drawing.glyphs import glyph_board_points, join_strokes
+
+
+def legacy_letter_points(glyph):
+    """Run the old list based process_letter_points loop."""
+    xcoord = glyph['xlist']
+    ycoord = glyph['ylist']
+    board_x = []
+    board_y = []
+    board_bool = []
+    for i in range(0, len(xcoord)):
+        if not (0.0001 > xcoord[i] > -0.0001) \
+                or not (0.0001 > ycoord[i] > 0.0001):
+            board_x.append(xcoord[i])
+            board_y.append(ycoord[i])
+            board_bool.append(True)
+        elif i != len(xcoord):
+            board_x.append(xcoord[i+1])
+            board_y.append(ycoord[i+1])
+            board_bool.append(False)
+        else:
+            board_x.append(xcoord[i])
+            board_y.append(ycoord[i])
+            board_bool.append(False)
+    return board_x, board_y, board_bool
+
+
+def make_glyph(points, strokes=3, seed=0):
+    """Create a glyph of random strokes with about the given point count."""
+    rng = np.random.default_rng(seed)
+    x, y, onboard = join_strokes(
+        [rng.uniform(0.0, 0.07, (points // strokes, 2))
+         for _ in range(strokes)])
+    return {'xlist': x.tolist(), 'ylist': y.tolist(),
+            'onboard': onboard.tolist()}
+
+
+def main():
+    print(f'{"glyph":>6} {"points":>7} {"legacy us":>10} {"array us":>9} '
+          f'{"speedup":>8}')
+    for points in (30, 100, 300, 1000, 3000):
+        lists = make_glyph(points)
+        arrays = {key: np.asarray(value) for key, value in lists.items()}
+        number = max(10, 30000 // points)
+        for name, glyph in (('lists', lists), ('atlas', arrays)):
+            legacy = timeit.timeit(
+                lambda: legacy_letter_points(glyph), number=number) / number
+            array = timeit.timeit(
+                lambda: glyph_board_points(glyph), number=number) / number
+            print(f'{name:>6} {points:>7} {legacy * 1e6:>10.1f} '
+                  f'{array * 1e6:>9.1f} {legacy / array:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
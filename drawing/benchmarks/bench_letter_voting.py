@@ -0,0 +1,146 @@
+"""
+Benchmark of the time to confirm a letter from OCR readings.
+
+Replays streams of OCR letter readings through the old rule, which sums
+confidences until one letter passes 1.6 and never forgets, and through the
+LetterVoter, and reports the time from the first reading of each letter to
+its confirmation and the number of wrong letters confirmed.
+
+Streams are read from files of recorded readings, one "time letter
+confidence" line per reading and a "letter" line each time the letter on
+the board changes. Without files, synthetic streams are generated: a letter
+is shown for a while, read every period with some misreads and dropouts,
+then replaced by the next one.
+
+Run with: python3 benchmarks/bench_letter_voting.py [STREAM ...]
+"""
+
+import random
+import string
+import sys
+
+import numpy as np
+
+from drawing.letter_voting import LetterVoter
+
+
+PERIOD = 0.5
+
+
+class OldRule:
+    """The confidence sum used by the OCR node before the LetterVoter."""
+
+    def __init__(self):
+        self.sums = dict.fromkeys(string.ascii_uppercase, 0.0)
+
+    def add(self, letter, confidence, stamp):
+        self.sums[letter] += confidence
+        if self.sums[letter] > 1.6:
+            self.sums = dict.fromkeys(string.ascii_uppercase, 0.0)
+            return letter
+        return None
+
+
+def synthetic_stream(rng, letters=200, shown=8.0, misread_rate=0.1,
+                     dropout_rate=0.3):
+    """Generate (time, letter, confidence) readings and the true letters."""
+    events = []
+    stamp = 0.0
+    for _ in range(letters):
+        truth = rng.choice(string.ascii_uppercase)
+        events.append(('show', stamp, truth))
+        end = stamp + shown
+        while stamp < end:
+            if rng.random() >= dropout_rate:
+                if rng.random() < misread_rate:
+                    read = rng.choice(string.ascii_uppercase)
+                    events.append(
+                        ('read', stamp, read, rng.uniform(0.5, 0.8)))
+                else:
+                    events.append(
+                        ('read', stamp, truth, rng.uniform(0.6, 1.0)))
+            stamp += PERIOD
+        # the board is blank while it is wiped
+        stamp += 2.0
+    return events
+
+
+def recorded_stream(path):
+    """Read a stream of recorded readings."""
+    events = []
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) == 1:
+                # the letter changes at the next reading
+                events.append(('show', None, fields[0].upper()))
+            elif len(fields) == 3:
+                stamp = float(fields[0])
+                if events and events[-1][1] is None:
+                    events[-1] = ('show', stamp, events[-1][2])
+                events.append(('read', stamp, fields[1].upper(),
+                               float(fields[2])))
+    return events
+
+
+def replay(events, make_voter):
+    """Return the confirmation times and the number of wrong confirmations."""
+    voter = make_voter()
+    times = []
+    wrong = 0
+    missed = 0
+    truth = None
+    first = None
+    confirmed = True
+    for event in events:
+        if event[0] == 'show':
+            missed += not confirmed
+            _, _, truth = event
+            first = None
+            confirmed = False
+            continue
+        _, stamp, letter, confidence = event
+        if first is None and letter == truth:
+            first = stamp
+        found = voter.add(letter, confidence, stamp)
+        if found is None:
+            continue
+        if found != truth:
+            wrong += 1
+        elif not confirmed:
+            # no matching read has been timed yet, nothing to measure from
+            if first is not None:
+                times.append(stamp - first)
+            confirmed = True
+    missed += not confirmed
+    return np.array(times), wrong, missed
+
+
+def main():
+    if len(sys.argv) > 1:
+        streams = [(path, recorded_stream(path)) for path in sys.argv[1:]]
+    else:
+        rng = random.Random(0)
+        streams = [(f'synthetic misread {rate}',
+                    synthetic_stream(rng, misread_rate=rate))
+                   for rate in (0.05, 0.1, 0.2)]
+    rules = {
+        'sum > 1.6': OldRule,
+        'voter 1.0 s': lambda: LetterVoter.from_targets(PERIOD, 1.0),
+        'voter 2.0 s': lambda: LetterVoter.from_targets(PERIOD, 2.0),
+        'voter far 0.001': lambda: LetterVoter.from_targets(
+            PERIOD, 1.0, false_accept_rate=0.001),
+    }
+    print(f'{"stream":<24} {"rule":<16} {"mean s":>7} {"p95 s":>7} '
+          f'{"wrong":>6} {"missed":>7}')
+    for name, events in streams:
+        for rule, make_voter in rules.items():
+            times, wrong, missed = replay(events, make_voter)
+            mean = times.mean() if len(times) else float('nan')
+            p95 = np.percentile(times, 95) if len(times) else float('nan')
+            print(f'{name:<24} {rule:<16} {mean:>7.2f} {p95:>7.2f} '
+                  f'{wrong:>6} {missed:>7}')
+
+
+if __name__ == '__main__':
+    main()
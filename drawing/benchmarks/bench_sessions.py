@@ -0,0 +1,58 @@
+"""
+Benchmark of many simultaneous hangman sessions.
+
+Interleaves random guesses over thousands of games held by one
+SessionManager, the way one hangman node would serve many boards, and
+reports guesses per second, lookup time and memory per session.
+
+Run with: python3 benchmarks/bench_sessions.py [SESSIONS ...]
+"""
+
+import random
+import string
+import sys
+import time
+import timeit
+import tracemalloc
+
+from drawing.hangman_sessions import SessionManager
+
+
+WORDS = ['BABIES', 'LOVELY', 'GARDEN', 'PENCIL', 'ROCKET', 'SILVER']
+
+
+def run(count, guesses_per_session=20, seed=0):
+    rng = random.Random(seed)
+    tracemalloc.start()
+    sessions = SessionManager(lambda: rng.choice(WORDS),
+                              max_sessions=count, finished_limit=count)
+    for game_id in range(count):
+        sessions.get(game_id)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    plays = [(rng.randrange(count), rng.choice(string.ascii_uppercase))
+             for _ in range(count * guesses_per_session)]
+    start = time.perf_counter()
+    for game_id, guess in plays:
+        sessions.play(game_id, guess)
+    elapsed = time.perf_counter() - start
+
+    number = 100000
+    lookup = timeit.timeit(lambda: sessions.get(count // 2),
+                           number=number) / number
+    finished = len(sessions.finished)
+    print(f'{count:>9} {len(plays) / elapsed:>12.0f} {lookup * 1e9:>10.0f} '
+          f'{memory / count:>10.0f} {finished:>9}')
+
+
+def main():
+    counts = [int(c) for c in sys.argv[1:]] or [1000, 10000, 100000]
+    print(f'{"sessions":>9} {"guesses/s":>12} {"lookup ns":>10} '
+          f'{"bytes/ses":>10} {"finished":>9}')
+    for count in counts:
+        run(count)
+
+
+if __name__ == '__main__':
+    main()
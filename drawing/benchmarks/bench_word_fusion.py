@@ -0,0 +1,140 @@
+"""
+Benchmark of the time to confirm a word guess from OCR reads.
+
+Replays streams of OCR word reads through the old rule, which waits for
+three identical reads in a row, and through the WordFusion with and
+without snapping to the dictionary, and reports the time from the first
+read of each word to its confirmation and the wrong and missed words.
+
+Streams are read from files of recorded reads, one "time word confidence"
+line per read and a "word" line each time the word on the board changes.
+Without files, synthetic streams are generated from the packaged word list:
+each word is read every period, and each letter of a read is misread with
+some chance.
+
+Run with: python3 benchmarks/bench_word_fusion.py [STREAM ...]
+"""
+
+import os
+import random
+import string
+import sys
+
+import numpy as np
+
+from drawing.word_fusion import WordFusion
+from drawing.words import WordIndex
+
+
+PERIOD = 2.0
+DATA = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+
+class OldRule:
+    """The three identical reads used by the OCR node before WordFusion."""
+
+    def __init__(self):
+        self.reads = []
+
+    def add(self, word, confidence):
+        if confidence <= 0.75:
+            return None
+        self.reads = (self.reads + [word])[-3:]
+        if len(self.reads) == 3 and len(set(self.reads)) == 1:
+            self.reads = []
+            return word
+        return None
+
+
+def synthetic_stream(rng, words, count=200, shown=30.0, misread_rate=0.05):
+    """Generate word changes and (time, word, confidence) reads."""
+    events = []
+    stamp = 0.0
+    for _ in range(count):
+        truth = words.random_word(6, rng)
+        events.append(('show', stamp, truth))
+        end = stamp + shown
+        while stamp < end:
+            read = [rng.choice(string.ascii_uppercase)
+                    if rng.random() < misread_rate else letter
+                    for letter in truth]
+            wrong = sum(a != b for a, b in zip(read, truth))
+            confidence = max(0.3, rng.uniform(0.85, 0.99) - 0.1 * wrong)
+            events.append(('read', stamp, ''.join(read), confidence))
+            stamp += PERIOD
+        stamp += 2 * PERIOD
+    return events
+
+
+def recorded_stream(path):
+    """Read a stream of recorded reads."""
+    events = []
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) == 1:
+                events.append(('show', None, fields[0].upper()))
+            elif len(fields) == 3:
+                events.append(('read', float(fields[0]), fields[1].upper(),
+                               float(fields[2])))
+    return events
+
+
+def replay(events, make_rule):
+    """Return the confirmation times and the wrong and missed words."""
+    rule = make_rule()
+    times = []
+    wrong = 0
+    missed = 0
+    truth = None
+    confirmed = True
+    first = None
+    for event in events:
+        if event[0] == 'show':
+            missed += not confirmed
+            truth = event[2]
+            first = None
+            confirmed = False
+            continue
+        _, stamp, word, confidence = event
+        if first is None:
+            first = stamp
+        found = rule.add(word, confidence)
+        if found is None:
+            continue
+        if found != truth:
+            wrong += 1
+        elif not confirmed:
+            times.append(stamp - first)
+            confirmed = True
+    missed += not confirmed
+    return np.array(times), wrong, missed
+
+
+def main():
+    words = WordIndex(DATA)
+    if len(sys.argv) > 1:
+        streams = [(path, recorded_stream(path)) for path in sys.argv[1:]]
+    else:
+        rng = random.Random(0)
+        streams = [(f'synthetic misread {rate}',
+                    synthetic_stream(rng, words, misread_rate=rate))
+                   for rate in (0.02, 0.05, 0.1)]
+    rules = {
+        '3 identical': OldRule,
+        'fusion': WordFusion,
+        'fusion + snap': lambda: WordFusion(words=words),
+    }
+    print(f'{"stream":<24} {"rule":<14} {"mean s":>7} {"p95 s":>7} '
+          f'{"wrong":>6} {"missed":>7}')
+    for name, events in streams:
+        for rule, make_rule in rules.items():
+            times, wrong, missed = replay(events, make_rule)
+            mean = times.mean() if len(times) else float('nan')
+            p95 = np.percentile(times, 95) if len(times) else float('nan')
+            print(f'{name:<24} {rule:<14} {mean:>7.2f} {p95:>7.2f} '
+                  f'{wrong:>6} {missed:>7}')
+
+
+if __name__ == '__main__':
+    main()
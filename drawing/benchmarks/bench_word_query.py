@@ -0,0 +1,77 @@
+"""
+Benchmark of dictionary pattern queries.
+
+Compares the bitset index in drawing.words with filtering a plain list of
+words in python, for queries like "B_B_E_ without X, Q or Z". The packaged
+dictionary is small, so a larger random dictionary is generated as well.
+
+Run with: python3 benchmarks/bench_word_query.py [WORD_LIST]
+"""
+
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+
+from drawing.words import build_word_index, WordIndex
+
+
+QUERIES = [('B_B_E_', 'XQZ'), ('______', 'AEIO'), ('S___E_', ''),
+           ('_A_A__', 'TRS')]
+
+
+def naive_query(words, pattern, excluded):
+    """Filter a list of words one by one."""
+    found = []
+    for word in words:
+        if len(word) != len(pattern):
+            continue
+        if any(letter in word for letter in excluded):
+            continue
+        if all(p == '_' or p == w for p, w in zip(pattern, word)):
+            found.append(word)
+    return found
+
+
+def random_words(count, seed=0):
+    """Create random six letter words."""
+    rng = np.random.default_rng(seed)
+    letters = rng.integers(65, 91, (count, 6), dtype=np.uint8)
+    return [row.tobytes().decode('ascii') for row in letters]
+
+
+def run(name, words):
+    with tempfile.TemporaryDirectory() as directory:
+        build_word_index(words, directory)
+        index = WordIndex(directory)
+        words = [index.word(6, i) for i in range(index.count(6))]
+        for pattern, excluded in QUERIES:
+            # build the masks and columns before timing
+            index.match(pattern, excluded)
+            assert index.query(pattern, excluded) == \
+                naive_query(words, pattern, excluded)
+            number = 20
+            naive = timeit.timeit(
+                lambda: naive_query(words, pattern, excluded),
+                number=number) / number
+            bitset = timeit.timeit(
+                lambda: index.match(pattern, excluded),
+                number=number) / number
+            print(f'{name:>8} {len(words):>7} {pattern:>7} {excluded:>5} '
+                  f'{naive * 1e3:>9.3f} {bitset * 1e3:>10.3f} '
+                  f'{naive / bitset:>7.1f}x')
+
+
+def main():
+    print(f'{"words":>8} {"count":>7} {"pattern":>7} {"excl":>5} '
+          f'{"naive ms":>9} {"bitset ms":>10} {"speedup":>8}')
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            run('file', f.read().split())
+    run('random', random_words(10000))
+    run('random', random_words(100000))
+
+
+if __name__ == '__main__':
+    main()
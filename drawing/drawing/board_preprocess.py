@@ -0,0 +1,243 @@
+"""
+Preprocessing of camera frames for OCR.
+
+Finds the whiteboard in a camera frame, warps it to a front on view and
+binarizes it into the two crops read by the OCR node. Kept free of ROS so
+the ImageModification node and the offline OCR benchmark run exactly the
+same steps.
+
+Each step can be timed by passing a dictionary of timings, which gets the
+seconds spent in each stage added to it.
+"""
+
+import time
+
+import cv2
+import imutils
+from imutils.perspective import four_point_transform
+import numpy as np
+
+
+STAGES = ('resize', 'blur', 'canny', 'contours', 'warp', 'threshold')
+
+
+class PreprocessParams:
+    """The tunable values of the preprocessing."""
+
+    __slots__ = ('canny_min', 'canny_max', 'kernel', 'kernel_cropped',
+                 'dilate_kernel')
+
+    def __init__(self, canny_min=50, canny_max=150, kernel=5,
+                 kernel_cropped=5, dilate_kernel=2):
+        """
+        Set the values, the defaults are those of the trackbars.
+
+        Args
+        ----
+            canny_min (int): the lower Canny hysteresis threshold
+            canny_max (int): the upper Canny hysteresis threshold
+            kernel (int): the odd size of the blur before edge detection
+            kernel_cropped (int): the odd size of the blur of the board
+            dilate_kernel (int): the size of the dilation of the letter crop
+
+        """
+        self.canny_min = canny_min
+        self.canny_max = canny_max
+        self.kernel = kernel
+        self.kernel_cropped = kernel_cropped
+        self.dilate_kernel = dilate_kernel
+
+
+class Timer:
+    """Adds the time since the last mark to a stage of the timings."""
+
+    def __init__(self, timings):
+        self.timings = timings
+        self.last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        if self.timings is not None:
+            self.timings[stage] = self.timings.get(stage, 0.0) \
+                + now - self.last
+        self.last = now
+
+
+def find_board(frame, params, timings=None):
+    """
+    Find the whiteboard in a camera frame.
+
+    Args
+    ----
+        frame (np.array): the BGR camera frame
+        params (PreprocessParams): the tunable values
+        timings (dict): where the seconds of each stage are added, or None
+
+    Returns
+    -------
+        resized (np.array): the frame resized to a height of 500
+        gray (np.array): the resized frame in grayscale
+        board (np.array): the (4, 1, 2) corners of the board in the resized
+            frame, or None if no board was found
+
+    """
+    timer = Timer(timings)
+    # resize the image and convert it to grayscale
+    resized = imutils.resize(frame, height=500)
+    gray = cv2.cvtColor(resized, cv2.COLOR_BGR2GRAY)
+    timer.mark('resize')
+    return resized, gray, board_contour(gray, params, timings)
+
+
+def board_contour(gray, params, timings=None):
+    """
+    Search the edges of a grayscale frame for the whiteboard.
+
+    Returns
+    -------
+        board (np.array): the (4, 1, 2) corners of the board, or None
+
+    """
+    timer = Timer(timings)
+    # blur image
+    blurred = cv2.GaussianBlur(gray, (params.kernel, params.kernel), 0)
+    timer.mark('blur')
+
+    # edge detection
+    edged = cv2.Canny(blurred, params.canny_min, params.canny_max)
+    timer.mark('canny')
+
+    # find contours in the edge map, then sort them by their
+    # size in descending order
+    cnts = cv2.findContours(edged, cv2.RETR_EXTERNAL,
+                            cv2.CHAIN_APPROX_SIMPLE)
+    cnts = imutils.grab_contours(cnts)
+    cnts = sorted(cnts, key=cv2.contourArea, reverse=True)
+    board = None
+
+    # loop over the contours
+    for c in cnts:
+        # approximate the contour
+        peri = cv2.arcLength(c, True)
+        approx = cv2.approxPolyDP(c, 0.01 * peri, True)
+        # if the contour has four vertices
+        # identify it as the whiteboard
+        if len(approx) == 4:
+            board = approx
+            break
+    timer.mark('contours')
+    return board
+
+
+def board_crops(gray, board, params, timings=None):
+    """
+    Warp the whiteboard to a front on view and binarize it.
+
+    Args
+    ----
+        gray (np.array): the grayscale frame
+        board (np.array): the four corners of the board in the frame
+        params (PreprocessParams): the tunable values
+        timings (dict): where the seconds of each stage are added, or None
+
+    Returns
+    -------
+        binary_image (np.array): the binarized board, dark ink on white
+        inverted_image (np.array): the binarized board with dilated strokes
+
+    """
+    timer = Timer(timings)
+    # apply 4 point transform on the contour in the grayscale image
+    warped = four_point_transform(gray, board.reshape(4, 2))
+
+    # crop the borders of the image to remove inconsistencies
+    height, width = warped.shape
+    border = int(0.05*min(height, width))
+    cropped = warped[border:height - border, border:width - border]
+    timer.mark('warp')
+    return binarize(cropped, params, timer)
+
+
+def homography_maps(to_frame, width, height, camera=None):
+    """
+    Compute the remap maps of a perspective warp.
+
+    With the camera calibration the lens distortion is undone in the same
+    maps, so a distorted frame is undistorted and warped in one remap.
+
+    Args
+    ----
+        to_frame (np.array): the 3x3 homography from a pixel of the warped
+            image to its pixel in the frame, or to its normalized image
+            coordinates when a camera is given
+        width (int): the width of the warped image
+        height (int): the height of the warped image
+        camera (tuple): the camera matrix and distortion coefficients, or
+            None if the frame is not distorted
+
+    Returns
+    -------
+        map1, map2: the fixed point maps for cv2.remap
+
+    """
+    xs, ys = np.meshgrid(np.arange(width, dtype=np.float64),
+                         np.arange(height, dtype=np.float64))
+    points = np.stack((xs, ys, np.ones_like(xs)), axis=-1) @ to_frame.T
+    points = points / points[..., 2:]
+    if camera is None:
+        pixels = points[..., :2]
+    else:
+        camera_matrix, distortion = camera
+        pixels, _ = cv2.projectPoints(
+            points.reshape(-1, 1, 3), np.zeros(3), np.zeros(3),
+            camera_matrix, distortion)
+        pixels = pixels.reshape(height, width, 2)
+    pixels = pixels.astype(np.float32)
+    return cv2.convertMaps(pixels[..., 0], pixels[..., 1], cv2.CV_16SC2)
+
+
+def binarize(cropped, params, timer):
+    """Binarize the warped board into the word and letter crops."""
+    # blur the cropped image
+    k_size_2 = params.kernel_cropped
+    cropped = cv2.GaussianBlur(cropped, (k_size_2, k_size_2), 0)
+
+    # inv binarise the blurred image
+    binarised = cv2.adaptiveThreshold(
+        cropped, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY_INV, 7, 2)
+
+    # dilate the image to widen letter strokes
+    d_k_size = params.dilate_kernel
+    kernel = np.ones((d_k_size, d_k_size), np.uint8)
+    dilation = cv2.dilate(binarised, kernel, iterations=1)
+
+    # invert the inv dilated image
+    inverted_image = cv2.bitwise_not(dilation)
+
+    # invert the inv binarised image
+    binary_image = cv2.bitwise_not(binarised)
+    timer.mark('threshold')
+    return binary_image, inverted_image
+
+
+def preprocess_frame(frame, params, timings=None):
+    """
+    Turn a camera frame into the two crops read by OCR.
+
+    Args
+    ----
+        frame (np.array): the BGR camera frame
+        params (PreprocessParams): the tunable values
+        timings (dict): where the seconds of each stage are added, or None
+
+    Returns
+    -------
+        binary_image, inverted_image: the crops as from board_crops, or
+            None, None if no board was found
+
+    """
+    _, gray, board = find_board(frame, params, timings)
+    if board is None:
+        return None, None
+    return board_crops(gray, board, params, timings)
@@ -0,0 +1,228 @@
+"""
+Rectification of the whiteboard from its AprilTag pose.
+
+The Tags node puts a board frame on the AprilTags of the board, so with the
+pose of the board in the camera optical frame and the camera intrinsics the
+homography from the board plane to the image is known:
+
+    H = K [r1 r2 t]
+
+where r1 and r2 are the x and y axes of the board and t its origin in the
+camera frame. A rectangular region of the board, given in meters in the
+board frame, is warped with remap maps computed from this homography. The
+maps are only rebuilt when the camera matrix changes or the board has moved
+more than max_motion meters or turned more than max_rotation radians since
+they were built, so while the camera is still no contour search or
+homography estimate runs per frame.
+
+With the distortion coefficients of the camera the maps also undo the lens
+distortion, so the raw frame is undistorted and warped by a single remap
+at the resolution of the crop, without a separately rectified image.
+"""
+
+import cv2
+import numpy as np
+
+from drawing.board_preprocess import binarize, homography_maps, Timer
+
+
+def board_homography(camera_matrix, camera_board):
+    """
+    Return the homography from the board plane to the image.
+
+    Args
+    ----
+        camera_matrix (np.array): the 3x3 intrinsics K of the camera
+        camera_board (np.array): the 4x4 pose of the board in the camera
+            optical frame
+
+    Returns
+    -------
+        homography (np.array): maps (x, y, 1) on the board in meters to
+            pixels
+
+    """
+    homography = camera_matrix @ camera_board[:3, [0, 1, 3]]
+    return homography / homography[2, 2]
+
+
+def region_size(region, pixels_per_meter):
+    """Return the width and height in pixels of a rectified region."""
+    x0, y0, x1, y1 = region
+    return (max(int(round(abs(x1 - x0) * pixels_per_meter)), 1),
+            max(int(round(abs(y1 - y0) * pixels_per_meter)), 1))
+
+
+def region_to_board(region, pixels_per_meter):
+    """
+    Return the map from a pixel of the rectified region to the board.
+
+    The first pixel is the (x0, y0) corner of the region, columns go
+    towards x1 and rows towards y1, so the order of the corners sets the
+    orientation of the rectified image.
+    """
+    x0, y0, x1, y1 = region
+    width, height = region_size(region, pixels_per_meter)
+    return np.array([[(x1 - x0) / width, 0, x0],
+                     [0, (y1 - y0) / height, y0],
+                     [0, 0, 1]], dtype=np.float64)
+
+
+def pose_change(old, new):
+    """Return the meters and radians between two 4x4 poses."""
+    motion = np.linalg.norm(new[:3, 3] - old[:3, 3])
+    turn = new[:3, :3] @ old[:3, :3].T
+    angle = np.arccos(np.clip((np.trace(turn) - 1) / 2, -1.0, 1.0))
+    return motion, angle
+
+
+class BoardRectifier:
+    """Warps a region of the board with maps from its tag pose."""
+
+    def __init__(self, params, region=(0.0, 0.0, 0.8, 0.4),
+                 pixels_per_meter=600.0, max_motion=0.002,
+                 max_rotation=0.005):
+        """
+        Create a rectifier.
+
+        Args
+        ----
+            params (PreprocessParams): the binarization values
+            region (tuple): the (x0, y0, x1, y1) corners of the rectified
+                region in meters in the board frame
+            pixels_per_meter (float): the resolution of the rectified board
+            max_motion (float): the meters the board may move before the
+                maps are rebuilt
+            max_rotation (float): the radians the board may turn before the
+                maps are rebuilt
+
+        """
+        self.params = params
+        self.region = tuple(region)
+        self.pixels_per_meter = pixels_per_meter
+        self.max_motion = max_motion
+        self.max_rotation = max_rotation
+        self.camera_matrix = None
+        self.distortion = None
+        self.pose = None
+        self.map_pose = None
+        self.to_frame = None
+        self.maps = None
+        self.rebuilds = 0
+
+    @property
+    def ready(self):
+        """Return whether the maps have been built."""
+        return self.maps is not None
+
+    def set_camera(self, camera_matrix, distortion=None):
+        """
+        Set the camera calibration, rebuilding the maps if it changed.
+
+        Args
+        ----
+            camera_matrix (np.array): the 3x3 intrinsics K of the camera
+            distortion (np.array): the distortion coefficients of the raw
+                frames, or None if they are already rectified
+
+        Returns
+        -------
+            rebuilt (bool): whether the maps were rebuilt
+
+        """
+        camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        if distortion is not None:
+            distortion = np.asarray(distortion, dtype=np.float64)
+            if not distortion.any():
+                distortion = None
+        if self.camera_matrix is not None and \
+           np.array_equal(camera_matrix, self.camera_matrix) and \
+           (distortion is None) == (self.distortion is None) and (
+               distortion is None or
+               np.array_equal(distortion, self.distortion)):
+            return False
+        self.camera_matrix = camera_matrix
+        self.distortion = distortion
+        return self.build()
+
+    def set_pose(self, camera_board):
+        """
+        Set the pose of the board in the camera optical frame.
+
+        Returns
+        -------
+            rebuilt (bool): whether the maps were rebuilt
+
+        """
+        self.pose = np.asarray(camera_board, dtype=np.float64)
+        if self.map_pose is not None:
+            motion, angle = pose_change(self.map_pose, self.pose)
+            if motion <= self.max_motion and angle <= self.max_rotation:
+                return False
+        return self.build()
+
+    def frame_homography(self):
+        """Return the homography from a rectified pixel to the frame."""
+        return board_homography(self.camera_matrix, self.pose) \
+            @ region_to_board(self.region, self.pixels_per_meter)
+
+    def build(self):
+        """Build the maps, if both the camera and the pose are known."""
+        if self.camera_matrix is None or self.pose is None:
+            return False
+        # the whole region has to be in front of the camera
+        x0, y0, x1, y1 = self.region
+        corners = np.array([[x0, y0, 0, 1], [x1, y0, 0, 1],
+                            [x1, y1, 0, 1], [x0, y1, 0, 1]]).T
+        if (self.pose[2] @ corners <= 0).any():
+            raise ValueError("the board is behind the camera")
+        self.to_frame = self.frame_homography()
+        width, height = region_size(self.region, self.pixels_per_meter)
+        self.maps = self.region_maps(width, height)
+        self.map_pose = self.pose.copy()
+        self.rebuilds += 1
+        return True
+
+    def region_maps(self, width, height):
+        """Compute the remap maps of the rectified region."""
+        if self.distortion is None:
+            return homography_maps(self.to_frame, width, height)
+        to_normalized = np.linalg.inv(self.camera_matrix) @ self.to_frame
+        return homography_maps(to_normalized, width, height,
+                               (self.camera_matrix, self.distortion))
+
+    def corners(self):
+        """Return the (4, 1, 2) corners of the region in the frame."""
+        width, height = region_size(self.region, self.pixels_per_meter)
+        corners = np.array([[[0, 0]], [[width, 0]], [[width, height]],
+                            [[0, height]]], dtype=np.float64)
+        corners = cv2.perspectiveTransform(corners, self.to_frame)
+        if self.distortion is None:
+            return corners
+        # move the corners to where they are in the distorted frame
+        rays = cv2.undistortPoints(corners, self.camera_matrix, None)
+        rays = np.concatenate((rays, np.ones((4, 1, 1))), axis=-1)
+        corners, _ = cv2.projectPoints(rays, np.zeros(3), np.zeros(3),
+                                       self.camera_matrix, self.distortion)
+        return corners
+
+    def crops(self, frame, timings=None):
+        """
+        Rectify the board in a camera frame and binarize it.
+
+        Args
+        ----
+            frame (np.array): the BGR camera frame the camera matrix is for
+            timings (dict): where the seconds of each stage are added
+
+        Returns
+        -------
+            binary_image, inverted_image: as from board_crops
+
+        """
+        timer = Timer(timings)
+        warped = cv2.remap(frame, *self.maps, cv2.INTER_LINEAR)
+        if warped.ndim == 3:
+            warped = cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY)
+        timer.mark('warp')
+        return binarize(warped, self.params, timer)
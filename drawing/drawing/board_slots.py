@@ -0,0 +1,153 @@
+"""
+Crops of the slots of the board where guesses are written.
+
+The board is split into a letter slot and a word slot, given as fractions
+(x0, y0, x1, y1) of the warped board, so the same layout works for the
+outline and the AprilTag warp. In each slot the ink is found from the
+connected components of the binarized board, ignoring specks, and the crop
+is cut to the bounding box of the ink with a small margin. The shape of
+the ink then decides which recognition runs on it:
+
+    - no ink, or too little of it: neither path runs
+    - ink about as wide as high in the letter slot: the letter path
+    - ink much wider than high in the word slot: the word path
+
+A path that does not run gets EMPTY_CROP instead of a crop, so the OCR
+node skips it rather than recognizing its last crop again.
+"""
+
+import cv2
+import numpy as np
+
+
+# the 1x1 crop of a path that has nothing to recognize
+EMPTY_CROP = np.full((1, 1), 255, dtype=np.uint8)
+
+
+def is_empty(crop):
+    """Return whether a crop has nothing to recognize."""
+    return crop is None or crop.size <= 1
+
+
+def slot_bounds(shape, slot):
+    """Return the pixel (x0, y0, x1, y1) of a slot in an image."""
+    height, width = shape[:2]
+    x0, y0, x1, y1 = np.clip(slot, 0.0, 1.0)
+    return (int(x0 * width), int(y0 * height),
+            max(int(x1 * width), int(x0 * width) + 1),
+            max(int(y1 * height), int(y0 * height) + 1))
+
+
+def ink_box(binary, min_area=0.002, min_component=12):
+    """
+    Find the bounding box of the ink on a binarized image.
+
+    Args
+    ----
+        binary (np.array): the binarized image, dark ink on white
+        min_area (float): the fraction of the image the ink has to cover
+        min_component (int): the pixels of the smallest stroke, smaller
+            components are specks
+
+    Returns
+    -------
+        box (tuple): the (x, y, width, height) of the ink, or None if there
+            is too little ink
+
+    """
+    count, _, stats, _ = cv2.connectedComponentsWithStats(
+        cv2.bitwise_not(binary), connectivity=8)
+    # the first component is the background
+    strokes = stats[1:][stats[1:, cv2.CC_STAT_AREA] >= min_component]
+    if not len(strokes) or \
+       strokes[:, cv2.CC_STAT_AREA].sum() < min_area * binary.size:
+        return None
+    x0 = strokes[:, cv2.CC_STAT_LEFT].min()
+    y0 = strokes[:, cv2.CC_STAT_TOP].min()
+    x1 = (strokes[:, cv2.CC_STAT_LEFT] + strokes[:, cv2.CC_STAT_WIDTH]).max()
+    y1 = (strokes[:, cv2.CC_STAT_TOP] + strokes[:, cv2.CC_STAT_HEIGHT]).max()
+    return int(x0), int(y0), int(x1 - x0), int(y1 - y0)
+
+
+class SlotCropper:
+    """Cuts the letter and word crops out of the binarized board."""
+
+    def __init__(self, layout, min_area=0.002,
+                 min_component=12, letter_max_aspect=1.5,
+                 word_min_aspect=2.5, margin=0.15):
+        """
+        Create a cropper.
+
+        Args
+        ----
+            layout (tuple): the (x0, y0, x1, y1) fractions of the board of
+                the letter slot and of the word slot
+            min_area (float): the fraction of a slot the ink has to cover
+            min_component (int): the pixels of the smallest stroke
+            letter_max_aspect (float): the widest ink, relative to its
+                height, that is read as a letter
+            word_min_aspect (float): the narrowest ink, relative to its
+                height, that is read as a word
+            margin (float): the margin around the ink, relative to its
+                height
+
+        """
+        self.letter_slot, self.word_slot = layout
+        self.min_area = min_area
+        self.min_component = min_component
+        self.letter_max_aspect = letter_max_aspect
+        self.word_min_aspect = word_min_aspect
+        self.margin = margin
+        self.letters = 0
+        self.words = 0
+        self.empty = 0
+
+    def ink_crop(self, binary, image, slot):
+        """
+        Crop the ink of a slot.
+
+        Returns
+        -------
+            crop (np.array): the ink of the slot in image, or None
+            aspect (float): the width of the ink over its height
+
+        """
+        x0, y0, x1, y1 = slot_bounds(binary.shape, slot)
+        box = ink_box(binary[y0:y1, x0:x1], self.min_area,
+                      self.min_component)
+        if box is None:
+            return None, 0.0
+        x, y, w, h = box
+        pad = int(self.margin * h) + 1
+        left, top = max(x0 + x - pad, x0), max(y0 + y - pad, y0)
+        right, bottom = min(x0 + x + w + pad, x1), min(y0 + y + h + pad, y1)
+        return image[top:bottom, left:right], w / max(h, 1)
+
+    def crops(self, binary_image, inverted_image):
+        """
+        Cut the crops for the letter and word paths.
+
+        Args
+        ----
+            binary_image (np.array): the binarized board, read as a letter
+            inverted_image (np.array): the board with dilated strokes, read
+                as a word
+
+        Returns
+        -------
+            letter_crop, word_crop: the crops, EMPTY_CROP for a path that
+                has nothing to recognize
+
+        """
+        letter, aspect = self.ink_crop(
+            binary_image, binary_image, self.letter_slot)
+        if letter is None or aspect > self.letter_max_aspect:
+            letter = EMPTY_CROP
+        word, aspect = self.ink_crop(
+            binary_image, inverted_image, self.word_slot)
+        if word is None or aspect < self.word_min_aspect:
+            word = EMPTY_CROP
+        self.letters += not is_empty(letter)
+        self.words += not is_empty(word)
+        self.empty += is_empty(letter) and is_empty(word)
+        return letter, word
@@ -0,0 +1,258 @@
+"""
+Tracking of the whiteboard across camera frames.
+
+The camera and the board hardly move during a game, so instead of
+searching the contours of every frame for the board, the corners found in
+one frame are followed into the next with pyramidal Lucas-Kanade optical
+flow. The corners are tracked forward and back again, and the track is
+trusted only if every corner comes back to where it started and the board
+keeps its shape. Only when the track is lost is the full contour search of
+board_contour run again.
+
+The warp of the board is a remap with maps computed from the board
+homography. The maps already include the 5% border crop and, once the
+camera calibration is set, the undistortion of the lens. They are only
+rebuilt when a corner has drifted more than max_drift pixels from where it
+was when they were built, or the calibration changes.
+"""
+
+import time
+
+import cv2
+import imutils
+from imutils.perspective import order_points
+import numpy as np
+
+from drawing.board_preprocess import binarize, board_contour, \
+    homography_maps, Timer
+
+
+LK_PARAMS = dict(winSize=(21, 21), maxLevel=3,
+                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT,
+                           30, 0.01))
+
+
+def board_size(corners):
+    """Return the size of the warped board, as four_point_transform."""
+    tl, tr, br, bl = corners
+    width = max(int(np.linalg.norm(br - bl)), int(np.linalg.norm(tr - tl)))
+    height = max(int(np.linalg.norm(tr - br)), int(np.linalg.norm(tl - bl)))
+    return width, height
+
+
+def warp_maps(corners, border=0.05, camera=None):
+    """
+    Compute the remap maps of the cropped, warped board.
+
+    Args
+    ----
+        corners (np.array): the four corners of the board in the frame
+        border (float): the fraction of the shorter side cropped off each
+            side of the warped board
+        camera (tuple): the camera matrix and distortion coefficients of
+            the frame, or None to warp without undistorting
+
+    Returns
+    -------
+        map1, map2: the fixed point maps for cv2.remap
+
+    """
+    rect = order_points(corners.reshape(4, 2).astype(np.float32))
+    width, height = board_size(rect)
+    dst = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1],
+                    [0, height - 1]], dtype=np.float32)
+    if camera is not None:
+        # the homography is between undistorted normalized coordinates
+        rect = cv2.undistortPoints(rect.reshape(4, 1, 2), *camera)
+        rect = rect.reshape(4, 2).astype(np.float32)
+    to_frame = cv2.getPerspectiveTransform(dst, rect)
+
+    # start the warped image at the crop
+    crop = int(border*min(height, width))
+    shift = np.array([[1, 0, crop], [0, 1, crop], [0, 0, 1]], np.float64)
+    return homography_maps(to_frame @ shift, width - 2*crop,
+                           height - 2*crop, camera)
+
+
+class BoardTracker:
+    """Follows the whiteboard across frames and warps it."""
+
+    def __init__(self, params, max_drift=1.0, max_error=1.0,
+                 max_area_change=0.2):
+        """
+        Create a tracker.
+
+        Args
+        ----
+            params (PreprocessParams): the preprocessing values
+            max_drift (float): the pixels a corner may move before the warp
+                maps are rebuilt
+            max_error (float): the pixels a corner may miss its start when
+                tracked forward and back
+            max_area_change (float): the fraction the area of the board may
+                change between frames
+
+        """
+        self.params = params
+        self.max_drift = max_drift
+        self.max_error = max_error
+        self.max_area_change = max_area_change
+        self.gray = None
+        self.corners = None
+        self.map_corners = None
+        self.maps = None
+        self.camera = None
+        self.scale = 1.0
+        self.detections = 0
+        self.tracked = 0
+        self.rebuilds = 0
+
+    def reset(self):
+        """Forget the board, so the next frame searches for it."""
+        self.corners = None
+        self.maps = None
+
+    def set_camera(self, camera_matrix, distortion):
+        """Set the calibration of the camera, to undistort the board."""
+        camera = None
+        if distortion is not None and np.any(distortion):
+            camera = (np.asarray(camera_matrix, dtype=np.float64),
+                      np.asarray(distortion, dtype=np.float64))
+        if (camera is None) == (self.camera is None) and (
+                camera is None or all(map(np.array_equal, camera,
+                                          self.camera))):
+            return
+        self.camera = camera
+        self.maps = None
+
+    def resized_camera(self):
+        """Return the calibration of the resized frame, None if unknown."""
+        if self.camera is None:
+            return None
+        camera_matrix, distortion = self.camera
+        scale = np.array([[self.scale], [self.scale], [1.0]])
+        return camera_matrix * scale, distortion
+
+    def track(self, gray):
+        """Follow the corners into a frame, None if the track is lost."""
+        if self.corners is None or self.gray is None \
+           or self.gray.shape != gray.shape:
+            return None
+        start = self.corners.astype(np.float32).reshape(4, 1, 2)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(
+            self.gray, gray, start, None, **LK_PARAMS)
+        if moved is None or not status.all():
+            return None
+        back, status, _ = cv2.calcOpticalFlowPyrLK(
+            gray, self.gray, moved, None, **LK_PARAMS)
+        if back is None or not status.all():
+            return None
+        if np.abs(back - start).max() > self.max_error:
+            return None
+        area = cv2.contourArea(moved)
+        old_area = cv2.contourArea(start)
+        if old_area <= 0 or abs(area / old_area - 1) > self.max_area_change \
+           or not cv2.isContourConvex(moved):
+            return None
+        return moved
+
+    def locate(self, frame, timings=None):
+        """
+        Find the board in a frame, tracking it when possible.
+
+        Args
+        ----
+            frame (np.array): the BGR camera frame
+            timings (dict): where the seconds of each stage are added
+
+        Returns
+        -------
+            resized (np.array): the frame resized to a height of 500
+            gray (np.array): the resized frame in grayscale
+            board (np.array): the (4, 1, 2) corners of the board, or None
+
+        """
+        timer = Timer(timings)
+        resized = imutils.resize(frame, height=500)
+        gray = cv2.cvtColor(resized, cv2.COLOR_BGR2GRAY)
+        timer.mark('resize')
+        if resized.shape[0] / frame.shape[0] != self.scale:
+            self.scale = resized.shape[0] / frame.shape[0]
+            self.maps = None
+
+        corners = self.track(gray)
+        timer.mark('track')
+        if corners is None:
+            board = board_contour(gray, self.params, timings)
+            corners = None if board is None \
+                else board.astype(np.float32).reshape(4, 1, 2)
+            self.detections += 1
+        else:
+            self.tracked += 1
+        self.gray = gray
+        self.corners = corners
+        return resized, gray, corners
+
+    def crops(self, gray, corners, timings=None):
+        """
+        Warp the board with the cached maps and binarize it.
+
+        Returns
+        -------
+            binary_image, inverted_image: as from board_crops
+
+        """
+        timer = Timer(timings)
+        if self.maps is None or np.abs(
+                corners - self.map_corners).max() > self.max_drift:
+            self.maps = warp_maps(corners, camera=self.resized_camera())
+            self.map_corners = corners.copy()
+            self.rebuilds += 1
+        cropped = cv2.remap(gray, *self.maps, cv2.INTER_LINEAR)
+        timer.mark('warp')
+        return binarize(cropped, self.params, timer)
+
+    def update(self, frame, timings=None):
+        """
+        Turn a camera frame into the two crops read by OCR.
+
+        Returns
+        -------
+            resized, board: as from locate
+            binary_image, inverted_image: as from board_crops, or None,
+                None if no board was found
+
+        """
+        resized, gray, corners = self.locate(frame, timings)
+        if corners is None:
+            return resized, None, None, None
+        return (resized, corners) + self.crops(gray, corners, timings)
+
+
+class LatencyStats:
+    """The mean time of each stage over a number of frames."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Start counting again."""
+        self.frames = 0
+        self.totals = {}
+        self.start = time.perf_counter()
+
+    def add(self, timings):
+        """Add the timings of a frame."""
+        self.frames += 1
+        for stage, seconds in timings.items():
+            self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+
+    def report(self):
+        """Return the mean milliseconds of each stage, and start over."""
+        report = {stage: 1000 * seconds / max(self.frames, 1)
+                  for stage, seconds in self.totals.items()}
+        report['total'] = sum(report.values())
+        elapsed = time.perf_counter() - self.start
+        fps = self.frames / elapsed if elapsed > 0 else 0.0
+        self.reset()
+        return report, fps
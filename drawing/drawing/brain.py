@@ -14,6 +14,15 @@ CLIENTS:
   + /moveit_mp (MovePose) - The data to move to specific pose.
   + /cartesian_mp (Cartesian) - The data sent for a cartesian move.
   + /kickstart_service (Empty) - The data sent to initialize the board.
+
+PARAMETERS:
+  + glyph_atlas_dir (string) - Directory of the precompiled glyph atlas.
+  + glyph_tolerance (double) - Chordal tolerance of letter curves in metres.
+  + simplify_tolerance (double) - Tolerance in metres for dropping points
+    from a stroke before it is sent to /where_to_write.
+  + lookahead_depth (int) - Number of shapes whose board poses are fetched
+    ahead of the shape being drawn.
+  + game_id (int) - The game of the board this robot writes on.
 """
 
 import rclpy
@@ -21,14 +30,20 @@ from rclpy.node import Node
 from rclpy.callback_groups import MutuallyExclusiveCallbackGroup
 from std_srvs.srv import Empty
 from std_msgs.msg import Bool
-from matplotlib.font_manager import FontProperties
-from matplotlib.textpath import TextToPath
 from brain_interfaces.srv import BoardTiles, MovePose, Cartesian
 from brain_interfaces.msg import LetterMsg
 from geometry_msgs.msg import Pose, Point, Quaternion
+from drawing.glyphs import build_alphabet, glyph_board_points
+from drawing.glyphs import FONT_FAMILY, LETTERS, resolve_font, TOLERANCE
+from drawing.glyph_atlas import atlas_key, load_atlas, save_atlas
+from drawing.polyline import simplify_board_points
+from drawing.stroke_order import order_paths, order_strokes
+from drawing.stroke_order import reverse_strokes, travel_length
+from drawing.grid import Grid
 
 from enum import Enum, auto
-import numpy as np
+import os
+import time
 
 
 class State(Enum):
@@ -98,9 +113,27 @@ class Brain(Node):
             orientation=Quaternion(x=1.0, y=0.0, z=0.0, w=0.0)
         )
         self.alphabet = {}
+        self.grid = Grid((0, 0.8), (0, 0.40), 0.1)
         self.board_scale = 1.0
+        self.declare_parameter('glyph_atlas_dir', os.path.join(
+            os.path.expanduser('~'), '.ros', 'drawing'))
+        self.glyph_atlas_dir = self.get_parameter(
+            'glyph_atlas_dir').get_parameter_value().string_value
+        self.declare_parameter('glyph_tolerance', TOLERANCE)
+        self.glyph_tolerance = self.get_parameter(
+            'glyph_tolerance').get_parameter_value().double_value
+        self.declare_parameter('simplify_tolerance', 0.0002)
+        self.simplify_tolerance = self.get_parameter(
+            'simplify_tolerance').get_parameter_value().double_value
+        self.declare_parameter('lookahead_depth', 2)
+        self.lookahead_depth = self.get_parameter(
+            'lookahead_depth').get_parameter_value().integer_value
+        self.declare_parameter('game_id', 0)
+        self.game_id = self.get_parameter(
+            'game_id').get_parameter_value().integer_value
         self.scale_factor = 0.001 * self.board_scale
         self.shape_list = []
+        self.tile_futures = []
         self.current_mp_pose = Pose()
         self.current_traj_poses = []
         self.current_shape_poses = []
@@ -112,62 +145,36 @@ class Brain(Node):
         self.create_letters()
 
     def create_letters(self):
-        """Create the dictionary of bubble letters."""
-        letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0|-/_'
-        for i in range(0, len(letters)):
-            letter = letters[i]
-            if letter == '0':  # Head of man
-                xvec = []
-                yvec = []
-                q = 25
-                for t in range(0, q+1):
-                    x = 35*np.cos(2*np.pi*t/q)
-                    y = 35+35*np.sin(2*np.pi*t/q)
-                    xvec.append(x*self.scale_factor * self.board_scale)
-                    yvec.append(y*self.scale_factor * self.board_scale)
-                point_dict = {letter: {'xlist': xvec, 'ylist': yvec}}
-                self.alphabet.update(point_dict)
-            elif letter == '|':  # Body of man
-                xlist = [0.0, 0.0, 0.0]
-                ylist = [0.1 * self.board_scale, 0.05 *
-                         self.board_scale, 0.002 * self.board_scale]
-                point_dict = {letter: {'xlist': xlist, 'ylist': ylist}}
-                self.alphabet.update(point_dict)
-            elif letter == '-':  # Arms of man
-                xlist = [0.05 * self.board_scale, 0.1 *
-                         self.board_scale, 0.15 * self.board_scale]
-                ylist = [0.05 * self.board_scale, 0.05 *
-                         self.board_scale, 0.05 * self.board_scale]
-                point_dict = {letter: {'xlist': xlist, 'ylist': ylist}}
-                self.alphabet.update(point_dict)
-            elif letter == '/':  # Leg of man 1
-                xlist = [0.1 * self.board_scale, 0.075 *
-                         self.board_scale, 0.05 * self.board_scale]
-                ylist = [0.1 * self.board_scale, 0.06 *
-                         self.board_scale, 0.02 * self.board_scale]
-                point_dict = {letter: {'xlist': xlist, 'ylist': ylist}}
-                self.alphabet.update(point_dict)
-            elif letter == '_':  # Leg of man 2
-                xlist = [0.0 * self.board_scale, 0.025 *
-                         self.board_scale, 0.05 * self.board_scale]
-                ylist = [0.1 * self.board_scale, 0.06 *
-                         self.board_scale, 0.02 * self.board_scale]
-                point_dict = {letter: {'xlist': xlist, 'ylist': ylist}}
-                self.alphabet.update(point_dict)
-            else:  # All letters of alphabet
-                fp = FontProperties(
-                    family="Liberation Sans Narrow", style="normal")
-                verts, codes = TextToPath().get_text_path(fp, letters[i])
-                xlist = []
-                ylist = []
-                for j in range(0, len(verts) - 1):
-                    if verts[j][0] > 0:
-                        xlist.append(
-                            verts[j][0] * self.scale_factor * self.board_scale)
-                        ylist.append(
-                            verts[j][1] * self.scale_factor * self.board_scale)
-                point_dict = {letter: {'xlist': xlist, 'ylist': ylist}}
-                self.alphabet.update(point_dict)
+        """
+        Create the dictionary of bubble letters.
+
+        The letters are loaded from the glyph atlas when one exists for the
+        current font and scale, otherwise they are traced from the font
+        outlines and written to the atlas for the next start.
+        """
+        font_path, family = resolve_font(FONT_FAMILY)
+        if family != FONT_FAMILY:
+            # the letters of a fallback font are not kept, so the atlas is
+            # built from the right font once it is installed
+            self.get_logger().warn(
+                f'Font {FONT_FAMILY} not found, tracing the letters from '
+                f'{family} ({font_path}) without a glyph atlas')
+            self.alphabet.update(build_alphabet(
+                self.scale_factor, self.board_scale,
+                tolerance=self.glyph_tolerance))
+            return
+        key = atlas_key(FONT_FAMILY, self.scale_factor, self.board_scale,
+                        LETTERS, self.glyph_tolerance, font_path)
+        alphabet = load_atlas(self.glyph_atlas_dir, key)
+        if alphabet is None:
+            self.get_logger().info('No glyph atlas found, building letters')
+            alphabet = build_alphabet(self.scale_factor, self.board_scale,
+                                      tolerance=self.glyph_tolerance)
+            try:
+                save_atlas(self.glyph_atlas_dir, key, alphabet)
+            except OSError as e:
+                self.get_logger().warn(f'Could not write glyph atlas: {e}')
+        self.alphabet.update(alphabet)
 
     def process_letter_points(self, letter):
         """
@@ -178,32 +185,67 @@ class Brain(Node):
 
         Returns
         -------
-        board_x (List) : The list of x points on the board plane
-        board_y (List) : The list of y points on the board plane
-        board_bool (List) : The list of boolean values on the board
+        board_x (np.array) : The x points on the board plane
+        board_y (np.array) : The y points on the board plane
+        board_bool (np.array) : Whether the pen is on the board at each point
 
         """
-        xcoord = self.alphabet[letter]['xlist']
-        ycoord = self.alphabet[letter]['ylist']
-        board_x = []
-        board_y = []
-        board_bool = []
-        for i in range(0, len(xcoord)):
-            if not (0.0001 > xcoord[i] > -0.0001) \
-                    or not (0.0001 > ycoord[i] > 0.0001):
-                board_x.append(xcoord[i])
-                board_y.append(ycoord[i])
-                board_bool.append(True)
-            elif i != len(xcoord):
-                board_x.append(xcoord[i+1])
-                board_y.append(ycoord[i+1])
-                board_bool.append(False)
-            else:
-                board_x.append(xcoord[i])
-                board_y.append(ycoord[i])
-                board_bool.append(False)
+        board_x, board_y, board_bool = glyph_board_points(
+            self.alphabet[letter])
+        count = len(board_x)
+
+        # drop the points that do not change the drawn stroke
+        board_x, board_y, board_bool, removed = simplify_board_points(
+            board_x, board_y, board_bool, self.simplify_tolerance)
+        board_x, board_y, board_bool = order_strokes(
+            board_x, board_y, board_bool)
+        self.get_logger().info(
+            f'Simplified {letter}: removed {removed} of {count} points')
         return board_x, board_y, board_bool
 
+    def order_shapes(self, shapes):
+        """
+        Order the shapes of a play to keep pen-up travel short.
+
+        Args:
+        ----
+        shapes (List) : The BoardTiles requests in message order
+
+        Returns
+        -------
+        shapes (List) : The requests in drawing order, with shapes that are
+        drawn backwards reversed
+
+        """
+        start_time = time.perf_counter()
+        starts = []
+        ends = []
+        for shape in shapes:
+            # same tile placement as Tags.where_to_write_callback
+            lx, ly = self.grid.grid_to_world(shape.mode, shape.position)
+            starts.append([lx * 0.667 + shape.x[0], ly * 0.667 + shape.y[0]])
+            ends.append([lx * 0.667 + shape.x[-1], ly * 0.667 + shape.y[-1]])
+        order, reverse = order_paths(starts, ends)
+
+        ordered = []
+        for i, flip in zip(order, reverse):
+            shape = shapes[i]
+            if flip:
+                x, y, onboard = reverse_strokes(
+                    shape.x, shape.y, shape.onboard)
+                shape.x = x.tolist()
+                shape.y = y.tolist()
+                shape.onboard = onboard.tolist()
+            ordered.append(shape)
+        elapsed = 1000 * (time.perf_counter() - start_time)
+        before = travel_length(
+            starts, ends, range(len(shapes)), [False] * len(shapes))
+        after = travel_length(starts, ends, order, reverse)
+        self.get_logger().info(
+            f'Ordered {len(shapes)} shapes in {elapsed:.2f} ms, pen-up '
+            f'travel {before:.3f} m -> {after:.3f} m')
+        return ordered
+
     def hangman_callback(self, msg: LetterMsg):
         """
         Call back when feedback is given from hangman.
@@ -213,6 +255,10 @@ class Brain(Node):
         msg (LetterMsg) : The character with postion to be written on the board
 
         """
+        # plays on other boards are written by their own robot
+        if msg.game_id != self.game_id:
+            return
+
         # establishes a global message variable for the duration of LETTER
         self.last_message = msg
         self.ocr_pub.publish(Bool(data=False))
@@ -224,56 +270,118 @@ class Brain(Node):
         # self.ocr_pub.publish(False)
 
         self.shape_list = []
+        self.tile_futures = []
         for i in range(0, len(self.last_message.positions)):
             tile_origin = BoardTiles.Request()
             tile_origin.mode = self.last_message.mode[i]
             tile_origin.position = self.last_message.positions[i]
 
             # get x, y, onboard values
-            tile_origin.x, tile_origin.y, tile_origin.onboard = \
+            board_x, board_y, board_bool = \
                 self.process_letter_points(self.last_message.letters[i])
+            tile_origin.x = board_x.tolist()
+            tile_origin.y = board_y.tolist()
+            tile_origin.onboard = board_bool.tolist()
             self.shape_list.append(tile_origin)
 
+        self.shape_list = self.order_shapes(self.shape_list)
+
         # switches to calibrate state
         self.state = State.LETTER
 
-    async def letter_writer(self, shape: BoardTiles.Request()):
+    def prefetch_tiles(self):
         """
-        Write the letters on the board.
+        Request the board poses of the upcoming shapes.
 
-        Function to process the shape into trajectory service calls.
+        Keeps /where_to_write requests in flight for the current shape and
+        up to lookahead_depth shapes after it, so their poses are ready by
+        the time the shape before them has been drawn.
+        """
+        depth = min(len(self.shape_list), self.lookahead_depth + 1)
+        for shape in self.shape_list[len(self.tile_futures):depth]:
+            self.tile_futures.append(
+                (self.board_service_client.call_async(shape),
+                 time.perf_counter()))
+
+    def shape_requests(self, shape, resp):
+        """
+        Create the motion requests for one shape.
 
         Args:
         ----
         shape (BoardTiles.Request()) : The poses in BoardTiles form
+        resp (BoardTiles.Response()) : The board poses of the shape
+
+        Returns
+        -------
+        approach (MovePose.Request()) : The move to the standoff pose
+        pen_down (Cartesian.Request()) : The move onto the first point
+        stroke (Cartesian.Request()) : The moves along the rest of the shape
 
         """
-        resp = await self.board_service_client.call_async(shape)
-        pose1 = resp.initial_pose
         pose_list = resp.pose_list
 
-        request2 = MovePose.Request()
-        request2.target_pose = pose1
-        request2.use_force_control = False
-        await self.movepose_client.call_async(request2)
-
-        request2 = Cartesian.Request()
-        request2.poses = [pose_list[0]]
-        request2.velocity = 0.015
-        request2.replan = False
-        request2.use_force_control = [shape.onboard[0]]
-        await self.cartesian_mp_client.call_async(request2)
-
-        request3 = Cartesian.Request()
-        request3.poses = pose_list[1:]
-        request3.poses.append(pose_list[-1])
-        request3.velocity = 0.015
-        request3.replan = True
-        request3.use_force_control = shape.onboard[1:]
-        request3.use_force_control.append(False)
-        await self.cartesian_mp_client.call_async(request3)
-
-        self.shape_list.pop(0)
+        approach = MovePose.Request()
+        approach.target_pose = resp.initial_pose
+        approach.use_force_control = False
+
+        pen_down = Cartesian.Request()
+        pen_down.poses = [pose_list[0]]
+        pen_down.velocity = 0.015
+        pen_down.replan = False
+        pen_down.use_force_control = [shape.onboard[0]]
+
+        stroke = Cartesian.Request()
+        stroke.poses = pose_list[1:]
+        stroke.poses.append(pose_list[-1])
+        stroke.velocity = 0.015
+        stroke.replan = True
+        stroke.use_force_control = shape.onboard[1:]
+        stroke.use_force_control.append(False)
+        return approach, pen_down, stroke
+
+    async def letter_writer(self, shape: BoardTiles.Request()):
+        """
+        Write the letters on the board.
+
+        Function to process the shape into trajectory service calls. The
+        board poses of the following shapes are fetched while this one is
+        being drawn.
+
+        Args:
+        ----
+        shape (BoardTiles.Request()) : The poses in BoardTiles form
+
+        """
+        self.prefetch_tiles()
+        entry = self.tile_futures[0]
+        tile_future, requested = entry
+
+        start = time.perf_counter()
+        resp = await tile_future
+        tiles = time.perf_counter()
+        approach, pen_down, stroke = self.shape_requests(shape, resp)
+
+        await self.movepose_client.call_async(approach)
+        approached = time.perf_counter()
+        await self.cartesian_mp_client.call_async(pen_down)
+        down = time.perf_counter()
+        await self.cartesian_mp_client.call_async(stroke)
+        done = time.perf_counter()
+
+        self.get_logger().info(
+            f'Shape timing: tiles {tiles - start:.3f} s '
+            f'(requested {start - requested:.3f} s ahead), '
+            f'approach {approached - tiles:.3f} s, '
+            f'pen down {down - approached:.3f} s, '
+            f'stroke {done - down:.3f} s')
+
+        # a new play may have replaced both queues while this shape was
+        # drawn, only drop what was taken from them
+        if self.tile_futures and self.tile_futures[0] is entry:
+            self.tile_futures.pop(0)
+        if self.shape_list and self.shape_list[0] is shape:
+            self.shape_list.pop(0)
 
     async def timer_callback(self):
         """Timer running at a specified frequency."""
@@ -0,0 +1,116 @@
+"""
+Change detection for the OCR crops.
+
+Between guesses the whiteboard barely changes, so most OCR ticks would
+recognize the same crop again. Each crop is reduced to a grayscale
+thumbnail of size by size pixels. Shrinking averages camera noise away, so
+noise moves a pixel of the thumbnail by a few grey levels, while a new
+stroke darkens the pixels it crosses by tens of levels, even when it only
+turns an O into a Q on a whole board crop. A crop whose thumbnail is within
+max_change grey levels of the last recognized thumbnail of the same crop
+reuses its recognition result. The OCR scheduler bursts on a tighter
+tolerance, so any new stroke speeds it up.
+"""
+
+import cv2
+import numpy as np
+
+
+def frame_key(frame, size=64):
+    """
+    Compute the thumbnail of an image.
+
+    Args
+    ----
+        frame (np.array): a grayscale or BGR image
+        size (int): the width and height of the thumbnail
+
+    Returns
+    -------
+        key (np.array): the size by size grayscale thumbnail
+
+    """
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(frame, (size, size), interpolation=cv2.INTER_AREA)
+
+
+def frame_change(a, b):
+    """Return the most grey levels a pixel differs by between thumbnails."""
+    return int(np.abs(a.astype(np.int16) - b.astype(np.int16)).max())
+
+
+def frames_changed(keys, last_keys, max_change):
+    """
+    Return whether the crops changed since the last keys.
+
+    Args
+    ----
+        keys (list): the thumbnails of the crops
+        last_keys (list): the thumbnails of the crops before
+        max_change (int): the most grey levels a pixel may change by for a
+            crop to be unchanged
+
+    """
+    return len(keys) != len(last_keys) or any(
+        frame_change(a, b) > max_change for a, b in zip(keys, last_keys))
+
+
+class RecognitionCache:
+    """The last recognition result of each crop, with its thumbnail."""
+
+    def __init__(self, max_change=16, size=64):
+        """
+        Create an empty cache.
+
+        Args
+        ----
+            max_change (int): the most grey levels a pixel of the
+                thumbnail of a crop may change by for it to be unchanged,
+                a negative value turns the cache off
+            size (int): the size of the thumbnails
+
+        """
+        self.max_change = max_change
+        self.size = size
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, frame):
+        """Return the cache key of a frame."""
+        return frame_key(frame, self.size)
+
+    def lookup(self, crop, key):
+        """
+        Find the result of a crop if it has not changed.
+
+        Args
+        ----
+            crop: what the crop shows, such as the letter or word slot
+            key (np.array): the cache key of the frame of the crop
+
+        Returns
+        -------
+            result: the cached result, or None if the crop has changed
+
+        """
+        entry = self.entries.get(crop)
+        if self.max_change >= 0 and entry is not None and \
+                frame_change(key, entry[0]) <= self.max_change:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def store(self, crop, key, result):
+        """Keep the result of a crop with the key of its frame."""
+        if self.max_change < 0:
+            return
+        self.entries[crop] = (key, result)
+
+    @property
+    def skip_rate(self):
+        """The fraction of lookups that skipped recognition."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
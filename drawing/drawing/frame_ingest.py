@@ -0,0 +1,128 @@
+"""
+Latest-frame-only ingestion of camera images.
+
+A subscription callback puts every frame it receives into a LatestFrame,
+and the processing takes the newest one whenever it is ready for the next.
+Frames that were overwritten before they were taken are counted as
+dropped, so when the processing falls behind it skips frames instead of
+working through a queue of stale ones.
+
+Each frame carries the time it was captured by the camera, so the age of a
+frame can be measured anywhere down the pipeline. FrameAge keeps the
+statistics of those ages and counts the frames that exceed a bound.
+"""
+
+import threading
+
+
+def stamp_seconds(stamp):
+    """Return a builtin_interfaces/Time in seconds."""
+    return stamp.sec + stamp.nanosec * 1e-9
+
+
+class LatestFrame:
+    """The newest frame of a stream, older unprocessed frames are dropped."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frame = None
+        self.stamp = None
+        self.new = False
+        self.received = 0
+        self.taken = 0
+        self.dropped = 0
+
+    @property
+    def pending(self):
+        """Whether there is a frame that has not been taken yet."""
+        return self.new
+
+    def put(self, frame, stamp):
+        """
+        Make a frame the newest, dropping the last one if it was not taken.
+
+        Args
+        ----
+            frame: the frame, e.g. a sensor_msgs/Image
+            stamp (float): the capture time of the frame in seconds
+
+        """
+        with self.lock:
+            if self.new:
+                self.dropped += 1
+            self.frame = frame
+            self.stamp = stamp
+            self.new = True
+            self.received += 1
+
+    def take(self):
+        """
+        Take the newest frame.
+
+        Returns
+        -------
+            frame: the frame, or None if there is no frame newer than the
+                one taken last
+            stamp (float): the capture time of the frame in seconds
+
+        """
+        with self.lock:
+            if not self.new:
+                return None, None
+            self.new = False
+            self.taken += 1
+            return self.frame, self.stamp
+
+
+class FrameAge:
+    """The ages of frames over a reporting period."""
+
+    def __init__(self, max_age=1.0):
+        """
+        Create the statistics.
+
+        Args
+        ----
+            max_age (float): the seconds after capture a frame is stale,
+                zero or less for no bound
+
+        """
+        self.max_age = max_age
+        self.stale = 0
+        self.reset()
+
+    def reset(self):
+        """Start a new reporting period."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def fresh(self, stamp, now):
+        """
+        Add the age of a frame and check it against the bound.
+
+        Args
+        ----
+            stamp (float): the capture time of the frame in seconds
+            now (float): the current time in seconds
+
+        Returns
+        -------
+            fresh (bool): whether the frame is younger than max_age
+
+        """
+        age = now - stamp
+        self.count += 1
+        self.total += age
+        self.max = max(self.max, age)
+        if 0 < self.max_age < age:
+            self.stale += 1
+            return False
+        return True
+
+    def report(self):
+        """Return the mean and largest age in ms, and start over."""
+        mean = self.total / self.count if self.count else 0.0
+        report = (1000 * mean, 1000 * self.max)
+        self.reset()
+        return report
@@ -0,0 +1,142 @@
+"""
+Precompiled on-disk glyph atlas.
+
+The alphabet is stored as one packed float array of (x, y, onboard) rows
+plus a small json index of where each character starts and stops. The
+points are memory-mapped on load, so the brain starts without rebuilding the
+letters from the font outlines.
+
+An atlas is keyed by the font, the file it was traced from, the scale
+factor, the board scale and the curve tolerance. When any of them changes,
+or the font file is installed or replaced, the key changes, the old atlas is
+ignored and removed the next time an atlas is written.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+ATLAS_VERSION = 2
+
+
+def atlas_key(font_family, scale_factor, board_scale, letters, tolerance,
+              font_path=None):
+    """
+    Create the key of an atlas.
+
+    Args
+    ----
+        font_family (str): the font the letters were traced from
+        scale_factor (float): metres per font unit
+        board_scale (float): scale of the board
+        letters (str): the characters in the atlas
+        tolerance (float): the chordal tolerance of the curves in metres
+        font_path (str): the font file the letters were traced from, its
+            size and modification time are part of the key
+
+    Returns
+    -------
+        key (str): a short hash of the atlas settings
+
+    """
+    font_file = None
+    if font_path is not None:
+        stat = os.stat(font_path)
+        font_file = [font_path, stat.st_size, stat.st_mtime_ns]
+    settings = json.dumps({
+        'version': ATLAS_VERSION,
+        'font': font_family,
+        'font_file': font_file,
+        'scale_factor': float(scale_factor),
+        'board_scale': float(board_scale),
+        'letters': letters,
+        'tolerance': float(tolerance),
+    }, sort_keys=True)
+    return hashlib.sha1(settings.encode()).hexdigest()[:16]
+
+
+def atlas_paths(directory, key):
+    """Return the points and index file paths of an atlas."""
+    base = os.path.join(directory, f'glyphs_{key}')
+    return base + '.npy', base + '.json'
+
+
+def save_atlas(directory, key, alphabet):
+    """
+    Write an alphabet to disk as a glyph atlas.
+
+    Any atlas in the directory with a different key is removed.
+
+    Args
+    ----
+        directory (str): the directory to write the atlas in
+        key (str): the key from atlas_key
+        alphabet (dict): {letter: {'xlist': [...], 'ylist': [...],
+            'onboard': [...]}}
+
+    """
+    os.makedirs(directory, exist_ok=True)
+    points_path, index_path = atlas_paths(directory, key)
+
+    index = {}
+    chunks = []
+    start = 0
+    for letter, glyph in alphabet.items():
+        chunk = np.column_stack((np.asarray(glyph['xlist'], dtype=float),
+                                 np.asarray(glyph['ylist'], dtype=float),
+                                 np.asarray(glyph['onboard'], dtype=float)))
+        chunks.append(chunk.reshape(-1, 3))
+        index[letter] = [start, start + len(chunk)]
+        start += len(chunk)
+    points = np.ascontiguousarray(np.concatenate(chunks))
+
+    # write to temporary files first so a reader never sees half an atlas
+    with open(points_path + '.tmp', 'wb') as f:
+        np.save(f, points)
+    with open(index_path + '.tmp', 'w') as f:
+        json.dump({'key': key, 'index': index}, f)
+    os.replace(points_path + '.tmp', points_path)
+    os.replace(index_path + '.tmp', index_path)
+
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.startswith('glyphs_') \
+                and path not in (points_path, index_path):
+            os.remove(path)
+
+
+def load_atlas(directory, key):
+    """
+    Load a glyph atlas from disk.
+
+    Args
+    ----
+        directory (str): the directory the atlas was written in
+        key (str): the key from atlas_key
+
+    Returns
+    -------
+        alphabet (dict): {letter: {'xlist': array, 'ylist': array,
+            'onboard': array}} backed by a memory map, or None if there is
+            no valid atlas for the key
+
+    """
+    points_path, index_path = atlas_paths(directory, key)
+    try:
+        with open(index_path) as f:
+            meta = json.load(f)
+        points = np.load(points_path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if meta.get('key') != key:
+        return None
+
+    alphabet = {}
+    for letter, (start, stop) in meta['index'].items():
+        alphabet[letter] = {'xlist': points[start:stop, 0],
+                            'ylist': points[start:stop, 1],
+                            'onboard': points[start:stop, 2] > 0.5}
+    return alphabet
@@ -0,0 +1,327 @@
+"""
+Glyph geometry for the characters the robot writes on the board.
+
+Builds the alphabet used by the brain node: the letters come from the
+matplotlib font outlines, and the hangman body parts are drawn from
+simple hand placed points.
+
+Font outlines are flattened into strokes by following the path codes, so
+curves become just enough line segments to stay within a chordal tolerance,
+and the pen is lifted between the sub-paths of a letter.
+
+matplotlib is only imported when the font is needed. Starting from a
+precompiled glyph atlas only loads the font manager, to find the font file
+the atlas was traced from, and not the outlines.
+"""
+
+import numpy as np
+
+
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0|-/_'
+FONT_FAMILY = 'Liberation Sans Narrow'
+TOLERANCE = 0.0005  # m
+
+# matplotlib.path.Path codes
+STOP = 0
+MOVETO = 1
+LINETO = 2
+CURVE3 = 3
+CURVE4 = 4
+CLOSEPOLY = 79
+
+MAX_DEPTH = 16
+
+
+def flatten_bezier(ctrl, tolerance):
+    """
+    Flatten a bezier curve into line segments.
+
+    The curve is split in half until its control points are all within the
+    tolerance of the chord, which bounds the distance between the curve and
+    the segments.
+
+    Args
+    ----
+        ctrl (np.array): the (n, 2) control points, including both ends
+        tolerance (float): the chordal tolerance in the units of ctrl
+
+    Returns
+    -------
+        points (list): the end points of the segments, without ctrl[0]
+
+    """
+    points = []
+    stack = [(np.asarray(ctrl, dtype=float), 0)]
+    while stack:
+        c, depth = stack.pop()
+        chord = c[-1] - c[0]
+        length = np.hypot(chord[0], chord[1])
+        inner = c[1:-1] - c[0]
+        if length > 0.0:
+            dist = np.abs(chord[0]*inner[:, 1] - chord[1]*inner[:, 0]) \
+                / length
+        else:
+            dist = np.hypot(inner[:, 0], inner[:, 1])
+        if depth >= MAX_DEPTH or np.all(dist <= tolerance):
+            points.append(c[-1])
+            continue
+
+        # de Casteljau split at t = 0.5
+        left = [c[0]]
+        right = [c[-1]]
+        level = c
+        while len(level) > 1:
+            level = 0.5*(level[:-1] + level[1:])
+            left.append(level[0])
+            right.append(level[-1])
+        stack.append((np.array(right[::-1]), depth + 1))
+        stack.append((np.array(left), depth + 1))
+    return points
+
+
+def flatten_path(verts, codes, tolerance):
+    """
+    Flatten a path into strokes using its path codes.
+
+    Args
+    ----
+        verts (np.array): the (n, 2) vertices of the path
+        codes (np.array): the matplotlib path code of each vertex
+        tolerance (float): the chordal tolerance in the units of verts
+
+    Returns
+    -------
+        strokes (list): a (k, 2) array of points for each sub-path
+
+    """
+    strokes = []
+    stroke = []
+    i = 0
+    while i < len(verts):
+        code = codes[i]
+        if code == MOVETO:
+            if len(stroke) > 1:
+                strokes.append(stroke)
+            stroke = [np.asarray(verts[i], dtype=float)]
+            i += 1
+        elif code == LINETO:
+            stroke.append(np.asarray(verts[i], dtype=float))
+            i += 1
+        elif code in (CURVE3, CURVE4):
+            # CURVE3 uses 2 vertices and CURVE4 uses 3 after the start point
+            n = code - 1
+            ctrl = np.vstack([stroke[-1], verts[i:i+n]])
+            stroke.extend(flatten_bezier(ctrl, tolerance))
+            i += n
+        elif code == CLOSEPOLY:
+            if stroke and not np.array_equal(stroke[0], stroke[-1]):
+                stroke.append(stroke[0])
+            i += 1
+        else:  # STOP
+            break
+    if len(stroke) > 1:
+        strokes.append(stroke)
+    return [np.array(s) for s in strokes]
+
+
+def join_strokes(strokes):
+    """
+    Join strokes into one list of board points.
+
+    The pen is lifted at the end of a stroke and lowered again at the start
+    of the next one.
+
+    Args
+    ----
+        strokes (list): a (k, 2) array of points for each stroke
+
+    Returns
+    -------
+        x, y, onboard: contiguous arrays of the x and y points and whether
+            the pen is on the board at each point
+
+    """
+    points = []
+    pens = []
+    for stroke in strokes:
+        stroke = np.asarray(stroke, dtype=float).reshape(-1, 2)
+        if points:
+            # lift the pen and move over the start of the next stroke
+            points.append(np.vstack((points[-1][-1], stroke[0])))
+            pens.append(np.zeros(2, dtype=bool))
+        points.append(stroke)
+        pens.append(np.ones(len(stroke), dtype=bool))
+    if not points:
+        return np.empty(0), np.empty(0), np.empty(0, dtype=bool)
+    points = np.concatenate(points)
+    return np.ascontiguousarray(points[:, 0]), \
+        np.ascontiguousarray(points[:, 1]), np.concatenate(pens)
+
+
+def glyph_board_points(glyph):
+    """
+    Prepare the points of a glyph for a board tile request.
+
+    Args
+    ----
+        glyph (dict): {'xlist': [...], 'ylist': [...], 'onboard': [...]}
+
+    Returns
+    -------
+        x, y, onboard: contiguous float arrays of the x and y points and a
+            boolean mask of whether the pen is on the board at each point
+
+    """
+    x = np.ascontiguousarray(glyph['xlist'], dtype=np.float64)
+    y = np.ascontiguousarray(glyph['ylist'], dtype=np.float64)
+    onboard = np.ascontiguousarray(glyph['onboard'], dtype=bool)
+    return x, y, onboard
+
+
+def split_strokes(x, y, onboard):
+    """
+    Split board points back into the strokes drawn with the pen down.
+
+    Args
+    ----
+        x (list): the x points on the board plane
+        y (list): the y points on the board plane
+        onboard (list): whether the pen is on the board at each point
+
+    Returns
+    -------
+        strokes (list): a (k, 2) array of points for each stroke
+
+    """
+    points = np.column_stack((np.asarray(x, dtype=float),
+                              np.asarray(y, dtype=float))).reshape(-1, 2)
+    pen = np.concatenate(([False], np.asarray(onboard, dtype=bool), [False]))
+    edges = np.flatnonzero(np.diff(pen.astype(np.int8)))
+    return [points[start:stop] for start, stop in zip(edges[::2], edges[1::2])]
+
+
+def hangman_part(letter, scale_factor, board_scale):
+    """
+    Create the points for one part of the hangman.
+
+    Args
+    ----
+        letter (str): one of '0' (head), '|' (body), '-' (arms),
+            '/' and '_' (legs)
+        scale_factor (float): metres per font unit
+        board_scale (float): scale of the board
+
+    Returns
+    -------
+        xlist, ylist, onboard: the x and y points of the part and whether
+            the pen is on the board at each point
+
+    """
+    if letter == '0':  # Head of man
+        q = 25
+        t = np.arange(0, q+1)
+        x = 35*np.cos(2*np.pi*t/q)
+        y = 35+35*np.sin(2*np.pi*t/q)
+        return (x*scale_factor*board_scale).tolist(), \
+            (y*scale_factor*board_scale).tolist(), [True] * (q+1)
+    if letter == '|':  # Body of man
+        xlist = [0.0, 0.0, 0.0]
+        ylist = [0.1, 0.05, 0.002]
+    elif letter == '-':  # Arms of man
+        xlist = [0.05, 0.1, 0.15]
+        ylist = [0.05, 0.05, 0.05]
+    elif letter == '/':  # Leg of man 1
+        xlist = [0.1, 0.075, 0.05]
+        ylist = [0.1, 0.06, 0.02]
+    elif letter == '_':  # Leg of man 2
+        xlist = [0.0, 0.025, 0.05]
+        ylist = [0.1, 0.06, 0.02]
+    else:
+        raise KeyError(f'{letter} is not a part of the hangman')
+    return [x * board_scale for x in xlist], \
+        [y * board_scale for y in ylist], [True] * len(xlist)
+
+
+def resolve_font(font_family=FONT_FAMILY):
+    """
+    Find the font file matplotlib traces a font family from.
+
+    matplotlib falls back to another font when the family is not installed,
+    so the family of the file found may not be the one asked for.
+
+    Args
+    ----
+        font_family (str): the font to find
+
+    Returns
+    -------
+        path (str): the font file
+        family (str): the family of the font in the file
+
+    """
+    from matplotlib import font_manager
+
+    path = font_manager.findfont(
+        font_manager.FontProperties(family=font_family, style="normal"))
+    return path, font_manager.get_font(path).family_name
+
+
+def font_letter(letter, scale_factor, board_scale, font_family=FONT_FAMILY,
+                tolerance=TOLERANCE):
+    """
+    Create the points for a letter from its font outline.
+
+    Args
+    ----
+        letter (str): the character to trace
+        scale_factor (float): metres per font unit
+        board_scale (float): scale of the board
+        font_family (str): the font used to trace the letter
+        tolerance (float): the chordal tolerance of the curves in metres
+
+    Returns
+    -------
+        xlist, ylist, onboard: the x and y points of the letter and whether
+            the pen is on the board at each point
+
+    """
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.textpath import TextToPath
+
+    fp = FontProperties(family=font_family, style="normal")
+    verts, codes = TextToPath().get_text_path(fp, letter)
+    scale = scale_factor * board_scale
+    strokes = flatten_path(verts, codes, tolerance / scale)
+    return join_strokes([stroke * scale for stroke in strokes])
+
+
+def build_alphabet(scale_factor, board_scale, font_family=FONT_FAMILY,
+                   letters=LETTERS, tolerance=TOLERANCE):
+    """
+    Create the dictionary of bubble letters.
+
+    Args
+    ----
+        scale_factor (float): metres per font unit
+        board_scale (float): scale of the board
+        font_family (str): the font used to trace the letters
+        letters (str): the characters to add to the alphabet
+        tolerance (float): the chordal tolerance of the curves in metres
+
+    Returns
+    -------
+        alphabet (dict): {letter: {'xlist': [...], 'ylist': [...],
+            'onboard': [...]}}
+
+    """
+    alphabet = {}
+    for letter in letters:
+        if letter in '0|-/_':
+            xlist, ylist, onboard = hangman_part(
+                letter, scale_factor, board_scale)
+        else:
+            xlist, ylist, onboard = font_letter(
+                letter, scale_factor, board_scale, font_family, tolerance)
+        alphabet[letter] = {'xlist': xlist, 'ylist': ylist,
+                            'onboard': onboard}
+    return alphabet
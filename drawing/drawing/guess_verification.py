@@ -0,0 +1,92 @@
+"""
+Verification of the OCR results into guesses.
+
+The checks the OCR node makes on each recognition result before a guess is
+published, kept free of ROS so the offline OCR benchmark makes exactly the
+same ones. A letter result has to be a single letter, a word result a word
+of the game length, both above their confidence threshold, and then the
+LetterVoter or the WordFusion decide when the guess is confirmed. A word
+read is only fused when it is more confident than a letter needs to be,
+since a misread word adds wrong evidence to every one of its letters.
+"""
+
+
+class GuessVerifier:
+    """Turns recognition results into confirmed guesses."""
+
+    def __init__(self, letter_voter, word_fusion, threshold=0.5,
+                 word_confidence=0.75):
+        """
+        Create the verifier.
+
+        Args
+        ----
+            letter_voter (LetterVoter): confirms the letters
+            word_fusion (WordFusion): confirms the words
+            threshold (float): the confidence a letter result needs to count
+            word_confidence (float): the confidence a word result needs to
+                count
+
+        """
+        self.letter_voter = letter_voter
+        self.word_fusion = word_fusion
+        self.threshold = threshold
+        self.word_confidence = word_confidence
+
+    def building(self, stamp):
+        """Return whether readings of a letter are building up."""
+        return self.letter_voter.active(stamp)
+
+    def letter(self, result, stamp):
+        """
+        Verify a result of the letter crop.
+
+        Args
+        ----
+            result (list): the result of PaddleOCR.ocr(det=False)
+            stamp (float): the time of the result in seconds
+
+        Returns
+        -------
+            letter (str): the confirmed letter, or None
+
+        """
+        try:
+            text, confidence = result[0][0]
+        except (IndexError, TypeError, ValueError):
+            return None
+        # catch exception for "O"
+        if text == '0':
+            text = 'O'
+        # check if the guess is a single letter
+        if len(text) != 1 or not text.isascii() or not text.isalpha():
+            return None
+        # check confidence
+        if confidence <= self.threshold:
+            return None
+        return self.letter_voter.add(text, confidence, stamp)
+
+    def word(self, result):
+        """
+        Verify a result of the word crop.
+
+        Args
+        ----
+            result (list): the result of PaddleOCR.ocr(det=False)
+
+        Returns
+        -------
+            word (str): the confirmed upper case word, or None
+
+        """
+        try:
+            text, confidence = result[0][0]
+        except (IndexError, TypeError, ValueError):
+            return None
+        # check if the guess is a word of the game length
+        if len(text) != self.word_fusion.length or not text.isalpha():
+            return None
+        # check confidence
+        if confidence <= self.word_confidence:
+            return None
+        return self.word_fusion.add(text, confidence)
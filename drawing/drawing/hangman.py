@@ -2,37 +2,26 @@
 The Hangman Node.
 
 Plays the hangman game based on the OCR user input. Interfaces with the brain
-node and the OCR node to evaulate data.
+node and the OCR node to evaulate data. Several boards can play at once, each
+with its own game picked by the game_id of the guess.
 
 PUBLISHERS:
   + /writer (LetterMsg) - The data sent to brain for a given play.
 
 SUBSCRIBERS:
-  + /user_input (String) - The guess sent from OCR for given play.
+  + /user_input (UserInput) - The guess sent from OCR for given play.
+
+PARAMETERS:
+  + max_sessions (int) - The most games kept at once.
+  + finished_limit (int) - The most finished games kept before eviction.
 
 """
 
-from enum import Enum, auto
 import rclpy
 from rclpy.node import Node
-from std_msgs.msg import String
-import urllib.request
-from brain_interfaces.msg import LetterMsg
-from random import randint
-
-
-class State(Enum):
-    """
-    The State class.
-
-    Create the states of the node to determine what the timer
-    fcn should be doing (PLAYING, WAITING, OR GAME_OVER).
-
-    """
-
-    PLAYING = auto(),
-    GAME_OVER = auto(),
-    WAITING = auto()
+from brain_interfaces.msg import LetterMsg, UserInput
+from drawing.hangman_sessions import SessionManager
+from drawing.words import WordIndex
 
 
 class Hangman(Node):
@@ -42,106 +31,96 @@ class Hangman(Node):
         super().__init__("hangman")
         """Initialize the game vars and other characters."""
 
-        self.state = State.WAITING
-        self.word = "BABIES"
-        self.guesses_to_fail = 5
-        self.current_wrong_guesses = 0
-        self.guessed_letters = []
-        self.word_status = ['_', '_', '_', '_', '_', '_']
-        self.game_won = False
-        self.user_guess = None
-        self.Alphabet = {}
-        self.man_list = ['0', '|', '-', '/', '_']
+        self.declare_parameter('max_sessions', 1024)
+        self.declare_parameter('finished_limit', 64)
+
+        # latest unplayed guess of each game
+        self.user_guesses = {}
+        self.words = WordIndex()
+        self.sessions = SessionManager(
+            self.pick_words,
+            max_sessions=self.get_parameter(
+                'max_sessions').get_parameter_value().integer_value,
+            finished_limit=self.get_parameter(
+                'finished_limit').get_parameter_value().integer_value,
+            on_evict=self.game_evicted)
 
         # Create Timer
         self.timer = self.create_timer(0.01, self.timer_callback)
 
         # Create Subscribers
         self.input = self.create_subscription(
-            String, "/user_input", self.user_input_callback, qos_profile=10)
+            UserInput, "/user_input", self.user_input_callback,
+            qos_profile=10)
 
         # Create Publisher
         self.writer = self.create_publisher(
             LetterMsg, "/writer", qos_profile=10, callback_group=None)
 
-        self.pick_words()
-
     def pick_words(self):
-        """Randomly chooses a 6 letter word."""
-        word_url = "https://www.mit.edu/~ecprice/wordlist.10000"
-        response = urllib.request.urlopen(word_url)
-        long_txt = response.read().decode()
-        words = long_txt.splitlines()
-        word_list = []
-        for i in range(0, len(words)):
-            if len(words[i]) == 6:
-                word_list.append(words[i])
-
-        self.word = word_list[randint(0, len(word_list))].upper()
-
-    def evaulate_guess(self, guess):
-        """Evaluate the guess from the user."""
-        upper_guess = guess.upper()
-        letter_list = []
-        position_list = []
-        mode_list = []
-        if len(guess) > 1:
-            if upper_guess == self.word:
-                self.get_logger().info('winning')
-                for q in range(len(upper_guess)):
-                    if self.word_status[q] == upper_guess[q]:
-                        self.word_status[q] = upper_guess[q]
-                    else:
-                        letter_list.append(upper_guess[q])
-                        # write unfilled letters
-                        position_list.append(q)
-                        mode_list.append(1)
-                        self.word_status[q] = upper_guess[q]
-                self.game_won = True
-            else:
-                self.get_logger().info('word incorrect')
-                # write hangman parts only
-                mode_list.append(2)
-                position_list.append(self.current_wrong_guesses)
-                letter_list.append(self.man_list[self.current_wrong_guesses])
-                self.current_wrong_guesses += 1
-        elif len(guess) == 1 and upper_guess not in self.guessed_letters:
-            if upper_guess in self.word:
-                self.get_logger().info('letter in word')
-                for i in range(len(self.word)):
-                    if upper_guess == self.word[i]:
-                        self.word_status[i] = upper_guess
-                        # write correct letters in correct spots
-                        position_list.append(i)
-                        letter_list.append(upper_guess)
-                        mode_list.append(1)
-            else:
-                self.get_logger().info('wrong guess')
-                self.guessed_letters.append(upper_guess)
-                # write wrong letter
-                letter_list.append(upper_guess)
-                mode_list.append(0)
-                position_list.append(len(self.guessed_letters))
-                # write hangman
-                letter_list.append(self.man_list[self.current_wrong_guesses])
-                mode_list.append(2)
-                position_list.append(self.current_wrong_guesses)
-                # increment wrong guesses
-                self.current_wrong_guesses += 1
+        """Randomly chooses a 6 letter word from the packaged dictionary."""
+        return self.words.random_word(6)
+
+    def game_evicted(self, game_id, game):
+        """Log an evicted game, a later guess for it starts a new game."""
+        if game is not None and game.over:
+            self.get_logger().info(f"Game {game_id}: evicted after it ended")
         else:
-            self.get_logger().info('invalid guess')
+            self.get_logger().warn(
+                f"Game {game_id}: evicted while still in play, "
+                f"{len(self.sessions)} games are kept")
+
+    def evaulate_guess(self, game_id, guess):
+        """Evaluate the guess from the user."""
+        game, result = self.sessions.play(game_id, guess)
+        if result is None:
+            return
+        outcome, letter_list, position_list, mode_list = result
+        self.get_logger().info(f"Game {game_id}: {outcome}")
         # sends the list of things to be written to be packaged and published
         self.send_letter(positions=position_list,
-                         mode=mode_list, letters=letter_list)
-
-    def show_progress(self):
+                         mode=mode_list, letters=letter_list,
+                         game_id=game_id)
+
+        # the game may already be evicted if this guess finished it
+        if game.game_won:
+            self.get_logger().info(f"Game {game_id} won. good job.")
+        elif game.lost:
+            self.get_logger().info(
+                f"Game {game_id} lost, try again later. "
+                f"Your word was {game.word}")
+        self.show_progress(game)
+
+    def show_progress(self, game):
         """Show the game progress."""
         self.get_logger().info(
-            f"Guessed wrong letters: {self.guessed_letters}")
-        self.get_logger().info(f"Word Status: {self.word_status}")
-        self.get_logger().info(f"Wrong guesses: {self.current_wrong_guesses}")
+            f"Guessed wrong letters: {game.guessed_letters}")
+        self.get_logger().info(f"Word Status: {game.word_status}")
+        self.get_logger().info(
+            f"Wrong guesses: {game.current_wrong_guesses}")
+        self.get_logger().info(
+            f"Words still possible: {len(self.candidates(game))}")
+
+    def candidates(self, game):
+        """
+        Find the dictionary words that fit the game so far.
+
+        Args:
+        ----
+        game (HangmanGame) : The game to find words for.
+
+        Returns
+        -------
+        (List): The upper case words that match the word status, contain
+        none of the wrong letters and none of the revealed letters in the
+        positions still hidden.
 
-    def send_letter(self, letters, positions, mode):
+        """
+        return self.words.query(''.join(game.word_status),
+                                excluded=''.join(game.guessed_letters),
+                                revealed=True)
+
+    def send_letter(self, letters, positions, mode, game_id=0):
         """
         Send Letter.
 
@@ -153,74 +132,27 @@ class Hangman(Node):
         letters (List) : The guessed letter.
         positions (List) : The positions within their array.
         mode (List) : The mode or list the letter object populates.
+        game_id (int) : The board the letters are written on.
 
         """
         letter_to_send = LetterMsg()
+        letter_to_send.game_id = game_id
         letter_to_send.positions = positions
         letter_to_send.letters = letters
         letter_to_send.mode = mode
         self.writer.publish(letter_to_send)
 
-    def check_word(self):
-        """
-        Check word.
-
-        Checks the guessed word against the answer.
-
-        Args
-        ----
-        None
-
-        Returns
-        -------
-        (Bool): A True or False correctness value.
-
-        """
-        player_word = ''.join(self.word_status)
-        if player_word == self.word:
-            self.game_won = True
-            self.state == State.GAME_OVER
-            return True
-        else:
-            return False
-
-    def user_input_callback(self, msg: String):
+    def user_input_callback(self, msg: UserInput):
         """Call back for the user input subscriber."""
-        self.user_guess = msg.data
-        self.get_logger().info(f"Message: {self.user_guess}")
+        self.user_guesses[msg.game_id] = msg.guess
+        self.get_logger().info(f"Message for game {msg.game_id}: {msg.guess}")
 
     def timer_callback(self):
-        """Timer callback for the game to play hangman."""
-        if self.state == State.PLAYING:
-            self.evaulate_guess(self.user_guess)
-            if self.current_wrong_guesses < self.guesses_to_fail:
-                if self.check_word() is False:
-                    # self.prompt_user()
-                    self.show_progress()
-                    self.state = State.WAITING
-
-                if self.check_word() is True:
-                    self.get_logger().info("Game won. good job.")
-                    self.show_progress()
-                    self.state = State.GAME_OVER
-            else:
-                self.get_logger().info(
-                    f"Game lost, try again later. Your word was {self.word}")
-                self.show_progress()
-                self.state = State.GAME_OVER
-
-        if self.state == State.WAITING:
-            # Check if the player has done something
-            if self.user_guess is None:
-                pass
-            elif self.user_guess in self.guessed_letters \
-                    or self.user_guess in self.word_status:
-                pass
-            else:
-                self.state = State.PLAYING
-
-        if self.state == State.GAME_OVER:
-            pass
+        """Timer callback for the games to play hangman."""
+        # a guess is only played once, even if it changes nothing
+        user_guesses, self.user_guesses = self.user_guesses, {}
+        for game_id, guess in user_guesses.items():
+            self.evaulate_guess(game_id, guess)
 
 
 def main(args=None):
@@ -0,0 +1,133 @@
+"""
+The rules of one game of hangman.
+
+Kept separate from the Hangman node so the same logic can be driven by the
+node, by the headless simulator and by the session manager.
+"""
+
+MAN_LIST = ['0', '|', '-', '/', '_']
+
+
+class HangmanGame:
+    """The state of one game of hangman."""
+
+    __slots__ = ('word', 'guesses_to_fail', 'current_wrong_guesses',
+                 'guessed_letters', 'word_status', 'game_won')
+
+    def __init__(self, word, guesses_to_fail=5):
+        """
+        Start a game.
+
+        Args
+        ----
+            word (str): the word to guess
+            guesses_to_fail (int): the number of wrong guesses that lose
+
+        """
+        self.word = word.upper()
+        self.guesses_to_fail = guesses_to_fail
+        self.current_wrong_guesses = 0
+        self.guessed_letters = []
+        self.word_status = ['_'] * len(self.word)
+        self.game_won = False
+
+    def is_new_guess(self, guess):
+        """Return whether a guess still has to be evaluated."""
+        if guess is None:
+            return False
+        return guess not in self.guessed_letters \
+            and guess not in self.word_status
+
+    def evaluate_guess(self, guess):
+        """
+        Evaluate the guess from the user.
+
+        Args
+        ----
+            guess (str): a letter or a word
+
+        Returns
+        -------
+            outcome (str): what the guess did, for logging
+            letters (list): the characters to write on the board
+            positions (list): the position of each character
+            mode (list): the mode of each character, 0 for a wrong letter,
+                1 for a right letter and 2 for a part of the man
+
+        """
+        upper_guess = guess.upper()
+        letter_list = []
+        position_list = []
+        mode_list = []
+        if len(guess) > 1:
+            if upper_guess == self.word:
+                outcome = 'winning'
+                for q in range(len(upper_guess)):
+                    if self.word_status[q] == upper_guess[q]:
+                        self.word_status[q] = upper_guess[q]
+                    else:
+                        letter_list.append(upper_guess[q])
+                        # write unfilled letters
+                        position_list.append(q)
+                        mode_list.append(1)
+                        self.word_status[q] = upper_guess[q]
+                self.game_won = True
+            else:
+                outcome = 'word incorrect'
+                # write hangman parts only
+                mode_list.append(2)
+                position_list.append(self.current_wrong_guesses)
+                letter_list.append(MAN_LIST[self.current_wrong_guesses])
+                self.current_wrong_guesses += 1
+        elif len(guess) == 1 and upper_guess not in self.guessed_letters:
+            if upper_guess in self.word:
+                outcome = 'letter in word'
+                for i in range(len(self.word)):
+                    if upper_guess == self.word[i]:
+                        self.word_status[i] = upper_guess
+                        # write correct letters in correct spots
+                        position_list.append(i)
+                        letter_list.append(upper_guess)
+                        mode_list.append(1)
+            else:
+                outcome = 'wrong guess'
+                self.guessed_letters.append(upper_guess)
+                # write wrong letter
+                letter_list.append(upper_guess)
+                mode_list.append(0)
+                position_list.append(len(self.guessed_letters))
+                # write hangman
+                letter_list.append(MAN_LIST[self.current_wrong_guesses])
+                mode_list.append(2)
+                position_list.append(self.current_wrong_guesses)
+                # increment wrong guesses
+                self.current_wrong_guesses += 1
+        else:
+            outcome = 'invalid guess'
+        return outcome, letter_list, position_list, mode_list
+
+    def check_word(self):
+        """
+        Check word.
+
+        Checks the guessed word against the answer.
+
+        Returns
+        -------
+            (Bool): A True or False correctness value.
+
+        """
+        if ''.join(self.word_status) == self.word:
+            self.game_won = True
+            return True
+        return False
+
+    @property
+    def lost(self):
+        """Whether the man has been drawn completely."""
+        return self.current_wrong_guesses >= self.guesses_to_fail
+
+    @property
+    def over(self):
+        """Whether the game has been won or lost."""
+        return self.game_won or self.lost
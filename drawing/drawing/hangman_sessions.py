@@ -0,0 +1,126 @@
+"""
+Many concurrent hangman games, keyed by game id.
+
+Each board or station plays its own game, identified by the game_id carried
+on /user_input and /writer. Sessions are kept in insertion ordered dicts so
+lookup, touching and eviction are all O(1).
+
+Finished games are kept for a while, so a late or repeated guess for a board
+that has just finished is ignored instead of starting a new game. They are
+evicted oldest first once there are more than finished_limit of them, and
+the least recently used game is evicted when there are more than
+max_sessions games in total. A guess for an evicted game starts a new game,
+so each eviction is passed to on_evict to be logged.
+"""
+
+from collections import OrderedDict
+
+from drawing.hangman_game import HangmanGame
+
+
+class SessionManager:
+    """Keeps the hangman games of many boards."""
+
+    def __init__(self, new_word, max_sessions=1024, finished_limit=64,
+                 guesses_to_fail=5, on_evict=None):
+        """
+        Create an empty session manager.
+
+        Args
+        ----
+            new_word (callable): returns the word for a new game
+            max_sessions (int): the most games kept at once
+            finished_limit (int): the most finished games kept
+            guesses_to_fail (int): the number of wrong guesses that lose
+            on_evict (callable): called with the game id and the game of
+                each evicted game, or None
+
+        """
+        self.new_word = new_word
+        self.max_sessions = max_sessions
+        self.finished_limit = finished_limit
+        self.guesses_to_fail = guesses_to_fail
+        self.on_evict = on_evict
+        self.sessions = OrderedDict()
+        self.finished = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self):
+        """Return the number of games kept."""
+        return len(self.sessions)
+
+    def __contains__(self, game_id):
+        """Return whether a game is kept."""
+        return game_id in self.sessions
+
+    def get(self, game_id):
+        """
+        Return the game of a board, starting one if there is none.
+
+        Args
+        ----
+            game_id (int): the id of the game
+
+        Returns
+        -------
+            game (HangmanGame): the game
+
+        """
+        game = self.sessions.get(game_id)
+        if game is None:
+            game = HangmanGame(self.new_word(), self.guesses_to_fail)
+            self.sessions[game_id] = game
+            self.evict()
+        else:
+            self.sessions.move_to_end(game_id)
+        return game
+
+    def play(self, game_id, guess):
+        """
+        Play a guess in a game.
+
+        Args
+        ----
+            game_id (int): the id of the game
+            guess (str): a letter or a word
+
+        Returns
+        -------
+            game (HangmanGame): the game played, which may already be
+                evicted when the guess finished it
+            result (tuple): outcome, letters, positions and mode as from
+                HangmanGame.evaluate_guess, or None if the guess was
+                already played or the game is over
+
+        """
+        game = self.get(game_id)
+        if game.over or not game.is_new_guess(guess):
+            return game, None
+        result = game.evaluate_guess(guess)
+        if not game.lost:
+            game.check_word()
+        if game.over:
+            self.finished[game_id] = None
+            self.evict()
+        return game, result
+
+    def remove(self, game_id):
+        """Forget a game."""
+        self.sessions.pop(game_id, None)
+        self.finished.pop(game_id, None)
+
+    def evict(self):
+        """Drop finished games, then old games, over the limits."""
+        while len(self.finished) > self.finished_limit:
+            game_id, _ = self.finished.popitem(last=False)
+            self.evicted_game(game_id, self.sessions.pop(game_id, None))
+        while len(self.sessions) > self.max_sessions:
+            game_id, game = self.sessions.popitem(last=False)
+            self.finished.pop(game_id, None)
+            self.evicted_game(game_id, game)
+
+    def evicted_game(self, game_id, game):
+        """Count an evicted game and report it."""
+        self.evicted += 1
+        if self.on_evict is not None:
+            self.on_evict(game_id, game)
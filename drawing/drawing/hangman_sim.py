@@ -0,0 +1,202 @@
+"""
+Headless hangman game simulator.
+
+Plays many games back to back through the same SessionManager as the
+Hangman node, without ROS, a camera or a robot. Guesses come from a random
+stream or from a script, and every guess goes through the same steps as in
+the node: SessionManager.play and the LetterMsg sent to the brain.
+
+For each guess the decision latency and the size of the LetterMsg payload
+are recorded, and the run reports games per second.
+
+Scripts have one game per line, the word followed by the guesses:
+
+    BABIES E A X BABIES
+
+Run with: ros2 run drawing hangman_sim --games 10000
+"""
+
+import argparse
+import json
+import random
+import string
+import sys
+import time
+
+import numpy as np
+
+from drawing.hangman_sessions import SessionManager
+from drawing.words import WordIndex
+
+
+def letter_msg_size(letters, positions, mode):
+    """
+    Return the serialized size in bytes of a LetterMsg.
+
+    Uses the CDR layout of string[] letters, int64[] positions, int64[]
+    mode and int64 game_id, including the 4 byte encapsulation header.
+    """
+    size = 0
+
+    def align(n):
+        nonlocal size
+        size += -size % n
+
+    align(4)
+    size += 4  # sequence length
+    for letter in letters:
+        align(4)
+        size += 4 + len(letter.encode()) + 1
+    for values in (positions, mode):
+        align(4)
+        size += 4
+        if values:
+            align(8)
+            size += 8 * len(values)
+    align(8)
+    size += 8  # game_id
+    return 4 + size
+
+
+class Stats:
+    """Measurements of a simulator run."""
+
+    def __init__(self):
+        self.latencies = []
+        self.payloads = []
+        self.ignored = 0
+        self.games = 0
+        self.won = 0
+        self.lost = 0
+
+    def report(self, elapsed):
+        """Return the measurements as a dictionary."""
+        latencies = np.array(self.latencies or [0.0]) * 1e6
+        payloads = np.array(self.payloads or [0])
+        return {
+            'games': self.games,
+            'won': self.won,
+            'lost': self.lost,
+            'unfinished': self.games - self.won - self.lost,
+            'guesses': len(self.latencies),
+            'ignored_guesses': self.ignored,
+            'elapsed_s': elapsed,
+            'games_per_s': self.games / elapsed if elapsed else 0.0,
+            'latency_us': {
+                'mean': float(latencies.mean()),
+                'p50': float(np.percentile(latencies, 50)),
+                'p99': float(np.percentile(latencies, 99)),
+                'max': float(latencies.max()),
+            },
+            'payload_bytes': {
+                'mean': float(payloads.mean()),
+                'max': int(payloads.max()),
+                'total': int(payloads.sum()),
+            },
+        }
+
+
+def play(sessions, guesses, stats):
+    """
+    Play one new game with a stream of guesses.
+
+    Args
+    ----
+        sessions (SessionManager): the games, which picks the word of the
+            new game
+        guesses (iterable): the guesses, in the order they are read
+        stats (Stats): where the measurements are added
+
+    """
+    game_id = stats.games
+    stats.games += 1
+    game = sessions.get(game_id)
+    for guess in guesses:
+        start = time.perf_counter()
+        game, result = sessions.play(game_id, guess)
+        if result is None:
+            stats.ignored += 1
+            continue
+        _, letters, positions, mode = result
+        payload = letter_msg_size(letters, positions, mode)
+        stats.latencies.append(time.perf_counter() - start)
+        stats.payloads.append(payload)
+        if game.over:
+            break
+    if game.game_won:
+        stats.won += 1
+    elif game.lost:
+        stats.lost += 1
+
+
+def random_guesses(words, length, rng, word_rate):
+    """
+    Create an endless stream of random guesses.
+
+    Args
+    ----
+        words (WordIndex): the dictionary for word guesses
+        length (int): the length of the words guessed
+        rng (random.Random): the random number generator to use
+        word_rate (float): the fraction of guesses that are whole words
+
+    """
+    while True:
+        if rng.random() < word_rate:
+            yield words.random_word(length, rng)
+        else:
+            yield rng.choice(string.ascii_uppercase)
+
+
+def run_random(games, words, seed=0, length=6, word_rate=0.05,
+               max_guesses=100):
+    """Play games with random words and random guesses."""
+    rng = random.Random(seed)
+    sessions = SessionManager(lambda: words.random_word(length, rng))
+    stats = Stats()
+    start = time.perf_counter()
+    for _ in range(games):
+        stream = random_guesses(words, length, rng, word_rate)
+        play(sessions, (next(stream) for _ in range(max_guesses)), stats)
+    return stats.report(time.perf_counter() - start)
+
+
+def run_script(lines, repeat=1):
+    """Play the scripted games, repeated a number of times."""
+    games = [line.split() for line in lines if line.strip()]
+    # each new game takes the word of the script line being played
+    word = None
+    sessions = SessionManager(lambda: word)
+    stats = Stats()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for word, *guesses in games:
+            play(sessions, guesses, stats)
+    return stats.report(time.perf_counter() - start)
+
+
+def main(args=None):
+    """Run the simulator from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--games', type=int, default=1000,
+                        help='number of random games to play')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--word-rate', type=float, default=0.05,
+                        help='fraction of random guesses that are words')
+    parser.add_argument('--words', default=None,
+                        help='directory of the word index')
+    parser.add_argument('--script', default=None,
+                        help='file of scripted games, one per line')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='number of times to play the script')
+    options = parser.parse_args(args)
+
+    if options.script:
+        with open(options.script) as f:
+            report = run_script(f.read().splitlines(), options.repeat)
+    else:
+        report = run_random(options.games, WordIndex(options.words),
+                            options.seed, word_rate=options.word_rate)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 0
@@ -0,0 +1,283 @@
+"""
+A shared memory ring of images between two nodes.
+
+ImageModification writes its letter and word crops into the channel and
+Paddle_Ocr reads them back as NumPy views of the shared memory, without
+the serialization and copies of a sensor_msgs/Image topic. The reader only
+ever takes the latest write, older writes are skipped.
+
+The channel is one named shared memory block. A small int64 header holds
+the sequence number and slot of the latest write, the slot pinned by the
+reader, and the number of writes, followed by a ring of slots. Each slot
+has its own header with the sequence number of its frames, the number of
+frames, the capture time of the camera frame they came from and their
+shapes, and room for max_frames images of up to frame_bytes each.
+
+There is one writer and one reader, in separate processes that do not share
+a lock:
+
+    - the writer never writes into the slot of the latest write or the
+      slot the reader has pinned. It marks a slot as being written by
+      setting its sequence number to -1 before copying into it
+    - the reader pins the slot of the latest write, then checks that the
+      slot still holds that write. While the slot stays pinned its views
+      are not overwritten, until the reader moves on to a newer write
+
+So with at least three slots the writer always has a free slot and never
+waits for the reader.
+
+A writer that closes the channel, or a new writer that replaces a block
+left behind, clears the magic number of the old block before unlinking it.
+A reader still mapping the old block then sees that it is no longer alive
+and attaches again to the new one.
+"""
+
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+
+# channel header fields
+MAGIC = 0
+SLOTS = 1
+MAX_FRAMES = 2
+FRAME_BYTES = 3
+HEAD = 4
+HEAD_SLOT = 5
+PIN = 6
+WRITES = 7
+HEADER_LEN = 8
+
+# slot header fields
+SEQ = 0
+COUNT = 1
+STAMP = 2
+SHAPES = 3
+
+CHANNEL_MAGIC = 0x696D6763  # "imgc"
+
+
+class ImageChannel:
+    """The latest images of one node, shared with another node."""
+
+    def __init__(self, name, create=False, slots=4, max_frames=2,
+                 frame_bytes=1 << 20):
+        """
+        Create the channel, or attach to it.
+
+        Args
+        ----
+            name (str): the name of the shared memory block
+            create (bool): whether this is the writer, which creates the
+                block, or the reader, which attaches to it
+            slots (int): the number of slots of the ring, at least 3
+            max_frames (int): the most frames written together
+            frame_bytes (int): the largest size of one frame in bytes
+
+        Raises
+        ------
+            FileNotFoundError: when attaching before the writer created it
+
+        """
+        self.owner = create
+        if create:
+            if slots < 3:
+                raise ValueError('An image channel needs 3 slots or more')
+            slot_header = SHAPES + 3 * max_frames
+            self.slot_bytes = 8 * slot_header + max_frames * frame_bytes
+            size = 8 * HEADER_LEN + slots * self.slot_bytes
+            try:
+                self.shm = shared_memory.SharedMemory(
+                    name=name, create=True, size=size)
+            except FileExistsError:
+                # left behind by a writer that did not shut down cleanly
+                stale = shared_memory.SharedMemory(name=name)
+                if stale.size >= 8:
+                    # tell a reader still attached to it to attach again
+                    np.ndarray((1,), dtype=np.int64, buffer=stale.buf)[0] = 0
+                stale.close()
+                stale.unlink()
+                self.shm = shared_memory.SharedMemory(
+                    name=name, create=True, size=size)
+            self.header = np.ndarray(
+                (HEADER_LEN,), dtype=np.int64, buffer=self.shm.buf)
+            self.header[:] = [CHANNEL_MAGIC, slots, max_frames, frame_bytes,
+                              0, -1, -1, 0]
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # the writer owns the block, it must outlive this process
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+            self.header = np.ndarray(
+                (HEADER_LEN,), dtype=np.int64, buffer=self.shm.buf)
+            if self.header[MAGIC] != CHANNEL_MAGIC:
+                self.shm.close()
+                raise ValueError(f'{name} is not an image channel')
+            slots, max_frames, frame_bytes = (
+                int(v) for v in self.header[SLOTS:FRAME_BYTES + 1])
+            slot_header = SHAPES + 3 * max_frames
+            self.slot_bytes = 8 * slot_header + max_frames * frame_bytes
+        self.slots = slots
+        self.max_frames = max_frames
+        self.frame_bytes = frame_bytes
+        self.slot_headers = [
+            np.ndarray((slot_header,), dtype=np.int64, buffer=self.shm.buf,
+                       offset=self.slot_offset(i))
+            for i in range(slots)]
+        self.slot_data = [
+            np.ndarray((max_frames, frame_bytes), dtype=np.uint8,
+                       buffer=self.shm.buf,
+                       offset=self.slot_offset(i) + 8 * slot_header)
+            for i in range(slots)]
+        if create:
+            for slot_header in self.slot_headers:
+                slot_header[SEQ] = 0
+        self.skipped = 0
+        self.last_seq = 0
+        self.last_stamp = None
+
+    def slot_offset(self, slot):
+        """Return the byte offset of a slot in the block."""
+        return 8 * HEADER_LEN + slot * self.slot_bytes
+
+    @property
+    def name(self):
+        """The name to attach to the channel with."""
+        return self.shm.name
+
+    @property
+    def alive(self):
+        """Whether the writer still writes to this block."""
+        return self.header is not None and \
+            int(self.header[MAGIC]) == CHANNEL_MAGIC
+
+    @property
+    def seq(self):
+        """The sequence number of the latest write."""
+        return int(self.header[HEAD])
+
+    def free_slot(self):
+        """Return a slot that is neither the latest nor pinned."""
+        busy = (int(self.header[HEAD_SLOT]), int(self.header[PIN]))
+        slot = (busy[0] + 1) % self.slots
+        while slot in busy:
+            slot = (slot + 1) % self.slots
+        return slot
+
+    def write(self, frames, stamp=None):
+        """
+        Write frames as the latest of the channel.
+
+        Args
+        ----
+            frames (list): the uint8 images
+            stamp (float): the capture time of the frames in seconds
+
+        Returns
+        -------
+            seq (int): the sequence number of the write
+
+        """
+        if len(frames) > self.max_frames:
+            raise ValueError(
+                f'{len(frames)} frames do not fit a slot of {self.max_frames}')
+        for frame in frames:
+            if frame.nbytes > self.frame_bytes:
+                raise ValueError(
+                    f'A frame of {frame.nbytes} bytes does not fit a slot of '
+                    f'{self.frame_bytes} bytes')
+        while True:
+            slot = self.free_slot()
+            slot_header = self.slot_headers[slot]
+            slot_header[SEQ] = -1
+            # the reader may have pinned the slot in the meantime
+            if self.header[PIN] != slot:
+                break
+            slot_header[SEQ] = 0
+        data = self.slot_data[slot]
+        for i, frame in enumerate(frames):
+            shape = frame.shape + (1,) * (3 - frame.ndim)
+            slot_header[SHAPES + 3*i:SHAPES + 3*i + 3] = shape
+            data[i, :frame.nbytes] = np.ascontiguousarray(
+                frame, dtype=np.uint8).reshape(-1)
+        slot_header[COUNT] = len(frames)
+        slot_header[STAMP] = -1 if stamp is None else round(stamp * 1e9)
+        seq = int(self.header[HEAD]) + 1
+        slot_header[SEQ] = seq
+        self.header[HEAD_SLOT] = slot
+        self.header[HEAD] = seq
+        self.header[WRITES] += 1
+        return seq
+
+    def read(self, last_seq=None):
+        """
+        Pin the latest write and return views of its frames.
+
+        The views stay valid until the next call of read that returns new
+        frames. They are read only, copy them to keep them longer. The
+        capture time of the frames is then in last_stamp.
+
+        Args
+        ----
+            last_seq (int): the sequence number of the frames read last,
+                the last read of this channel by default
+
+        Returns
+        -------
+            seq (int): the sequence number of the frames
+            frames (list): views of the frames, or None if there is no
+                write newer than last_seq
+
+        """
+        if last_seq is None:
+            last_seq = self.last_seq
+        # the slot behind the views of the last read, kept pinned until
+        # newer frames are pinned in its place
+        pinned = int(self.header[PIN])
+        for _ in range(self.slots):
+            seq = int(self.header[HEAD])
+            if seq <= last_seq:
+                return last_seq, None
+            slot = int(self.header[HEAD_SLOT])
+            slot_header = self.slot_headers[slot]
+            if slot_header[SEQ] != seq:
+                continue
+            self.header[PIN] = slot
+            if slot_header[SEQ] == seq:
+                break
+            self.header[PIN] = pinned
+        else:
+            # the writer is much faster than this reader
+            return last_seq, None
+        frames = []
+        for i in range(int(slot_header[COUNT])):
+            h, w, c = (int(v) for v in slot_header[SHAPES + 3*i:
+                                                   SHAPES + 3*i + 3])
+            frame = self.slot_data[slot][i, :h * w * c].reshape(h, w, c)
+            frame = frame[:, :, 0] if c == 1 else frame
+            frame.flags.writeable = False
+            frames.append(frame)
+        self.skipped += max(seq - last_seq - 1, 0)
+        self.last_seq = seq
+        stamp = int(slot_header[STAMP])
+        self.last_stamp = None if stamp < 0 else stamp * 1e-9
+        return seq, frames
+
+    def close(self):
+        """Detach from the channel, and free it if this is the writer."""
+        if self.header is None:
+            return
+        if self.owner:
+            self.header[MAGIC] = 0
+        else:
+            self.header[PIN] = -1
+        self.header = None
+        self.slot_headers = None
+        self.slot_data = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # views of the frames are still in use, the block is unmapped
+            # when they are gone
+            pass
+        if self.owner:
+            self.shm.unlink()
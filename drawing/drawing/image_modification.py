@@ -6,27 +6,96 @@ Subscribers
     ocr_run: std_msgs/msg/Bool - Value used to switch states of the system
     camera/color/image_raw: sensor_msgs/msg/Image - RGB image obtained from
     the camera
+    camera/color/camera_info: sensor_msgs/msg/CameraInfo - Calibration of
+    the camera, to undistort the board and in the tags rectification mode
 
 Publishers
 ----------
     modified_image_1: sensor_msgs/msg/Image - Modified image for word
-    recognition
+    recognition, stamped with the capture time of the camera image
     modified_image_2: sensor_msgs/msg/Image - Modified image for character
-    recognition
+    recognition, stamped with the capture time of the camera image
+    debug/board: sensor_msgs/msg/Image - The resized frame with the board
+    outline, when publish_debug is set
+    diagnostics: diagnostic_msgs/msg/DiagnosticArray - Mean time of each
+    preprocessing stage, frame rate, and how often the board was searched
+    for, tracked, and its warp maps rebuilt, and the camera images dropped
+    and their age when processed.
+
+Parameters
+----------
+    headless: bool - Run without the trackbar and image windows, the
+    preprocessing values then come from the parameters below. Only headless
+    are the camera images taken in on another thread while one is processed.
+    publish_debug: bool - Publish the debug images as topics.
+    track_board: bool - Track the board across frames with optical flow and
+    reuse its warp maps, instead of searching every frame for it.
+    rectification_mode: string - "contour" to find the board by its outline,
+    or "tags" to warp it with the homography from the board frame of the
+    AprilTags and the camera intrinsics. Until that pose is known the
+    outline is used.
+    camera_frame: string - The optical frame of the camera.
+    board_frame: string - The frame on the board, published by Tags.
+    board_region: double[] - The (x0, y0, x1, y1) corners of the rectified
+    region in meters in the board frame.
+    pixels_per_meter: double - The resolution of the rectified board.
+    undistort: bool - Undo the lens distortion of the raw image in the warp
+    of the board, so no separately rectified image is needed.
+    image_channel: string - The shared memory image channel to also write
+    the crops to, empty for none. With a channel the modified_image topics
+    are only published while something subscribes to them.
+    canny_min: int - Lower hysteresis threshold of the edge detection.
+    canny_max: int - Upper hysteresis threshold of the edge detection.
+    kernel: int - Odd size of the blur before edge detection.
+    kernel_cropped: int - Odd size of the blur of the warped board.
+    dilate_kernel: int - Size of the dilation of the letter strokes.
+    max_frame_age: double - Seconds after capture a camera image is too old
+    to process, zero for no bound.
+    ocr_slots: bool - Crop the ink of the letter and word slots of the
+    board instead of sending the whole board to both OCR paths. A path
+    without a guess in its slot gets a 1x1 crop, which the OCR node skips.
+    slot_layout: double[] - The (x0, y0, x1, y1) of the letter slot then of
+    the word slot, as fractions of the warped board. Required with
+    ocr_slots, as the slots depend on how the board is laid out.
+    slot_min_ink: double - The fraction of a slot the ink has to cover.
+
+The preprocessing parameters can be changed while the node runs.
+
+The camera image is only kept until the next one arrives. The images are
+processed in their own callback, and the newest image is taken whenever
+the last one is done, so the node never works through a backlog of stale
+images.
 """
 
 import rclpy
+from rclpy.callback_groups import MutuallyExclusiveCallbackGroup
+from rclpy.executors import MultiThreadedExecutor, \
+    SingleThreadedExecutor
 from rclpy.node import Node
+from rclpy.qos import HistoryPolicy, QoSProfile, ReliabilityPolicy
+from rclpy.parameter import Parameter
+from rcl_interfaces.msg import SetParametersResult
 from enum import Enum, auto
 
-import numpy as np
-import imutils
-from imutils.perspective import four_point_transform
-
 from cv_bridge import CvBridge
 import cv2
-
-from sensor_msgs.msg import Image
+import imutils
+import numpy as np
+from tf2_ros.buffer import Buffer
+from tf2_ros.transform_listener import TransformListener
+import tf2_ros
+
+from drawing.board_preprocess import board_crops, find_board, \
+    PreprocessParams
+from drawing.board_rectification import BoardRectifier
+from drawing.board_slots import SlotCropper
+from drawing.board_tracker import BoardTracker, LatencyStats
+from drawing.frame_ingest import FrameAge, LatestFrame, stamp_seconds
+from drawing.image_channel import ImageChannel
+from drawing.grid import array_to_transform_matrix
+
+from diagnostic_msgs.msg import DiagnosticArray, DiagnosticStatus, KeyValue
+from sensor_msgs.msg import CameraInfo, Image
 from std_msgs.msg import Bool
 
 
@@ -68,6 +137,20 @@ def kernel_cropped(x):
     cv2.setTrackbarPos('Kernel_Cropped', 'Parameters', x)
 
 
+# keep only the newest camera image, a late one is not worth resending
+LATEST_QOS = QoSProfile(history=HistoryPolicy.KEEP_LAST, depth=1,
+                        reliability=ReliabilityPolicy.BEST_EFFORT)
+
+# the preprocessing parameters and their trackbars
+TRACKBARS = {
+    'canny_min': 'Canny_T_min',
+    'canny_max': 'Canny_T_max',
+    'kernel': 'Kernel',
+    'kernel_cropped': 'Kernel_Cropped',
+    'dilate_kernel': 'Dilate_Kernel',
+}
+
+
 class ImageModification(Node):
     """This node modifies images for OCR using opencv."""
 
@@ -80,10 +163,15 @@ class ImageModification(Node):
         # create subscriber to set state
         self.game_state = self.create_subscription(
             Bool, "/ocr_run", self.game_state_callback, qos_profile=10)
-        # create subscriber to get image
+        # create subscriber to get image, the newest image is processed
+        # whenever the last one is done
+        self.latest = LatestFrame()
+        self.process_trigger = self.create_guard_condition(
+            self.image_modification)
         self.cap = self.create_subscription(
-            Image, "camera/color/image_raw",
-            self.image_modification, qos_profile=10)
+            Image, "camera/color/image_raw", self.image_callback,
+            qos_profile=LATEST_QOS,
+            callback_group=MutuallyExclusiveCallbackGroup())
 
         # create publisher to publish modified image
         self.modified_image_1_publish = self.create_publisher(
@@ -91,25 +179,218 @@ class ImageModification(Node):
         self.modified_image_2_publish = self.create_publisher(
             Image, "modified_image_2", 10)
 
-        # create trackbars to tune cv parameters
-        cv2.namedWindow('Parameters')
-        cv2.createTrackbar('Canny_T_min', 'Parameters', 0, 255, nothing)
-        cv2.createTrackbar('Canny_T_max', 'Parameters', 0, 255, nothing)
-        cv2.createTrackbar('Kernel', 'Parameters', 1, 31, kernel)
-        cv2.createTrackbar('Kernel_Cropped', 'Parameters',
-                           1, 31, kernel_cropped)
-        cv2.createTrackbar('Dilate_Kernel', 'Parameters', 1, 30, nothing)
-
-        # set default trackbar positions
-        cv2.setTrackbarPos('Kernel', 'Parameters', 5)
-        cv2.setTrackbarPos('Kernel_Cropped', 'Parameters', 5)
-        cv2.setTrackbarPos('Dilate_Kernel', 'Parameters', 2)
-        cv2.setTrackbarPos('Canny_T_min', 'Parameters', 50)
-        cv2.setTrackbarPos('Canny_T_max', 'Parameters', 150)
+        # declare and define parameters
+        self.declare_parameter('headless', False)
+        self.param_headless = self.get_parameter(
+            'headless').get_parameter_value().bool_value
+        self.declare_parameter('publish_debug', False)
+        self.param_publish_debug = self.get_parameter(
+            'publish_debug').get_parameter_value().bool_value
+        self.declare_parameter('max_frame_age', 1.0)
+        self.age = FrameAge(self.get_parameter(
+            'max_frame_age').get_parameter_value().double_value)
+        self.declare_parameter('track_board', True)
+        self.param_track_board = self.get_parameter(
+            'track_board').get_parameter_value().bool_value
+        self.params = PreprocessParams()
+        for name in TRACKBARS:
+            self.declare_parameter(name, getattr(self.params, name))
+            setattr(self.params, name, self.get_parameter(
+                name).get_parameter_value().integer_value)
+        self.add_on_set_parameters_callback(self.parameters_callback)
+
+        if self.param_publish_debug:
+            self.debug_board_publish = self.create_publisher(
+                Image, "debug/board", 10)
+
+        # follow the board across frames and time the preprocessing
+        self.tracker = BoardTracker(self.params)
+
+        # or warp it with the pose of the board from the tags
+        self.declare_parameter('rectification_mode', 'contour')
+        self.param_rectification_mode = self.get_parameter(
+            'rectification_mode').get_parameter_value().string_value
+        self.declare_parameter('camera_frame', 'camera_color_optical_frame')
+        self.param_camera_frame = self.get_parameter(
+            'camera_frame').get_parameter_value().string_value
+        self.declare_parameter('board_frame', 'board')
+        self.param_board_frame = self.get_parameter(
+            'board_frame').get_parameter_value().string_value
+        self.declare_parameter('board_region', [0.0, 0.0, 0.8, 0.4])
+        self.param_board_region = self.get_parameter(
+            'board_region').get_parameter_value().double_array_value
+        self.declare_parameter('pixels_per_meter', 600.0)
+        self.param_pixels_per_meter = self.get_parameter(
+            'pixels_per_meter').get_parameter_value().double_value
+        self.rectifier = BoardRectifier(
+            self.params, self.param_board_region,
+            self.param_pixels_per_meter)
+        if self.param_rectification_mode == 'tags':
+            self.buffer = Buffer()
+            self.listener = TransformListener(self.buffer, self)
+            self.pose_poll = self.create_timer(0.2, self.pose_timer)
+        elif self.param_rectification_mode != 'contour':
+            self.get_logger().error(
+                "rectification_mode is contour or tags, not "
+                f"{self.param_rectification_mode}, using contour")
+
+        # cut the crops down to the ink in the slots of the board
+        self.declare_parameter('ocr_slots', False)
+        self.declare_parameter('slot_layout', Parameter.Type.DOUBLE_ARRAY)
+        self.declare_parameter('slot_min_ink', 0.002)
+        self.slots = None
+        if self.get_parameter('ocr_slots').get_parameter_value().bool_value:
+            layout = self.get_parameter(
+                'slot_layout').get_parameter_value().double_array_value
+            if len(layout) != 8:
+                raise ValueError(
+                    "ocr_slots needs slot_layout, 8 values x0 y0 x1 y1 of "
+                    "the letter slot and of the word slot as fractions of "
+                    f"the board, got {list(layout)}")
+            self.slots = SlotCropper(
+                (tuple(layout[:4]), tuple(layout[4:])),
+                min_area=self.get_parameter(
+                    'slot_min_ink').get_parameter_value().double_value)
+
+        # hand the crops to the OCR node through shared memory
+        self.declare_parameter('image_channel', '')
+        self.param_image_channel = self.get_parameter(
+            'image_channel').get_parameter_value().string_value
+        self.channel = None
+        if self.param_image_channel:
+            self.channel = ImageChannel(self.param_image_channel, create=True)
+
+        # undistort and warp the raw image in one remap
+        self.declare_parameter('undistort', True)
+        self.param_undistort = self.get_parameter(
+            'undistort').get_parameter_value().bool_value
+        if self.param_undistort or self.param_rectification_mode == 'tags':
+            self.camera_info = self.create_subscription(
+                CameraInfo, "camera/color/camera_info",
+                self.camera_info_callback, qos_profile=10)
+        self.latency = LatencyStats()
+        self.diagnostics = self.create_publisher(
+            DiagnosticArray, "/diagnostics", 10)
+        self.diagnostics_poll = self.create_timer(
+            1.0, self.diagnostics_timer)
+
+        if not self.param_headless:
+            # create trackbars to tune cv parameters
+            cv2.namedWindow('Parameters')
+            cv2.createTrackbar('Canny_T_min', 'Parameters', 0, 255, nothing)
+            cv2.createTrackbar('Canny_T_max', 'Parameters', 0, 255, nothing)
+            cv2.createTrackbar('Kernel', 'Parameters', 1, 31, kernel)
+            cv2.createTrackbar('Kernel_Cropped', 'Parameters',
+                               1, 31, kernel_cropped)
+            cv2.createTrackbar('Dilate_Kernel', 'Parameters', 1, 30, nothing)
+
+            # set default trackbar positions
+            for name, trackbar in TRACKBARS.items():
+                cv2.setTrackbarPos(
+                    trackbar, 'Parameters', getattr(self.params, name))
 
         # define instance attributes
         self.state = State.STOPPED
 
+    def parameters_callback(self, params):
+        """Check and apply new preprocessing values."""
+        for param in params:
+            if param.name not in TRACKBARS:
+                continue
+            if param.type_ != Parameter.Type.INTEGER:
+                return SetParametersResult(
+                    successful=False, reason=f"{param.name} is an integer")
+            value = param.value
+            if param.name.startswith('canny') and not 0 <= value <= 255:
+                return SetParametersResult(
+                    successful=False,
+                    reason=f"{param.name} is between 0 and 255")
+            if param.name.startswith('kernel') and \
+               (value < 1 or value % 2 == 0):
+                return SetParametersResult(
+                    successful=False,
+                    reason=f"{param.name} is a positive odd number")
+            if param.name == 'dilate_kernel' and value < 1:
+                return SetParametersResult(
+                    successful=False, reason="dilate_kernel is positive")
+        for param in params:
+            if param.name in TRACKBARS:
+                setattr(self.params, param.name, param.value)
+                if not self.param_headless:
+                    cv2.setTrackbarPos(
+                        TRACKBARS[param.name], 'Parameters', param.value)
+        return SetParametersResult(successful=True)
+
+    def camera_info_callback(self, msg):
+        """Set the camera calibration of the warps."""
+        camera_matrix = np.array(msg.k).reshape(3, 3)
+        distortion = np.array(msg.d) if self.param_undistort else None
+        if self.param_undistort:
+            self.tracker.set_camera(camera_matrix, distortion)
+        self.rectify(lambda: self.rectifier.set_camera(
+            camera_matrix, distortion))
+
+    def pose_timer(self):
+        """Look up the pose of the board in the camera frame."""
+        try:
+            trans = self.buffer.lookup_transform(
+                self.param_camera_frame, self.param_board_frame,
+                rclpy.time.Time())
+        except (tf2_ros.LookupException, tf2_ros.ConnectivityException,
+                tf2_ros.ExtrapolationException):
+            # the tags have not been seen yet
+            return
+        transl = trans.transform.translation
+        rot = trans.transform.rotation
+        camera_board = array_to_transform_matrix(
+            [transl.x, transl.y, transl.z],
+            np.array([rot.x, rot.y, rot.z, rot.w]))
+        self.rectify(lambda: self.rectifier.set_pose(camera_board))
+
+    def rectify(self, update):
+        """Update the rectification, logging when the maps are rebuilt."""
+        try:
+            if update():
+                self.get_logger().info(
+                    "Rebuilt the board rectification maps")
+        except ValueError as e:
+            self.get_logger().warn(f"Cannot rectify the board: {e}")
+
+    def board_images(self, params, timings):
+        """
+        Find the board in the current frame and crop it.
+
+        Returns
+        -------
+            resized (np.array): the resized frame, None if not needed
+            board (np.array): the corners of the board in the resized
+                frame, or None
+            binary_image, inverted_image: the crops, or None, None
+
+        """
+        debug = not self.param_headless or self.param_publish_debug
+        if self.param_rectification_mode == 'tags' and self.rectifier.ready:
+            self.rectifier.params = params
+            binary_image, inverted_image = self.rectifier.crops(
+                self.frame, timings)
+            if not debug:
+                return None, None, binary_image, inverted_image
+            resized = imutils.resize(self.frame, height=500)
+            scale = resized.shape[0] / self.frame.shape[0]
+            board = (self.rectifier.corners() * scale).astype(int)
+            return resized, board, binary_image, inverted_image
+        if self.param_track_board:
+            self.tracker.params = params
+            resized, board, binary_image, inverted_image = \
+                self.tracker.update(self.frame, timings)
+            if board is not None:
+                board = board.astype(int)
+            return resized, board, binary_image, inverted_image
+        resized, gray, board = find_board(self.frame, params, timings)
+        if board is None:
+            return resized, None, None, None
+        return (resized, board) + board_crops(gray, board, params, timings)
+
     def game_state_callback(self, msg):
         """Toggles the state of the system."""
         if msg.data:
@@ -118,122 +399,153 @@ class ImageModification(Node):
         else:
             self.state = State.STOPPED
             # self.get_logger().info("Stopping")
-            cv2.destroyWindow('Recognition')
-            cv2.destroyWindow('image')
-
-    def image_modification(self, msg):
-        """Pre-process the image for OCR."""
+            # the board may be moved before the next start
+            self.tracker.reset()
+            if not self.param_headless:
+                cv2.destroyWindow('Recognition')
+                cv2.destroyWindow('image')
+
+    def now(self):
+        """Return the time of the node clock in seconds."""
+        return self.get_clock().now().nanoseconds * 1e-9
+
+    def image_callback(self, msg):
+        """Keep the newest camera image, dropping an unprocessed one."""
+        if self.state == State.START:
+            self.latest.put(msg, stamp_seconds(msg.header.stamp))
+            self.process_trigger.trigger()
+
+    def image_modification(self):
+        """Pre-process the newest image for OCR."""
+        msg, stamp = self.latest.take()
+        if msg is None or not self.age.fresh(stamp, self.now()):
+            return
         if self.state == State.START:
             # convert image to opencv format
             self.frame = self.cv_bridge.imgmsg_to_cv2(msg, "bgr8")
 
-            # fetch trackbar positions for tuning
-            c_min = cv2.getTrackbarPos('Canny_T_min', 'Parameters')
-            c_max = cv2.getTrackbarPos('Canny_T_max', 'Parameters')
-            k_size = cv2.getTrackbarPos('Kernel', 'Parameters')
-            k_size_2 = cv2.getTrackbarPos('Kernel_Cropped', 'Parameters')
-            d_k_size = cv2.getTrackbarPos('Dilate_Kernel', 'Parameters')
-
-            # resize the image
-            resized_image = imutils.resize(self.frame, height=500)
-            # cv2.imshow("resized_image", resized_image)
-
-            # convert image to grayscale
-            gray = cv2.cvtColor(resized_image, cv2.COLOR_BGR2GRAY)
-            # cv2.imshow("gray", gray)
-
-            # blur image
-            blurred = cv2.GaussianBlur(gray, (k_size, k_size), 0)
-            # cv2.imshow("blurred", blurred)
-
-            # edge detection
-            edged = cv2.Canny(blurred, c_min, c_max)
-            # cv2.imshow("edged", edged)
-
-            # find contours in the edge map, then sort them by their
-            # size in descending order
-            cnts = cv2.findContours(edged.copy(), cv2.RETR_EXTERNAL,
-                                    cv2.CHAIN_APPROX_SIMPLE)
-            cnts = imutils.grab_contours(cnts)
-            cnts = sorted(cnts, key=cv2.contourArea, reverse=True)
-            displayCnt = None
-
-            # loop over the contours
-            for c in cnts:
-                # approximate the contour
-                peri = cv2.arcLength(c, True)
-                approx = cv2.approxPolyDP(c, 0.01 * peri, True)
-                # if the contour has four vertices
-                # identify it as the whiteboard
-                if len(approx) == 4:
-                    displayCnt = approx
-                    cv2.drawContours(
-                        resized_image, [displayCnt], 0, (0, 255, 0), 2)
-                    break
+            if self.param_headless:
+                params = self.params
+            else:
+                # fetch trackbar positions for tuning
+                params = PreprocessParams(**{
+                    name: cv2.getTrackbarPos(trackbar, 'Parameters')
+                    for name, trackbar in TRACKBARS.items()})
 
-            # display captured frame with drawn contour
-            cv2.imshow("image", resized_image)
-
-            # extract the bounded whiteboard region and
-            # apply a perspective transform
+            timings = {}
             try:
-                # apply 4 point transform on the contour in the grayscale image
-                warped = four_point_transform(gray, displayCnt.reshape(4, 2))
-                # cv2.imshow("warped", warped)
-
-                # crop the borders of the image to remove inconsistencies
-                height, width = warped.shape
-                border = int(0.05*min(height, width))
-                x1 = border
-                y1 = border
-                x2 = width - border
-                y2 = height - border
-                cropped = warped[y1:y2, x1:x2]
-
-                # blur the cropped image
-                cropped = cv2.GaussianBlur(cropped, (k_size_2, k_size_2), 0)
-
-                # inv binarise the blurred image
-                binarised = cv2.adaptiveThreshold(
-                    cropped, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                    cv2.THRESH_BINARY_INV, 7, 2)
-                # cv2.imshow("binarised", binarised)
-
-                # dilate the image to widen letter strokes
-                kernel = np.ones((d_k_size, d_k_size), np.uint8)
-                dilation = cv2.dilate(binarised, kernel, iterations=1)
-
-                # invert the inv dilated image
-                inverted_image = cv2.bitwise_not(dilation)
-                # cv2.imshow("Letter_Recognition", inverted_image)
-
-                # invert the inv binarised image
-                binary_image = cv2.bitwise_not(binarised)
-                # cv2.imshow("Word_Recognition", binary_image)
-
-                # Create a named window that alllows resizing
-                cv2.namedWindow('Recognition', cv2.WINDOW_NORMAL)
-
-                # Resize the window to the specified height and width
-                cv2.resizeWindow('Recognition', 400, 290)
-
-                # display modified image
-                cv2.imshow("Recognition", binary_image)
+                resized_image, displayCnt, binary_image, inverted_image = \
+                    self.board_images(params, timings)
+            except cv2.error:
+                # the trackbars can briefly hold invalid values
+                resized_image = displayCnt = binary_image = None
+            show = not self.param_headless
+            if displayCnt is not None and (show or self.param_publish_debug):
+                cv2.drawContours(
+                    resized_image, [displayCnt], 0, (0, 255, 0), 2)
 
+            # display captured frame with drawn contour
+            if resized_image is not None:
+                if show:
+                    cv2.imshow("image", resized_image)
+                if self.param_publish_debug:
+                    self.debug_board_publish.publish(
+                        self.cv_bridge.cv2_to_imgmsg(resized_image, "bgr8"))
+
+            # the bounded whiteboard region with a perspective transform
+            if binary_image is not None:
+                if self.slots is not None:
+                    letter_crop, word_crop = self.slots.crops(
+                        binary_image, inverted_image)
+                else:
+                    letter_crop, word_crop = binary_image, inverted_image
+                if show:
+                    # Create a named window that alllows resizing
+                    cv2.namedWindow('Recognition', cv2.WINDOW_NORMAL)
+
+                    # Resize the window to the specified height and width
+                    cv2.resizeWindow('Recognition', 400, 290)
+
+                    # display modified image
+                    cv2.imshow("Recognition", binary_image)
+
+                if self.channel is not None:
+                    try:
+                        self.channel.write([letter_crop, word_crop], stamp)
+                    except ValueError as e:
+                        self.get_logger().warn(
+                            f"Crops not shared: {e}", throttle_duration_sec=5)
+                self.publish_images(letter_crop, word_crop, msg.header)
+            self.latency.add(timings)
+
+            if show:
+                cv2.waitKey(30)
+
+    def publish_images(self, binary_image, inverted_image, header):
+        """Publish the crops, with a channel only to their subscribers."""
+        for image, publisher in (
+                (binary_image, self.modified_image_1_publish),
+                (inverted_image, self.modified_image_2_publish)):
+            if self.channel is None or publisher.get_subscription_count():
                 # convert images to msg format and publish
-                img_publish_1 = self.cv_bridge.cv2_to_imgmsg(binary_image)
-                self.modified_image_1_publish.publish(img_publish_1)
-                img_publish_2 = self.cv_bridge.cv2_to_imgmsg(inverted_image)
-                self.modified_image_2_publish.publish(img_publish_2)
-
-            except Exception:
-                pass
-
-            cv2.waitKey(30)
+                publisher.publish(
+                    self.cv_bridge.cv2_to_imgmsg(image, header=header))
+
+    def destroy_node(self):
+        """Free the image channel with the node."""
+        if self.channel is not None:
+            self.channel.close()
+        super().destroy_node()
+
+    def diagnostics_timer(self):
+        """Publish the preprocessing latency and the board tracking."""
+        stage_ms, fps = self.latency.report()
+        status = DiagnosticStatus()
+        status.name = f"{self.get_name()}: preprocessing"
+        status.hardware_id = "image_modification"
+        status.level = DiagnosticStatus.OK
+        status.message = "running" if self.state == State.START \
+            else "stopped"
+        values = {f'{stage}_ms': round(ms, 2)
+                  for stage, ms in stage_ms.items()}
+        values['fps'] = round(fps, 2)
+        mean_age, max_age = self.age.report()
+        values['frame_age_ms'] = round(mean_age, 1)
+        values['frame_age_max_ms'] = round(max_age, 1)
+        values['frames_received'] = self.latest.received
+        values['frames_dropped'] = self.latest.dropped
+        values['frames_stale'] = self.age.stale
+        if self.slots is not None:
+            values['letter_crops'] = self.slots.letters
+            values['word_crops'] = self.slots.words
+            values['empty_boards'] = self.slots.empty
+        values['detections'] = self.tracker.detections
+        values['tracked'] = self.tracker.tracked
+        values['map_rebuilds'] = self.tracker.rebuilds
+        if self.channel is not None:
+            values['channel_seq'] = self.channel.seq
+        if self.param_rectification_mode == 'tags':
+            values['rectified'] = self.rectifier.ready
+            values['rectification_rebuilds'] = self.rectifier.rebuilds
+        status.values = [KeyValue(key=k, value=str(v))
+                         for k, v in values.items()]
+        msg = DiagnosticArray()
+        msg.header.stamp = self.get_clock().now().to_msg()
+        msg.status = [status]
+        self.diagnostics.publish(msg)
 
 
 def main(args=None):
     rclpy.init(args=args)
     node = ImageModification()
-    rclpy.spin(node)
+    # the camera images are taken in while the last one is processed, but
+    # the HighGUI windows only work from the thread that created them
+    if node.param_headless:
+        executor = MultiThreadedExecutor()
+    else:
+        executor = SingleThreadedExecutor()
+    try:
+        rclpy.spin(node, executor)
+    finally:
+        node.destroy_node()
     rclpy.shutdown()
@@ -6,7 +6,8 @@
 
 Parameters
 ----------
-mode, position
+simplify_tolerance (double) - Tolerance in metres for dropping points from a
+component before it is sent to where_to_write.
 
 Services:
 --------
@@ -26,6 +27,8 @@ from std_srvs.srv import Empty
 
 from brain_interfaces.srv import BoardTiles, MovePose, Cartesian
 
+from drawing.polyline import simplify_board_points
+
 
 class Kickstart(Node):
     """The kickstart node sets up the hangman game."""
@@ -37,6 +40,10 @@ class Kickstart(Node):
         self.kickstart_service = self.create_service(
             Empty, 'kickstart_service', self.kickstart_callback)
 
+        self.declare_parameter('simplify_tolerance', 0.0002)
+        self.simplify_tolerance = self.get_parameter(
+            'simplify_tolerance').get_parameter_value().double_value
+
         # create mutually exclusive callback groups
         self.cal_callback_group = MutuallyExclusiveCallbackGroup()
         self.tile_callback_group = MutuallyExclusiveCallbackGroup()
@@ -115,9 +122,13 @@ class Kickstart(Node):
             request = BoardTiles.Request()
             request.mode = mode
             request.position = position
-            request.x = dash_x
-            request.y = dash_y
+            x, y, onboard, removed = simplify_board_points(
+                dash_x, dash_y, dash_on, self.simplify_tolerance)
+            request.x = x.tolist()
+            request.y = y.tolist()
+            dash_on = onboard.tolist()
             request.onboard = dash_on
+            self.get_logger().info(f"Simplified dash: removed {removed}")
 
             # denote pose_list and initial_pose from BoardTiles response
             resp = await self.tile_client.call_async(request)
@@ -155,9 +166,13 @@ class Kickstart(Node):
             request = BoardTiles.Request()
             request.mode = mode
             request.position = position
-            request.x = stand_x
-            request.y = stand_y
+            x, y, onboard, removed = simplify_board_points(
+                stand_x, stand_y, stand_on, self.simplify_tolerance)
+            request.x = x.tolist()
+            request.y = y.tolist()
+            stand_on = onboard.tolist()
             request.onboard = stand_on
+            self.get_logger().info(f"Simplified stand: removed {removed}")
 
             # denote pose_list and initial_pose from BoardTiles response
             resp = await self.tile_client.call_async(request)
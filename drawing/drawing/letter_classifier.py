@@ -0,0 +1,179 @@
+"""
+Fast classifier for a single upper case letter.
+
+The letter crop only ever holds one of 26 letters, so before PaddleOCR runs
+the crop goes through a nearest neighbour classifier on downsampled pixels:
+the ink is cut out by its bounding box, padded to a square and shrunk to
+size x size pixels, and the normalized pixels are compared with those of
+known letters by cosine similarity. The k most similar known letters vote,
+weighted by similarity. The confidence is the share of the vote of the
+winner times the similarity of the nearest known letter, so crops unlike
+every known letter, such as a whole word, get a low confidence.
+
+The known letters are either rendered with the OpenCV Hershey fonts or
+loaded from a folder of labeled crops, with one sub folder per letter:
+
+    crops/A/0001.png
+    crops/B/0001.png
+"""
+
+import os
+import string
+
+import cv2
+import numpy as np
+
+
+FONTS = (cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_DUPLEX,
+         cv2.FONT_HERSHEY_COMPLEX, cv2.FONT_HERSHEY_TRIPLEX,
+         cv2.FONT_HERSHEY_PLAIN)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.pgm')
+
+
+def letter_features(image, size=16):
+    """
+    Compute the features of a letter crop.
+
+    Args
+    ----
+        image (np.array): a grayscale or BGR crop of one letter, dark on
+            light or light on dark
+        size (int): the side of the downsampled letter
+
+    Returns
+    -------
+        features (np.array): size * size float32 values with zero mean and
+            unit norm, all zeros if the crop has no ink
+
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    _, ink = cv2.threshold(image, 0, 255,
+                           cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    # the ink is the smaller part of the crop
+    if cv2.countNonZero(ink) > ink.size // 2:
+        ink = cv2.bitwise_not(ink)
+    points = cv2.findNonZero(ink)
+    if points is None:
+        return np.zeros(size * size, dtype=np.float32)
+    x, y, w, h = cv2.boundingRect(points)
+    side = max(w, h)
+    square = np.zeros((side, side), dtype=np.uint8)
+    top, left = (side - h) // 2, (side - w) // 2
+    square[top:top + h, left:left + w] = ink[y:y + h, x:x + w]
+    small = cv2.resize(square, (size, size), interpolation=cv2.INTER_AREA)
+    features = small.astype(np.float32).reshape(-1)
+    features -= features.mean()
+    norm = np.linalg.norm(features)
+    return features / norm if norm > 0 else features
+
+
+def render_letter(letter, font, thickness, height=64):
+    """Render a dark letter on a light square image."""
+    image = np.full((height, height), 255, dtype=np.uint8)
+    # scale the font so a capital letter is half the image high
+    (_, cap), _ = cv2.getTextSize('H', font, 1.0, thickness)
+    scale = height / 2 / cap
+    (w, h), _ = cv2.getTextSize(letter, font, scale, thickness)
+    origin = ((height - w) // 2, (height + h) // 2)
+    cv2.putText(image, letter, origin, font, scale, 0, thickness,
+                cv2.LINE_AA)
+    return image
+
+
+def template_images():
+    """Return rendered images and labels of all letters in all fonts."""
+    images = []
+    labels = []
+    for letter in string.ascii_uppercase:
+        for font in FONTS:
+            for thickness in (1, 2, 4):
+                images.append(render_letter(letter, font, thickness))
+                labels.append(letter)
+    return images, labels
+
+
+def load_labeled_folder(directory):
+    """
+    Load the labeled crops in a folder.
+
+    Returns
+    -------
+        images (list): the grayscale crops
+        labels (list): the letter of each crop
+
+    """
+    images = []
+    labels = []
+    for letter in sorted(os.listdir(directory)):
+        folder = os.path.join(directory, letter)
+        if len(letter) != 1 or letter.upper() not in string.ascii_uppercase \
+           or not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            image = cv2.imread(os.path.join(folder, name),
+                               cv2.IMREAD_GRAYSCALE)
+            if image is not None:
+                images.append(image)
+                labels.append(letter.upper())
+    return images, labels
+
+
+class LetterClassifier:
+    """A k nearest neighbour classifier of letter crops."""
+
+    def __init__(self, images, labels, k=5, size=16):
+        """
+        Create a classifier from known letters.
+
+        Args
+        ----
+            images (list): crops of known letters
+            labels (list): the letter of each crop
+            k (int): the number of neighbours that vote
+            size (int): the side of the downsampled letters
+
+        """
+        self.k = min(k, len(images))
+        self.size = size
+        self.features = np.stack(
+            [letter_features(image, size) for image in images])
+        self.labels = np.array(
+            [ord(label) - ord('A') for label in labels], dtype=np.intp)
+
+    @classmethod
+    def from_templates(cls, k=5, size=16):
+        """Create a classifier from letters rendered with OpenCV fonts."""
+        return cls(*template_images(), k=k, size=size)
+
+    @classmethod
+    def from_folder(cls, directory, k=5, size=16):
+        """Create a classifier from a folder of labeled crops."""
+        images, labels = load_labeled_folder(directory)
+        if not images:
+            raise ValueError(f'There are no labeled crops in {directory}')
+        return cls(images, labels, k=k, size=size)
+
+    def classify(self, image):
+        """
+        Classify a letter crop.
+
+        Returns
+        -------
+            letter (str): the most likely letter
+            confidence (float): between 0 and 1, 0 if the crop has no ink
+
+        """
+        features = letter_features(image, self.size)
+        similarity = self.features @ features
+        nearest = np.argpartition(-similarity, self.k - 1)[:self.k]
+        weights = np.clip(similarity[nearest], 0.0, None)
+        votes = np.bincount(self.labels[nearest], weights=weights,
+                            minlength=26)
+        best = int(np.argmax(votes))
+        total = votes.sum()
+        confidence = float(votes[best] / total) if total > 0 else 0.0
+        confidence *= float(max(similarity[nearest].max(), 0.0))
+        return chr(ord('A') + best), confidence
@@ -0,0 +1,131 @@
+"""
+Offline evaluation of the letter recognition paths.
+
+Runs every crop of a folder of labeled letter crops through the fast
+LetterClassifier and, with --paddle, through PaddleOCR and through the two
+together the way the OCR node uses them: PaddleOCR only when the fast path
+is less confident than the threshold. Reports the accuracy and the per
+frame latency of each path as JSON.
+
+The folder has one sub folder per letter, e.g. crops/A/0001.png.
+
+Run with: ros2 run drawing letter_eval crops --paddle
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from drawing.letter_classifier import LetterClassifier, load_labeled_folder
+
+
+def latency_report(latencies):
+    """Return the mean and tail of latencies in milliseconds."""
+    latencies = np.array(latencies or [0.0]) * 1000
+    return {
+        'mean': float(latencies.mean()),
+        'p50': float(np.percentile(latencies, 50)),
+        'p95': float(np.percentile(latencies, 95)),
+    }
+
+
+def paddle_letter(paddle_ocr, image):
+    """Read a single letter with PaddleOCR as the OCR node does."""
+    result = paddle_ocr.ocr(image, cls=False, det=False, rec=True)
+    if result[0] is None or not result[0]:
+        return '', 0.0
+    text, confidence = result[0][0]
+    # PaddleOCR reads O as 0
+    text = 'O' if text == '0' else text.upper()
+    return text, confidence
+
+
+def evaluate(images, labels, classifier, threshold, paddle_ocr=None):
+    """
+    Evaluate the recognition paths on labeled crops.
+
+    Args
+    ----
+        images (list): the letter crops
+        labels (list): the letter of each crop
+        classifier (LetterClassifier): the fast path
+        threshold (float): the fast path confidence that skips PaddleOCR
+        paddle_ocr (PaddleOCR): the model, or None to skip PaddleOCR
+
+    Returns
+    -------
+        report (dict): accuracy and latency of each path
+
+    """
+    fast = []
+    paddle = []
+    for image in images:
+        start = time.perf_counter()
+        letter, confidence = classifier.classify(image)
+        fast.append((letter, confidence, time.perf_counter() - start))
+        if paddle_ocr is not None:
+            start = time.perf_counter()
+            letter, confidence = paddle_letter(paddle_ocr, image)
+            paddle.append((letter, confidence, time.perf_counter() - start))
+
+    count = len(labels)
+    report = {'crops': count, 'threshold': threshold}
+    confident = [f[1] >= threshold for f in fast]
+    report['fast'] = {
+        'accuracy': sum(f[0] == t for f, t in zip(fast, labels)) / count,
+        'confident': sum(confident) / count,
+        'confident_accuracy': sum(
+            f[0] == t for f, t, c in zip(fast, labels, confident) if c)
+        / max(sum(confident), 1),
+        'latency_ms': latency_report([f[2] for f in fast]),
+    }
+    if paddle_ocr is not None:
+        report['paddle'] = {
+            'accuracy': sum(p[0] == t for p, t in zip(paddle, labels))
+            / count,
+            'latency_ms': latency_report([p[2] for p in paddle]),
+        }
+        combined = [(f[0], f[2]) if c else (p[0], f[2] + p[2])
+                    for f, p, c in zip(fast, paddle, confident)]
+        report['combined'] = {
+            'accuracy': sum(c[0] == t for c, t in zip(combined, labels))
+            / count,
+            'paddle_rate': 1 - sum(confident) / count,
+            'latency_ms': latency_report([c[1] for c in combined]),
+        }
+    return report
+
+
+def main(args=None):
+    """Evaluate the letter recognition paths from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('crops', help='folder of labeled letter crops')
+    parser.add_argument('--templates', default=None,
+                        help='folder of labeled crops to classify with, '
+                        'the rendered fonts if not given')
+    parser.add_argument('--threshold', type=float, default=0.8,
+                        help='fast path confidence that skips PaddleOCR')
+    parser.add_argument('--paddle', action='store_true',
+                        help='also evaluate PaddleOCR')
+    options = parser.parse_args(args)
+
+    images, labels = load_labeled_folder(options.crops)
+    if not images:
+        print(f'There are no labeled crops in {options.crops}')
+        return 1
+    if options.templates:
+        classifier = LetterClassifier.from_folder(options.templates)
+    else:
+        classifier = LetterClassifier.from_templates()
+    paddle_ocr = None
+    if options.paddle:
+        from drawing.ocr_worker import load_paddle_ocr
+        paddle_ocr = load_paddle_ocr()
+    report = evaluate(images, labels, classifier, options.threshold,
+                      paddle_ocr)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 0
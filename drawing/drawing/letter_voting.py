@@ -0,0 +1,201 @@
+"""
+Time windowed voting on the letters read by OCR.
+
+A single OCR reading of a letter is not trusted. Readings are kept in a
+ring buffer of (time, letter, confidence) observations. The evidence for a
+letter is the sum of the confidences of its readings, each halved for every
+half_life seconds of age, and readings older than the window do not count
+at all. A letter is confirmed when its evidence passes the threshold.
+
+The threshold is derived from the rate of the OCR readings, so that a
+letter read steadily is confirmed after target_latency seconds, or later if
+that is too few readings to keep false accepts below false_accept_rate,
+given the chance misread_rate that a single reading is wrong. Readings are
+also missing with the chance dropout_rate, so the threshold and the window
+allow for the needed readings coming with gaps between them. When the rate
+of the readings changes, retune derives the threshold again for the new
+rate, keeping the readings so far.
+"""
+
+import math
+
+import numpy as np
+
+
+def readings_needed(false_accept_rate, misread_rate):
+    """
+    Return how many agreeing readings keep false accepts below a rate.
+
+    The same wrong letter read n times in a row has a chance of about
+    misread_rate ** n.
+    """
+    if misread_rate <= 0.0:
+        return 1
+    n = math.log(false_accept_rate) / math.log(misread_rate)
+    # allow for floating point error in exact powers
+    return max(1, math.ceil(n - 1e-9))
+
+
+def decayed_sum(count, period, half_life):
+    """Return the weight of count readings, period apart, when decayed."""
+    ratio = 0.5 ** (period / half_life)
+    return sum(ratio ** k for k in range(count))
+
+
+class LetterVoter:
+    """Confirms letters from a stream of OCR readings."""
+
+    def __init__(self, threshold, half_life, window, capacity=64):
+        """
+        Create a voter.
+
+        Args
+        ----
+            threshold (float): the evidence that confirms a letter
+            half_life (float): the seconds after which a reading counts
+                half
+            window (float): the seconds after which a reading is ignored
+            capacity (int): the most readings kept
+
+        """
+        self.threshold = threshold
+        self.half_life = half_life
+        self.window = window
+        self.stamps = np.zeros(capacity)
+        self.letters = np.zeros(capacity, dtype=np.int8)
+        self.confidences = np.zeros(capacity)
+        self.head = 0
+        self.count = 0
+        # set by from_targets
+        self.targets = None
+        self.period = None
+        self.readings_needed = None
+        self.expected_latency = None
+
+    @classmethod
+    def from_targets(cls, period, target_latency, false_accept_rate=0.01,
+                     misread_rate=0.1, dropout_rate=0.3, confidence=0.7,
+                     capacity=64):
+        """
+        Create a voter that meets a confirmation latency and error rate.
+
+        Args
+        ----
+            period (float): the seconds between OCR readings
+            target_latency (float): the seconds from the first reading of a
+                letter to its confirmation
+            false_accept_rate (float): the accepted chance of confirming a
+                misread letter
+            misread_rate (float): the chance that one reading is wrong
+            dropout_rate (float): the chance that a reading is missing,
+                because the crop was empty or its confidence too low
+            confidence (float): the lowest usual confidence of a right
+                reading
+            capacity (int): the most readings kept
+
+        """
+        voter = cls(0.0, 1.0, 0.0, capacity)
+        voter.targets = (target_latency, false_accept_rate, misread_rate,
+                         dropout_rate, confidence)
+        voter.retune(period)
+        return voter
+
+    def retune(self, period):
+        """
+        Meet the targets of from_targets at another rate of readings.
+
+        Args
+        ----
+            period (float): the seconds between OCR readings
+
+        Returns
+        -------
+            changed (bool): whether the number of readings needed changed
+
+        """
+        if self.targets is None:
+            raise ValueError('Only a voter made with from_targets retunes')
+        target_latency, false_accept_rate, misread_rate, dropout_rate, \
+            confidence = self.targets
+        needed = max(readings_needed(false_accept_rate, misread_rate),
+                     int(target_latency / period + 1e-9) + 1)
+        # the right readings come this far apart on average, once the
+        # dropped and misread ones are taken out
+        spacing = period / ((1.0 - dropout_rate) * (1.0 - misread_rate))
+        # twice as long as the needed readings take at that spacing, so a
+        # longer gap does not throw the earlier ones away
+        self.window = 2 * (needed - 1) * spacing + period
+        self.half_life = 2 * self.window
+        # just below the evidence of the needed readings at that spacing
+        self.threshold = 0.99 * confidence \
+            * decayed_sum(needed, spacing, self.half_life)
+        changed = needed != self.readings_needed
+        self.period = period
+        self.readings_needed = needed
+        self.expected_latency = (needed - 1) * period
+        return changed
+
+    def __len__(self):
+        """Return the number of readings kept."""
+        return self.count
+
+    def reset(self):
+        """Forget all readings."""
+        self.head = 0
+        self.count = 0
+
+    def active(self, stamp):
+        """Return whether there are readings in the window at a time."""
+        age = stamp - self.stamps[:self.count]
+        return bool(np.any(age <= self.window))
+
+    def evidence(self, stamp):
+        """
+        Return the evidence for each letter at a time.
+
+        Returns
+        -------
+            evidence (np.array): the decayed confidence of the 26 letters
+
+        """
+        stamps = self.stamps[:self.count]
+        # readings can come stamped out of order, a reading newer than the
+        # time counts as fresh, not more
+        age = np.maximum(stamp - stamps, 0.0)
+        live = age <= self.window
+        weights = self.confidences[:self.count][live] \
+            * np.exp2(-age[live] / self.half_life)
+        return np.bincount(self.letters[:self.count][live], weights=weights,
+                           minlength=26)
+
+    def add(self, letter, confidence, stamp):
+        """
+        Add a reading, and confirm a letter if there is enough evidence.
+
+        Args
+        ----
+            letter (str): the letter read
+            confidence (float): the confidence of the reading
+            stamp (float): the time of the reading in seconds
+
+        Returns
+        -------
+            letter (str): the confirmed letter, or None
+
+        """
+        index = ord(letter.upper()) - ord('A')
+        if not 0 <= index < 26:
+            raise ValueError(f'{letter!r} is not a letter from A to Z')
+        capacity = len(self.stamps)
+        self.stamps[self.head] = stamp
+        self.letters[self.head] = index
+        self.confidences[self.head] = confidence
+        self.head = (self.head + 1) % capacity
+        self.count = min(self.count + 1, capacity)
+
+        evidence = self.evidence(stamp)
+        best = int(np.argmax(evidence))
+        if evidence[best] > self.threshold:
+            self.reset()
+            return chr(ord('A') + best)
+        return None
@@ -0,0 +1,295 @@
+"""
+Offline benchmark of the OCR pipeline over a directory of frames.
+
+Runs raw whiteboard frames through the same preprocessing as the
+ImageModification node and the same recognition and guess verification as
+the Paddle_Ocr node, without ROS or a camera, and reports as JSON:
+
+    - the mean time of each stage over the frames with a board: resize,
+      track, blur, canny, contours, warp, threshold and recognition
+    - frames per second over the whole pipeline
+    - the recognition accuracy on the crop each label belongs to
+    - the recognition inputs: how many crops were recognized and their
+      mean size in pixels, which --slots cuts down to the ink of the board
+    - the guesses confirmed when the frames are replayed as a stream, one
+      every --period seconds
+
+The labels file has one "frame_file label" line per frame, the label being
+the letter or six-letter word written in the frame. Frames are replayed in
+file name order.
+
+Run with: ros2 run drawing ocr_bench frames/ --labels frames/labels.txt
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from drawing.board_preprocess import preprocess_frame, PreprocessParams, \
+    STAGES
+from drawing.board_slots import is_empty, SlotCropper
+from drawing.board_tracker import BoardTracker
+from drawing.guess_verification import GuessVerifier
+from drawing.letter_classifier import IMAGE_EXTENSIONS, LetterClassifier
+from drawing.letter_voting import LetterVoter
+from drawing.ocr_batch import recognize_batch
+from drawing.word_fusion import WordFusion
+
+
+def load_labels(path):
+    """Return the label of each frame file in a labels file."""
+    labels = {}
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) == 2:
+                labels[fields[0]] = fields[1].upper()
+    return labels
+
+
+def result_text(result):
+    """Return the text of a recognition result, '' if there is none."""
+    try:
+        text = result[0][0][0]
+    except (IndexError, TypeError):
+        return ''
+    return 'O' if text == '0' else text.upper()
+
+
+class Pipeline:
+    """The preprocessing, recognition and verification of the OCR nodes."""
+
+    def __init__(self, params, paddle_ocr=None, classifier=None,
+                 fast_confidence=0.8, period=2.0, threshold=0.5,
+                 word_confidence=0.75, track=False, slots=None):
+        """
+        Create the pipeline.
+
+        Args
+        ----
+            params (PreprocessParams): the preprocessing values
+            paddle_ocr (PaddleOCR): the model, or None to only run the
+                letter fast path
+            classifier (LetterClassifier): the letter fast path, or None
+            fast_confidence (float): the fast path confidence that skips
+                PaddleOCR
+            period (float): the seconds between frames of the stream
+            threshold (float): the confidence a letter result needs to
+                count
+            word_confidence (float): the confidence a word result needs to
+                count
+            track (bool): track the board across frames like the
+                ImageModification node does with track_board
+            slots (SlotCropper): the slots to crop the ink of, or None to
+                recognize the whole board
+
+        """
+        self.params = params
+        self.tracker = BoardTracker(params) if track else None
+        self.slots = slots
+        self.crops = 0
+        self.crop_pixels = 0
+        self.paddle_ocr = paddle_ocr
+        self.classifier = classifier
+        self.fast_confidence = fast_confidence
+        self.verifier = GuessVerifier(
+            LetterVoter.from_targets(period, 2.0), WordFusion(), threshold,
+            word_confidence)
+
+    def recognize(self, letter_crop, word_crop, timings):
+        """Recognize the two crops like the OCR node does."""
+        start = time.perf_counter()
+        results = [None, None]
+        crops = [letter_crop, word_crop]
+        for crop in crops:
+            if not is_empty(crop):
+                self.crops += 1
+                self.crop_pixels += crop.size
+        if self.classifier is not None and not is_empty(letter_crop):
+            letter, confidence = self.classifier.classify(letter_crop)
+            if confidence >= self.fast_confidence:
+                results[0] = [[(letter, confidence)]]
+        todo = [i for i in (0, 1)
+                if results[i] is None and not is_empty(crops[i])]
+        if self.paddle_ocr is not None and todo:
+            found = recognize_batch(self.paddle_ocr, [crops[i] for i in todo])
+            for i, result in zip(todo, found):
+                results[i] = result
+        timings['recognition'] = time.perf_counter() - start
+        return results
+
+    def run(self, frame, stamp):
+        """
+        Run one frame through the pipeline.
+
+        Returns
+        -------
+            timings (dict): the seconds of each stage
+            texts (tuple): the text read from the letter and word crops,
+                or None if no board was found
+            confirmed (list): the guesses confirmed by this frame
+
+        """
+        timings = {}
+        # the OCR node reads the letter from modified_image_1
+        if self.tracker is not None:
+            _, _, letter_crop, word_crop = self.tracker.update(frame, timings)
+        else:
+            letter_crop, word_crop = preprocess_frame(
+                frame, self.params, timings)
+        if letter_crop is None:
+            return timings, None, []
+        if self.slots is not None:
+            start = time.perf_counter()
+            letter_crop, word_crop = self.slots.crops(letter_crop, word_crop)
+            timings['slots'] = time.perf_counter() - start
+        letter_result, word_result = self.recognize(
+            letter_crop, word_crop, timings)
+        confirmed = [self.verifier.letter(letter_result, stamp),
+                     self.verifier.word(word_result)]
+        texts = (result_text(letter_result), result_text(word_result))
+        return timings, texts, [c for c in confirmed if c is not None]
+
+
+def benchmark(frames, labels, pipeline, period=2.0):
+    """
+    Run labeled frames through the pipeline.
+
+    Args
+    ----
+        frames (list): (file name, BGR frame) pairs in stream order
+        labels (dict): the label of each file name
+        pipeline (Pipeline): the pipeline to run
+        period (float): the seconds between frames of the stream
+
+    Returns
+    -------
+        report (dict): timings, throughput, accuracy and confirmations
+
+    """
+    stage_times = {stage: [] for stage in
+                   STAGES + ('track', 'slots', 'recognition')}
+    totals = []
+    found = 0
+    correct = 0
+    labeled = 0
+    confirmations = []
+    for i, (name, frame) in enumerate(frames):
+        start = time.perf_counter()
+        timings, texts, confirmed = pipeline.run(frame, i * period)
+        totals.append(time.perf_counter() - start)
+        label = labels.get(name)
+        if texts is not None:
+            found += 1
+            # a frame without a board stops early and would skew the stages
+            for stage in stage_times:
+                stage_times[stage].append(timings.get(stage, 0.0))
+        if label is not None:
+            labeled += 1
+            if texts is not None:
+                read = texts[0] if len(label) == 1 else texts[1]
+                correct += read == label
+        confirmations += [(guess, label) for guess in confirmed]
+
+    count = len(frames)
+    elapsed = sum(totals)
+    guesses = {label for label in labels.values()}
+    return {
+        'frames': count,
+        'boards_found': found,
+        'stage_ms': {stage: 1000 * float(np.mean(times or [0.0]))
+                     for stage, times in stage_times.items()},
+        'frame_ms': {
+            'mean': 1000 * float(np.mean(totals or [0.0])),
+            'p95': 1000 * float(np.percentile(totals or [0.0], 95)),
+        },
+        'fps': count / elapsed if elapsed else 0.0,
+        'crops_recognized': pipeline.crops,
+        'mean_crop_pixels': pipeline.crop_pixels / pipeline.crops
+        if pipeline.crops else 0.0,
+        'accuracy': correct / labeled if labeled else None,
+        'confirmed': [guess for guess, _ in confirmations],
+        'confirmed_correct': sum(g == label for g, label in confirmations),
+        'labels_confirmed': len(guesses & {g for g, _ in confirmations}),
+        'labels': len(guesses),
+    }
+
+
+def load_frames(directory):
+    """Return the (file name, BGR frame) pairs of a directory in order."""
+    frames = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        frame = cv2.imread(os.path.join(directory, name), cv2.IMREAD_COLOR)
+        if frame is not None:
+            frames.append((name, frame))
+    return frames
+
+
+def main(args=None):
+    """Run the OCR benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('frames', help='directory of raw camera frames')
+    parser.add_argument('--labels', default=None,
+                        help='labels file, frames/labels.txt by default')
+    parser.add_argument('--period', type=float, default=2.0,
+                        help='seconds between frames of the stream')
+    parser.add_argument('--canny-min', type=int, default=50)
+    parser.add_argument('--canny-max', type=int, default=150)
+    parser.add_argument('--kernel', type=int, default=5)
+    parser.add_argument('--kernel-cropped', type=int, default=5)
+    parser.add_argument('--dilate-kernel', type=int, default=2)
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='confidence a letter recognition needs to '
+                        'count')
+    parser.add_argument('--word-confidence', type=float, default=0.75,
+                        help='confidence a word recognition needs to count')
+    parser.add_argument('--fast-path', action='store_true',
+                        help='classify the letter with the fast path before '
+                        'PaddleOCR')
+    parser.add_argument('--no-paddle', action='store_true',
+                        help='only run the letter fast path')
+    parser.add_argument('--track', action='store_true',
+                        help='track the board instead of searching each '
+                        'frame for it')
+    parser.add_argument('--slots', type=float, nargs=8, default=None,
+                        metavar='X',
+                        help='crop the ink of the letter and word slots, '
+                        'x0 y0 x1 y1 of each as fractions of the board')
+    options = parser.parse_args(args)
+
+    labels_path = options.labels or os.path.join(options.frames,
+                                                 'labels.txt')
+    labels = load_labels(labels_path) if os.path.exists(labels_path) else {}
+    frames = load_frames(options.frames)
+    if not frames:
+        print(f'There are no frames in {options.frames}')
+        return 1
+
+    params = PreprocessParams(options.canny_min, options.canny_max,
+                              options.kernel, options.kernel_cropped,
+                              options.dilate_kernel)
+    paddle_ocr = None
+    if not options.no_paddle:
+        from drawing.ocr_worker import load_paddle_ocr
+        paddle_ocr = load_paddle_ocr()
+    slots = None
+    if options.slots:
+        slots = SlotCropper((tuple(options.slots[:4]),
+                             tuple(options.slots[4:])))
+    classifier = LetterClassifier.from_templates() \
+        if options.fast_path or options.no_paddle else None
+    pipeline = Pipeline(params, paddle_ocr, classifier, period=options.period,
+                        threshold=options.threshold,
+                        word_confidence=options.word_confidence,
+                        track=options.track, slots=slots)
+    report = benchmark(frames, labels, pipeline, options.period)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 0
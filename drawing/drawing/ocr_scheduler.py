@@ -0,0 +1,109 @@
+"""
+Adaptive rate of the OCR runs.
+
+Most of the time nobody is writing on the board, so OCR runs at a low idle
+rate. When a crop changes, or readings of a letter are building up towards
+a confirmation, it bursts to a high rate for burst_time seconds so the
+guess is confirmed quickly. After a guess is published it backs off to the
+idle rate for backoff_time seconds, while the robot writes on the board.
+
+The rate is also capped by a CPU budget: the smoothed cost of one run times
+the rate may not exceed budget seconds per second, but the rate never drops
+below the idle rate. The letters are read at this capped burst rate, so the
+letter voter is tuned to it rather than to burst_rate.
+"""
+
+import math
+
+
+class OcrScheduler:
+    """Decides when the next OCR run is due."""
+
+    def __init__(self, idle_rate=0.25, burst_rate=2.0, burst_time=4.0,
+                 backoff_time=3.0, budget=0.5, smoothing=0.2):
+        """
+        Create a scheduler.
+
+        Args
+        ----
+            idle_rate (float): the runs per second when nothing happens
+            burst_rate (float): the runs per second while a guess is written
+            burst_time (float): the seconds a burst lasts after activity
+            backoff_time (float): the seconds of idle rate after a guess
+            budget (float): the CPU seconds per second OCR may use
+            smoothing (float): the weight of the newest run in the cost
+
+        """
+        self.idle_rate = idle_rate
+        self.burst_rate = burst_rate
+        self.burst_time = burst_time
+        self.backoff_time = backoff_time
+        self.budget = budget
+        self.smoothing = smoothing
+        self.cost = 0.0
+        self.next_run = -math.inf
+        self.burst_until = -math.inf
+        self.backoff_until = -math.inf
+        self.runs = 0
+
+    def bursting(self, now):
+        """Return whether the scheduler is in a burst."""
+        return self.backoff_until <= now < self.burst_until
+
+    def capped_rate(self):
+        """Return the runs per second in a burst, within the CPU budget."""
+        rate = self.burst_rate
+        if self.cost > 0.0:
+            rate = min(rate, self.budget / self.cost)
+        return max(rate, self.idle_rate)
+
+    def rate(self, now):
+        """Return the runs per second at a time."""
+        if not self.bursting(now):
+            return self.idle_rate
+        return self.capped_rate()
+
+    def load(self, now):
+        """Return the CPU seconds per second used at the current rate."""
+        return self.cost * self.rate(now)
+
+    def due(self, now):
+        """Return whether a run is due."""
+        return now >= self.next_run
+
+    def ran(self, now, cost=None):
+        """
+        Record a run, and schedule the next one.
+
+        Args
+        ----
+            now (float): the time of the run in seconds
+            cost (float): the seconds the run took, if known yet
+
+        """
+        self.runs += 1
+        if cost is not None:
+            self.add_cost(cost)
+        self.next_run = now + 1.0 / self.rate(now)
+
+    def add_cost(self, cost):
+        """Add the cost of a run that finished later."""
+        if self.cost == 0.0:
+            self.cost = cost
+        else:
+            self.cost += self.smoothing * (cost - self.cost)
+
+    def activity(self, now):
+        """Burst, unless backing off, because a guess is being written."""
+        if now < self.backoff_until:
+            return
+        if not self.bursting(now):
+            # run at once instead of waiting out the idle period
+            self.next_run = now
+        self.burst_until = now + self.burst_time
+
+    def published(self, now):
+        """Back off after a guess has been published."""
+        self.backoff_until = now + self.backoff_time
+        self.burst_until = now
+        self.next_run = now + 1.0 / self.idle_rate
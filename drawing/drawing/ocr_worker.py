@@ -0,0 +1,157 @@
+"""
+PaddleOCR inference in a separate process.
+
+An inference can take longer than the OCR period, and inside a timer
+callback it blocks the image subscriptions and the /ocr_run toggle of the
+node. The OcrWorker runs the model in its own process instead: the model is
+loaded once when the process starts, the node writes its crops to a
+SharedFrameSlot and returns at once, and the results come back on a queue
+that the node polls without blocking.
+
+Only the latest crops are kept. When the node writes new crops while the
+worker is still busy, the crops that have not been read are dropped.
+"""
+
+import multiprocessing
+import queue
+import time
+
+from drawing.shared_frames import SharedFrameSlot
+
+
+def load_paddle_ocr():
+    """Load the PaddleOCR model used by the OCR node."""
+    from paddleocr import PaddleOCR
+    return PaddleOCR(lang='en', use_gpu=False)
+
+
+def worker_main(slot_name, lock, max_frames, frame_bytes, wake, stop,
+                results, load_model=load_paddle_ocr):
+    """
+    Run inference on each new write to the slot until stopped.
+
+    Args
+    ----
+        slot_name (str): the name of the SharedFrameSlot
+        lock (multiprocessing.Lock): the lock of the slot
+        max_frames (int): the most frames in the slot
+        frame_bytes (int): the size of a frame in the slot
+        wake (multiprocessing.Event): set when new frames are written
+        stop (multiprocessing.Event): set to stop the worker
+        results (multiprocessing.Queue): where (seq, results, inference
+            time) tuples are put
+        load_model (callable): returns the PaddleOCR model
+
+    """
+    from drawing.ocr_batch import recognize_batch
+
+    model = load_model()
+    slot = SharedFrameSlot(lock, max_frames, frame_bytes, name=slot_name)
+    last_seq = 0
+    try:
+        while not stop.is_set():
+            if not wake.wait(0.1):
+                continue
+            wake.clear()
+            last_seq, frames = slot.read(last_seq)
+            if frames is None:
+                continue
+            start = time.perf_counter()
+            found = recognize_batch(model, frames)
+            results.put((last_seq, found, time.perf_counter() - start))
+    finally:
+        slot.close()
+
+
+class OcrWorker:
+    """Runs PaddleOCR in a separate process on the latest frames."""
+
+    def __init__(self, max_frames=2, frame_bytes=1 << 21,
+                 load_model=load_paddle_ocr):
+        """
+        Start the worker process.
+
+        Args
+        ----
+            max_frames (int): the most frames submitted together
+            frame_bytes (int): the largest size of one frame in bytes
+            load_model (callable): returns the PaddleOCR model, must be
+                importable by the worker process
+
+        """
+        # spawn, so the worker does not inherit the threads of the node
+        context = multiprocessing.get_context('spawn')
+        lock = context.Lock()
+        self.slot = SharedFrameSlot(lock, max_frames, frame_bytes)
+        self.wake = context.Event()
+        self.stop = context.Event()
+        self.results = context.Queue()
+        self.process = context.Process(
+            target=worker_main, daemon=True,
+            args=(self.slot.name, lock, max_frames, frame_bytes, self.wake,
+                  self.stop, self.results, load_model))
+        self.process.start()
+
+        self.submitted = 0
+        self.completed = 0
+        self.last_inference = 0.0
+        self.total_inference = 0.0
+
+    def submit(self, frames):
+        """
+        Hand the latest frames to the worker, without waiting.
+
+        Returns
+        -------
+            seq (int): the sequence number of the frames
+
+        """
+        seq = self.slot.write(frames)
+        self.submitted += 1
+        self.wake.set()
+        return seq
+
+    def poll(self):
+        """
+        Take the results the worker has finished, without waiting.
+
+        Returns
+        -------
+            done (list): (seq, results) pairs, results as from
+                recognize_batch, oldest first
+
+        """
+        done = []
+        while True:
+            try:
+                seq, found, elapsed = self.results.get_nowait()
+            except queue.Empty:
+                return done
+            self.completed += 1
+            self.last_inference = elapsed
+            self.total_inference += elapsed
+            done.append((seq, found))
+
+    @property
+    def dropped(self):
+        """The number of submissions dropped before inference."""
+        return self.slot.dropped
+
+    @property
+    def queue_depth(self):
+        """The number of submissions waiting or in inference."""
+        return self.submitted - self.completed - self.dropped
+
+    @property
+    def alive(self):
+        """Whether the worker process is running."""
+        return self.process.is_alive()
+
+    def close(self):
+        """Stop the worker process and free the slot."""
+        self.stop.set()
+        self.wake.set()
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.slot.close()
@@ -11,30 +11,98 @@ Subscribers
 
 Publishers
 ----------
-    user_input: std_msgs/msg/String - Character/Word prediction.
+    user_input: brain_interfaces/msg/UserInput - Character/Word prediction
+    and the game it belongs to.
+    diagnostics: diagnostic_msgs/msg/DiagnosticArray - Skip rate of the
+    frame cache, rate and CPU load of the OCR scheduler, queue depth,
+    dropped frames and inference time of the OCR worker, the crops dropped
+    between OCR runs, and the age of the crops and of the published guesses
+    since the camera captured them.
 
 Parameters
 ----------
-    ocr_frequency: double - Frequency at which OCR runs.
+    ocr_frequency: double - Frequency at which OCR runs when it is not
+    adaptive, ignored with ocr_adaptive.
+    ocr_adaptive: bool - Run OCR at the idle frequency, and burst to the
+    burst frequency while a guess is being written.
+    ocr_idle_frequency: double - Frequency of OCR when nothing changes.
+    ocr_burst_frequency: double - Frequency of OCR while a guess is being
+    written.
+    ocr_cpu_budget: double - CPU seconds per second that OCR may use in a
+    burst.
+    ocr_activity_change: int - The most grey levels a pixel of the 64x64
+    thumbnail of a crop may change by without starting a burst.
     ocr_threshold: double - Confidence threshold value for accepting OCR
-    predictions.
+    predictions of the letter.
+    game_id: int - The game of the board this camera reads guesses from.
+    ocr_batched: bool - Recognize the letter and word crops in one batch
+    instead of one PaddleOCR call each. Ignored with ocr_worker, which always
+    recognizes the crops of a frame together.
+    ocr_worker: bool - Run PaddleOCR in a separate worker process instead of
+    in the timer callback.
+    ocr_change_tolerance: int - The most grey levels a pixel of the 64x64
+    thumbnail of a crop may change by for it to reuse the last result of the
+    same crop, negative to recognize every frame.
+    letter_target_latency: double - Seconds of steady readings of a letter
+    before it is confirmed.
+    letter_false_accept_rate: double - The accepted chance of confirming a
+    misread letter.
+    letter_misread_rate: double - The chance that one OCR reading of a
+    letter is wrong.
+    letter_dropout_rate: double - The chance that an OCR reading of a letter
+    is missing, because the crop was empty or the confidence too low.
+    word_reads: int - The number of latest word reads that vote on each
+    letter of the word.
+    word_threshold: double - The posterior at which every letter of a word,
+    or a dictionary word, is confirmed.
+    word_snap: bool - Snap word reads to the nearest dictionary word.
+    word_confidence: double - Confidence threshold value for accepting OCR
+    predictions of the word.
+    letter_fast_path: bool - Classify the letter crop with the nearest
+    neighbour classifier first, and use PaddleOCR only when it is unsure.
+    Off by default, turn it on with letter_templates of real handwriting
+    once letter_eval shows it is accurate on them.
+    letter_fast_confidence: double - The fast path confidence that skips
+    PaddleOCR.
+    letter_templates: string - A folder of labeled letter crops for the
+    fast path, the rendered OpenCV fonts if empty.
+    image_channel: string - The shared memory image channel to read the
+    crops from instead of the modified_image topics, empty to use the
+    topics.
+    max_frame_age: double - Seconds after capture the crops are too old to
+    recognize, zero for no bound.
+
+Only the newest crops are kept, and they are converted when OCR runs.
 
 """
 
 import rclpy
 from rclpy.node import Node
+from rclpy.qos import HistoryPolicy, QoSProfile, ReliabilityPolicy
 from enum import Enum, auto
 
 from cv_bridge import CvBridge
-import cv2
 import numpy as np
-import string
-
-from paddleocr import PaddleOCR
+import time
+
+from drawing.board_slots import is_empty
+from drawing.frame_change import frames_changed, RecognitionCache
+from drawing.guess_verification import GuessVerifier
+from drawing.frame_ingest import FrameAge, LatestFrame, stamp_seconds
+from drawing.image_channel import ImageChannel
+from drawing.letter_classifier import LetterClassifier
+from drawing.letter_voting import LetterVoter
+from drawing.word_fusion import WordFusion
+from drawing.words import WordIndex
+from drawing.ocr_batch import recognize_batch
+from drawing.ocr_scheduler import OcrScheduler
+from drawing.ocr_worker import OcrWorker, load_paddle_ocr
+
+from diagnostic_msgs.msg import DiagnosticArray, DiagnosticStatus, KeyValue
 
 from sensor_msgs.msg import Image
-from std_msgs.msg import String
 from std_msgs.msg import Bool
+from brain_interfaces.msg import UserInput
 
 
 class State(Enum):
@@ -48,16 +116,17 @@ class State(Enum):
     STOPPED = (auto(),)  # stop ocr
 
 
+# keep only the newest crops, a late one is not worth resending
+LATEST_QOS = QoSProfile(history=HistoryPolicy.KEEP_LAST, depth=1,
+                        reliability=ReliabilityPolicy.BEST_EFFORT)
+
+
 class Paddle_Ocr(Node):
     """This node performs OCR and publishes the predictions."""
 
     def __init__(self):
         super().__init__("paddle_ocr")
 
-        # initialize paddleocr class
-        # need to run only once to download and load model into memory
-        self.paddle_ocr = PaddleOCR(lang='en', use_gpu=False)
-
         # initialize CvBridge
         self.cv_bridge = CvBridge()
 
@@ -65,14 +134,34 @@ class Paddle_Ocr(Node):
         self.game_state = self.create_subscription(
             Bool, "/ocr_run", self.game_state_callback, qos_profile=10)
 
-        # create subscriber to get image
-        self.cap_1 = self.create_subscription(
-            Image, "modified_image_1", self.image_reader_1, qos_profile=10)
-        self.cap_2 = self.create_subscription(
-            Image, "modified_image_2", self.image_reader_2, qos_profile=10)
+        # read the crops from shared memory, or else from the topics
+        self.declare_parameter('image_channel', '')
+        self.param_image_channel = self.get_parameter(
+            'image_channel').get_parameter_value().string_value
+        self.channel = None
+        self.latest_1 = LatestFrame()
+        self.latest_2 = LatestFrame()
+        if self.param_image_channel:
+            # the channel exists once image_modification has started
+            self.channel_poll = self.create_timer(1.0, self.channel_timer)
+        else:
+            self.cap_1 = self.create_subscription(
+                Image, "modified_image_1", self.image_reader_1,
+                qos_profile=LATEST_QOS)
+            self.cap_2 = self.create_subscription(
+                Image, "modified_image_2", self.image_reader_2,
+                qos_profile=LATEST_QOS)
+
+        # the capture time of the crops, and of the frames of a result
+        self.declare_parameter('max_frame_age', 1.0)
+        self.age = FrameAge(self.get_parameter(
+            'max_frame_age').get_parameter_value().double_value)
+        self.guess_age = FrameAge(0.0)
+        self.frame_stamp = None
+        self.result_stamp = None
 
         # create publisher to publish guesses
-        self.guess_publish = self.create_publisher(String, "user_input", 10)
+        self.guess_publish = self.create_publisher(UserInput, "user_input", 10)
 
         # declare and define parameters
         self.declare_parameter('ocr_frequency', 0.5)
@@ -81,10 +170,88 @@ class Paddle_Ocr(Node):
         self.declare_parameter('ocr_threshold', 0.5)
         self.param_ocr_threshold = self.get_parameter(
             'ocr_threshold').get_parameter_value().double_value
+        self.declare_parameter('game_id', 0)
+        self.param_game_id = self.get_parameter(
+            'game_id').get_parameter_value().integer_value
+        self.declare_parameter('ocr_batched', True)
+        self.param_ocr_batched = self.get_parameter(
+            'ocr_batched').get_parameter_value().bool_value
+        self.declare_parameter('ocr_worker', True)
+        self.param_ocr_worker = self.get_parameter(
+            'ocr_worker').get_parameter_value().bool_value
+
+        # load the model once, in the worker process or in this one
+        if self.param_ocr_worker:
+            if not self.param_ocr_batched:
+                self.get_logger().info(
+                    'ocr_batched is ignored, the OCR worker recognizes the '
+                    'crops of a frame together')
+            self.worker = OcrWorker()
+            self.paddle_ocr = None
+            # the verification of each frame of a submission
+            self.worker_jobs = {}
+            self.results_poll = self.create_timer(0.05, self.result_timer)
+        else:
+            self.worker = None
+            self.paddle_ocr = load_paddle_ocr()
+
+        # the last recognition result of each crop
+        self.declare_parameter('ocr_change_tolerance', 16)
+        self.cache = RecognitionCache(self.get_parameter(
+            'ocr_change_tolerance').get_parameter_value().integer_value)
+
+        # the fast path for the single letter crop
+        self.declare_parameter('letter_fast_path', False)
+        self.declare_parameter('letter_fast_confidence', 0.8)
+        self.declare_parameter('letter_templates', '')
+        self.param_letter_fast_confidence = self.get_parameter(
+            'letter_fast_confidence').get_parameter_value().double_value
+        templates = self.get_parameter(
+            'letter_templates').get_parameter_value().string_value
+        if not self.get_parameter(
+                'letter_fast_path').get_parameter_value().bool_value:
+            self.letter_classifier = None
+        elif templates:
+            self.letter_classifier = LetterClassifier.from_folder(templates)
+        else:
+            self.letter_classifier = LetterClassifier.from_templates()
+        self.fast_letters = 0
+
+        self.diagnostics = self.create_publisher(
+            DiagnosticArray, "/diagnostics", 10)
+        self.diagnostics_poll = self.create_timer(
+            1.0, self.diagnostics_timer)
+
+        # run at a fixed rate, or adaptively between idle and burst rates
+        self.declare_parameter('ocr_adaptive', True)
+        self.declare_parameter('ocr_idle_frequency', 0.25)
+        self.declare_parameter('ocr_burst_frequency', 2.0)
+        self.declare_parameter('ocr_cpu_budget', 0.5)
+        self.declare_parameter('ocr_activity_change', 8)
+        self.param_ocr_activity_change = self.get_parameter(
+            'ocr_activity_change').get_parameter_value().integer_value
+        if self.get_parameter(
+                'ocr_adaptive').get_parameter_value().bool_value:
+            self.scheduler = OcrScheduler(
+                idle_rate=self.get_parameter('ocr_idle_frequency')
+                .get_parameter_value().double_value,
+                burst_rate=self.get_parameter('ocr_burst_frequency')
+                .get_parameter_value().double_value,
+                budget=self.get_parameter('ocr_cpu_budget')
+                .get_parameter_value().double_value)
+            ocr_period = 1.0/self.scheduler.burst_rate
+            if self.param_ocr_frequency != 0.5:
+                self.get_logger().warn(
+                    'ocr_frequency is ignored with ocr_adaptive, set '
+                    'ocr_burst_frequency and ocr_idle_frequency instead')
+        else:
+            self.scheduler = None
+            ocr_period = 1.0/self.param_ocr_frequency
+        # the keys of the latest frames, to notice when they change
+        self.last_keys = []
 
         # create timer for calling the ocr function
-        self.timer = self.create_timer(
-            1.0/self.param_ocr_frequency, self.ocr_timer)
+        self.timer = self.create_timer(ocr_period, self.ocr_timer)
 
         # Specify the size and type of the empty image
         width, height = 640, 480
@@ -97,12 +264,49 @@ class Paddle_Ocr(Node):
         self.frame_1 = empty_image
         self.frame_2 = empty_image
 
-        # initialize alphabet dictionary
-        self.alphabet_dict = {letter: 0 for letter in string.ascii_uppercase}
-
-        self.guess_tracker = []  # queue verified word guesses
+        # the letter is confirmed from the readings of the last few seconds
+        self.declare_parameter('letter_target_latency', 2.0)
+        self.declare_parameter('letter_false_accept_rate', 0.01)
+        self.declare_parameter('letter_misread_rate', 0.1)
+        self.declare_parameter('letter_dropout_rate', 0.3)
+        letter_voter = LetterVoter.from_targets(
+            ocr_period,
+            self.get_parameter('letter_target_latency')
+            .get_parameter_value().double_value,
+            self.get_parameter('letter_false_accept_rate')
+            .get_parameter_value().double_value,
+            self.get_parameter('letter_misread_rate')
+            .get_parameter_value().double_value,
+            self.get_parameter('letter_dropout_rate')
+            .get_parameter_value().double_value)
+        self.get_logger().info(
+            f"Letters confirmed after {letter_voter.readings_needed} "
+            f"readings, {letter_voter.expected_latency:.1f} s")
+
+        # the word is confirmed letter by letter from the latest reads
+        self.declare_parameter('word_reads', 5)
+        self.declare_parameter('word_threshold', 0.99)
+        self.declare_parameter('word_snap', False)
+        self.declare_parameter('word_confidence', 0.75)
+        word_fusion = WordFusion(
+            reads=self.get_parameter(
+                'word_reads').get_parameter_value().integer_value,
+            threshold=self.get_parameter(
+                'word_threshold').get_parameter_value().double_value,
+            words=WordIndex() if self.get_parameter(
+                'word_snap').get_parameter_value().bool_value else None)
+        self.verifier = GuessVerifier(
+            letter_voter, word_fusion, self.param_ocr_threshold,
+            self.get_parameter(
+                'word_confidence').get_parameter_value().double_value)
         self.guess_pub_tracker = []  # track published guesses
 
+        # per tick timing, reported every stats_ticks ticks
+        self.stats_ticks = 10
+        self.tick_count = 0
+        self.tick_latency = 0.0
+        self.tick_cpu = 0.0
+
         # define instance attributes
         self.state = State.STOPPED
 
@@ -116,81 +320,316 @@ class Paddle_Ocr(Node):
     def ocr_timer(self):
         """Call the ocr function."""
         if self.state == State.START:
-            self.ocr_func_letter(self.frame_1)
-            self.ocr_func_word(self.frame_2)
-
-    def ocr_func_letter(self, frame):
-        """Run OCR on the single letter image frame."""
-        result = self.paddle_ocr.ocr(frame, cls=False, det=False, rec=True)
+            start = time.perf_counter()
+            start_cpu = time.process_time()
+            if self.channel is not None:
+                self.channel_reader()
+            else:
+                self.topic_reader()
+            if self.frame_stamp is not None and \
+               not self.age.fresh(self.frame_stamp, self.now()):
+                # the crops stopped coming, or came too late
+                return
+            self.result_stamp = self.frame_stamp
+            # a path without ink in its slot of the board has nothing to read
+            jobs = [(frame, verify, self.cache.key(frame))
+                    for frame, verify in (
+                        (self.frame_1, self.guess_verification_letter),
+                        (self.frame_2, self.guess_verification_word))
+                    if not is_empty(frame)]
+            if self.scheduler is not None and not self.schedule(jobs):
+                return
+            jobs = self.skip_unchanged(jobs)
+            jobs = self.fast_path(jobs)
+            if not jobs:
+                pass
+            elif self.worker is not None:
+                self.ocr_submit(jobs)
+            elif self.param_ocr_batched:
+                self.ocr_func_batch(jobs)
+            else:
+                for frame, verify, key in jobs:
+                    self.finish_job(verify, key, self.ocr_func(frame))
+            cpu = time.process_time() - start_cpu
+            if self.scheduler is not None:
+                # the worker reports its own cost when it finishes
+                self.scheduler.ran(
+                    self.now(), None if self.worker is not None else cpu)
+            self.report_tick(time.perf_counter() - start, cpu)
+
+    def now(self):
+        """Return the time of the node clock in seconds."""
+        return self.get_clock().now().nanoseconds * 1e-9
+
+    def schedule(self, jobs):
+        """
+        Decide whether OCR runs this tick.
+
+        A changed frame or a letter that is building up makes the scheduler
+        burst.
+
+        Args
+        ----
+        jobs (list): (frame, verification function, cache key) of the
+        latest frames
+
+        Returns
+        -------
+        due (bool): whether OCR runs this tick
+
+        """
+        now = self.now()
+        keys = [key for _, _, key in jobs]
+        changed = frames_changed(
+            keys, self.last_keys, self.param_ocr_activity_change)
+        self.last_keys = keys
+        if changed or self.verifier.building(now):
+            self.scheduler.activity(now)
+        self.retune_voter()
+        return self.scheduler.due(now)
+
+    def retune_voter(self):
+        """Tune the letter voter to the burst rate the CPU budget allows."""
+        voter = self.verifier.letter_voter
+        period = 1.0 / self.scheduler.capped_rate()
+        # the cost is smoothed, so only follow changes of more than 10 %
+        if abs(period - voter.period) <= 0.1 * voter.period:
+            return
+        if voter.retune(period):
+            self.get_logger().info(
+                f"Letters confirmed after {voter.readings_needed} "
+                f"readings, {voter.expected_latency:.1f} s, at "
+                f"{1.0 / period:.2f} Hz")
+
+    def skip_unchanged(self, jobs):
+        """
+        Reuse the results of frames that have not changed.
+
+        Args
+        ----
+        jobs (list): (frame, verification function, cache key) of each
+        frame
+
+        Returns
+        -------
+        jobs (list): the jobs of the frames that still have to be
+        recognized
+
+        """
+        todo = []
+        for frame, verify, key in jobs:
+            result = self.cache.lookup(verify, key)
+            if result is None:
+                todo.append((frame, verify, key))
+            elif result[0] is not None:
+                verify(result)
+        return todo
+
+    def fast_path(self, jobs):
+        """
+        Classify the letter crop without PaddleOCR when that is reliable.
+
+        Args
+        ----
+        jobs (list): (frame, verification function, cache key) of the
+        frames to recognize
+
+        Returns
+        -------
+        jobs (list): the jobs that still need PaddleOCR
+
+        """
+        if self.letter_classifier is None:
+            return jobs
+        todo = []
+        for frame, verify, key in jobs:
+            if verify == self.guess_verification_letter:
+                letter, confidence = self.letter_classifier.classify(frame)
+                if confidence >= self.param_letter_fast_confidence:
+                    self.fast_letters += 1
+                    self.finish_job(verify, key, [[(letter, confidence)]])
+                    continue
+            todo.append((frame, verify, key))
+        return todo
+
+    def finish_job(self, verify, key, result):
+        """Cache the result of a frame and pass it to its verification."""
+        self.cache.store(verify, key, result)
         if result[0] is not None:
-            self.guess_verification_letter(result)
-        # print(result)
-
-    def ocr_func_word(self, frame):
-        """Run OCR on the six-letter word image frame."""
-        result = self.paddle_ocr.ocr(frame, cls=False, det=False, rec=True)
-        if result[0] is not None:
-            self.guess_verification_word(result)
-        # print(result)
+            verify(result)
+
+    def report_tick(self, latency, cpu):
+        """Log the average latency and CPU time of the OCR ticks."""
+        self.tick_count += 1
+        self.tick_latency += latency
+        self.tick_cpu += cpu
+        if self.tick_count == self.stats_ticks:
+            if self.worker is not None:
+                mode = 'worker'
+            elif self.param_ocr_batched:
+                mode = 'batched'
+            else:
+                mode = 'sequential'
+            self.get_logger().info(
+                f"OCR tick ({mode}): "
+                f"latency {1000 * self.tick_latency / self.tick_count:.1f} "
+                f"ms, cpu {1000 * self.tick_cpu / self.tick_count:.1f} ms, "
+                f"skipped {100 * self.cache.skip_rate:.0f}%")
+            if self.scheduler is not None:
+                now = self.now()
+                self.get_logger().info(
+                    f"OCR rate {self.scheduler.rate(now):.2f} Hz, cpu load "
+                    f"{self.scheduler.load(now):.3f} of "
+                    f"{self.scheduler.budget:.3f} budget")
+            self.tick_count = 0
+            self.tick_latency = 0.0
+            self.tick_cpu = 0.0
+
+    def ocr_submit(self, jobs):
+        """
+        Hand image frames to the OCR worker, without waiting for results.
+
+        Args
+        ----
+        jobs (list): (frame, verification function, cache key) of each
+        frame, each result is passed to the verification function of its
+        frame
+
+        """
+        try:
+            seq = self.worker.submit([frame for frame, _, _ in jobs])
+        except ValueError as e:
+            self.get_logger().warn(f"Frames not sent to OCR: {e}")
+            return
+        self.worker_jobs[seq] = (
+            self.frame_stamp, [(verify, key) for _, verify, key in jobs])
+
+    def result_timer(self):
+        """Pass the finished OCR results to their verification."""
+        for seq, results in self.worker.poll():
+            pending = self.worker_jobs.pop(seq, None)
+            # older submissions were dropped and never get results
+            for old in [s for s in self.worker_jobs if s < seq]:
+                del self.worker_jobs[old]
+            if self.scheduler is not None:
+                self.scheduler.add_cost(self.worker.last_inference)
+            if pending is None or self.state != State.START:
+                continue
+            self.result_stamp, pending = pending
+            for (verify, key), result in zip(pending, results):
+                self.finish_job(verify, key, result)
+
+    def diagnostics_timer(self):
+        """Publish the state of the OCR worker and the frame cache."""
+        status = DiagnosticStatus()
+        status.name = f"{self.get_name()}: ocr"
+        status.hardware_id = "paddle_ocr"
+        status.level = DiagnosticStatus.OK
+        status.message = "running"
+        values = {
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses,
+            'skip_rate': f"{self.cache.skip_rate:.2f}",
+            'fast_letters': self.fast_letters,
+        }
+        if self.scheduler is not None:
+            now = self.now()
+            values.update({
+                'ocr_rate': f"{self.scheduler.rate(now):.2f}",
+                'ocr_bursting': self.scheduler.bursting(now),
+                'ocr_cpu_load': f"{self.scheduler.load(now):.3f}",
+                'ocr_cpu_budget': self.scheduler.budget,
+            })
+        mean_age, max_age = self.age.report()
+        mean_guess_age, max_guess_age = self.guess_age.report()
+        values.update({
+            'frame_age_ms': f"{mean_age:.1f}",
+            'frame_age_max_ms': f"{max_age:.1f}",
+            'frames_stale': self.age.stale,
+            'crops_received': self.latest_1.received,
+            'crops_dropped': self.latest_1.dropped,
+            'guess_age_ms': f"{mean_guess_age:.1f}",
+            'guess_age_max_ms': f"{max_guess_age:.1f}",
+        })
+        if self.param_image_channel:
+            if self.channel is None:
+                status.level = DiagnosticStatus.WARN
+                status.message = "waiting for the image channel"
+            else:
+                values.update({
+                    'channel_seq': self.channel.last_seq,
+                    'channel_skipped': self.channel.skipped,
+                })
+        worker = self.worker
+        if worker is not None:
+            if not worker.alive:
+                status.level = DiagnosticStatus.ERROR
+                status.message = "worker process stopped"
+            mean = worker.total_inference / worker.completed \
+                if worker.completed else 0.0
+            values.update({
+                'queue_depth': worker.queue_depth,
+                'submitted': worker.submitted,
+                'completed': worker.completed,
+                'dropped': worker.dropped,
+                'inference_ms': f"{1000 * worker.last_inference:.1f}",
+                'mean_inference_ms': f"{1000 * mean:.1f}",
+            })
+        status.values = [KeyValue(key=k, value=str(v))
+                         for k, v in values.items()]
+        msg = DiagnosticArray()
+        msg.header.stamp = self.get_clock().now().to_msg()
+        msg.status = [status]
+        self.diagnostics.publish(msg)
+
+    def destroy_node(self):
+        """Stop the OCR worker with the node."""
+        if self.worker is not None:
+            self.worker.close()
+        if self.channel is not None:
+            self.frame_1 = self.frame_2 = None
+            self.channel.close()
+        super().destroy_node()
+
+    def ocr_func_batch(self, jobs):
+        """
+        Run OCR on several image frames in one recognizer batch.
+
+        Args
+        ----
+        jobs (list): (frame, verification function, cache key) of each
+        frame, each result is passed to the verification function of its
+        frame
+
+        """
+        results = recognize_batch(
+            self.paddle_ocr, [frame for frame, _, _ in jobs])
+        for (_, verify, key), result in zip(jobs, results):
+            self.finish_job(verify, key, result)
+
+    def ocr_func(self, frame):
+        """Run OCR on one image frame."""
+        return self.paddle_ocr.ocr(frame, cls=False, det=False, rec=True)
 
     def guess_verification_letter(self, result):
         """Confirm whether the guess is a single letter."""
-        try:
-            # check if the guess is a single letter
-            if all(char.isalpha() for char in result[0][0][0]) and \
-               len(result[0][0][0]) == 1:
-                # check confidence
-                if result[0][0][1] > self.param_ocr_threshold:
-                    self.guess_tracking_letter(result)
-                    # print(result[0][0][0])
-            # catch exception for "O"
-            elif result[0][0][0] == '0':
-                # check confidence
-                if result[0][0][1] > self.param_ocr_threshold:
-                    self.guess_tracking_letter([[('O', result[0][0][1])]])
-        except Exception:
-            pass
+        # vote at the capture time of the frame, not when its result came
+        stamp = self.now() if self.result_stamp is None \
+            else self.result_stamp
+        letter = self.verifier.letter(result, stamp)
+        if letter is not None:
+            self.guess_publisher(letter)
 
     def guess_verification_word(self, result):
         """Confirm whether the guess is a six-letter word."""
-        try:
-            # check if the guess is a single letter
-            if all(char.isalpha() for char in result[0][0][0]) and \
-               len(result[0][0][0]) == 5:
-                if result[0][0][1] > 0.75:  # check confidence
-                    guess = result[0][0][0].upper()
-                    self.guess_tracking_word(guess)
-                    # print(guess)
-        except Exception:
-            pass
-
-    def guess_tracking_letter(self, result):
-        """Keep track of the previous guesses to confirm accuracy."""
-        # add the guess confidence value to the alphabet dictionary
-        self.alphabet_dict[result[0][0][0].upper()] += result[0][0][1]
-        # print(self.alphabet_dict[result[0][0][0].upper()])
-        # pass the guess to the publisher if value exeeds threshold
-        if self.alphabet_dict[result[0][0][0].upper()] > 1.6:
-            self.guess_publisher(result[0][0][0].upper())
-            # reinitialize alphabet dictionary
-            self.alphabet_dict = {
-                letter: 0 for letter in string.ascii_uppercase}
-
-    def guess_tracking_word(self, guess):
-        """Keep track of the previous guesses to confirm accuracy."""
-        self.guess_tracker.append(guess)
-        if len(self.guess_tracker) > 3:
-            del self.guess_tracker[0]
-        if len(self.guess_tracker) == 3:
-            # check if 3 consecutive guesses are same
-            if self.guess_tracker[0] == self.guess_tracker[1] and \
-               self.guess_tracker[1] == self.guess_tracker[2]:
-                self.guess_tracker = []
-                self.guess_publisher(guess)
+        word = self.verifier.word(result)
+        if word is not None:
+            self.guess_publisher(word)
 
     def guess_publisher(self, guess):
         """Publish the verified guess."""
-        current_guess = String()
+        current_guess = UserInput()
+        current_guess.game_id = self.param_game_id
         publish = True
         # check if the guess has already been published
         if len(self.guess_pub_tracker) > 0:
@@ -199,25 +638,72 @@ class Paddle_Ocr(Node):
                     publish = False
         if publish:
             self.guess_pub_tracker.append(guess)
-            current_guess.data = guess
-            self.get_logger().info(f"Registering Guess: {guess}")
+            current_guess.guess = guess
+            if self.result_stamp is not None:
+                # how long after capture the guess is published
+                self.guess_age.fresh(self.result_stamp, self.now())
+                self.get_logger().info(
+                    f"Registering Guess: {guess}, "
+                    f"{self.now() - self.result_stamp:.2f} s after capture")
+            else:
+                self.get_logger().info(f"Registering Guess: {guess}")
             self.guess_publish.publish(current_guess)
+            if self.scheduler is not None:
+                self.scheduler.published(self.now())
+
+    def channel_timer(self):
+        """Attach to the image channel once it has been created."""
+        try:
+            self.channel = ImageChannel(self.param_image_channel)
+        except (FileNotFoundError, ValueError):
+            # not created yet, or still being set up
+            return
+        self.get_logger().info(
+            f"Reading crops from image channel {self.param_image_channel}")
+        self.channel_poll.cancel()
+
+    def channel_reader(self):
+        """Take views of the latest crops in the image channel."""
+        if not self.channel.alive:
+            # image_modification restarted and made a new channel
+            self.get_logger().warn(
+                f"Image channel {self.param_image_channel} closed, "
+                "attaching again")
+            self.channel.close()
+            self.channel = None
+            self.channel_poll.reset()
+            return
+        seq, frames = self.channel.read()
+        if frames is not None and len(frames) == 2:
+            self.frame_1, self.frame_2 = frames
+            self.frame_stamp = self.channel.last_stamp
+
+    def topic_reader(self):
+        """Convert the newest crops of the topics to opencv format."""
+        msg_1, stamp_1 = self.latest_1.take()
+        if msg_1 is not None:
+            self.frame_1 = self.cv_bridge.imgmsg_to_cv2(msg_1)
+        msg_2, stamp_2 = self.latest_2.take()
+        if msg_2 is not None:
+            self.frame_2 = self.cv_bridge.imgmsg_to_cv2(msg_2)
+        stamps = [stamp for stamp in (stamp_1, stamp_2) if stamp]
+        if stamps:
+            self.frame_stamp = min(stamps)
 
     def image_reader_1(self, msg):
-        """Convert image to opencv format."""
-        self.frame_1 = self.cv_bridge.imgmsg_to_cv2(msg)
-        # cv2.imshow("read_image_1", self.frame_1)
-        cv2.waitKey(1)
+        """Keep the newest letter crop until OCR runs."""
+        self.latest_1.put(msg, stamp_seconds(msg.header.stamp))
 
     def image_reader_2(self, msg):
-        """Convert image to opencv format."""
-        self.frame_2 = self.cv_bridge.imgmsg_to_cv2(msg)
-        # cv2.imshow("read_image_2", self.frame_2)
-        cv2.waitKey(1)
+        """Keep the newest word crop until OCR runs."""
+        self.latest_2.put(msg, stamp_seconds(msg.header.stamp))
 
 
 def main(args=None):
     rclpy.init(args=args)
     node = Paddle_Ocr()
-    rclpy.spin(node)
+    try:
+        rclpy.spin(node)
+    finally:
+        node.destroy_node()
     rclpy.shutdown()
@@ -0,0 +1,89 @@
+"""
+Polyline simplification for the points sent to the board.
+
+Every point sent to where_to_write becomes a cartesian plan and an executor
+step, so points that lie (almost) on the line between their neighbours are
+removed with Ramer-Douglas-Peucker before the request is made.
+
+Only the pen-down runs are simplified. Every point where the pen is off the
+board is kept, so the pen is lifted and lowered at exactly the same places.
+"""
+
+import numpy as np
+
+
+def rdp_mask(points, tolerance):
+    """
+    Find the points kept by Ramer-Douglas-Peucker.
+
+    Args
+    ----
+        points (np.array): the (n, 2) points of the polyline
+        tolerance (float): the largest distance a removed point may be from
+            the simplified line
+
+    Returns
+    -------
+        keep (np.array): a boolean mask of the points to keep
+
+    """
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start = points[first]
+        chord = points[last] - start
+        inner = points[first+1:last] - start
+        length = np.hypot(chord[0], chord[1])
+        if length > 0.0:
+            dist = np.abs(chord[0]*inner[:, 1] - chord[1]*inner[:, 0]) \
+                / length
+        else:
+            dist = np.hypot(inner[:, 0], inner[:, 1])
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            mid = first + 1 + i
+            keep[mid] = True
+            stack.append((mid, last))
+            stack.append((first, mid))
+    return keep
+
+
+def simplify_board_points(x, y, onboard, tolerance):
+    """
+    Simplify the pen-down strokes of a list of board points.
+
+    Args
+    ----
+        x (list): the x points on the board plane
+        y (list): the y points on the board plane
+        onboard (list): whether the pen is on the board at each point
+        tolerance (float): the simplification tolerance in metres
+
+    Returns
+    -------
+        x, y, onboard: the simplified points as arrays
+        removed (int): the number of points that were removed
+
+    """
+    points = np.column_stack((np.asarray(x, dtype=float),
+                              np.asarray(y, dtype=float))).reshape(-1, 2)
+    pen = np.asarray(onboard, dtype=bool)
+    keep = ~pen
+    if tolerance > 0.0 and len(pen) > 0:
+        # split into runs of points with the pen on the board
+        edges = np.flatnonzero(np.diff(pen.astype(np.int8))) + 1
+        bounds = np.concatenate(([0], edges, [len(pen)]))
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            if pen[start]:
+                keep[start:stop] = rdp_mask(points[start:stop], tolerance)
+    else:
+        keep[:] = True
+    removed = int(len(keep) - np.count_nonzero(keep))
+    return points[keep, 0], points[keep, 1], pen[keep], removed
@@ -0,0 +1,147 @@
+"""
+A latest-frame-only slot of images in shared memory.
+
+The OCR node hands its crops to the inference worker through one slot. A
+new write overwrites the frames that have not been read yet instead of
+queueing behind them, so the worker always reads the newest frames and a
+slow inference never builds up a backlog. Overwritten frames are counted
+as dropped.
+
+The slot is one shared memory block: a small int64 header followed by room
+for max_frames uint8 images of up to frame_bytes each. The header holds the
+sequence number of the last write, the sequence number of the last read,
+the number of dropped writes and the shape of each frame.
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# header fields
+SEQ = 0
+READ_SEQ = 1
+DROPPED = 2
+COUNT = 3
+SHAPES = 4
+
+
+class SharedFrameSlot:
+    """A slot of the latest frames, shared between processes."""
+
+    def __init__(self, lock, max_frames=2, frame_bytes=1 << 21, name=None):
+        """
+        Create a slot, or attach to the slot with the given name.
+
+        Args
+        ----
+            lock (multiprocessing.Lock): the lock shared by the writer and
+                the reader
+            max_frames (int): the most frames written together
+            frame_bytes (int): the largest size of one frame in bytes
+            name (str): the name of an existing slot to attach to
+
+        """
+        self.lock = lock
+        self.max_frames = max_frames
+        self.frame_bytes = frame_bytes
+        header_len = SHAPES + 3 * max_frames
+        size = 8 * header_len + max_frames * frame_bytes
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=self.owner, size=size)
+        self.header = np.ndarray(
+            (header_len,), dtype=np.int64, buffer=self.shm.buf)
+        self.data = np.ndarray(
+            (max_frames, frame_bytes), dtype=np.uint8, buffer=self.shm.buf,
+            offset=8 * header_len)
+        if self.owner:
+            self.header[:] = 0
+
+    @property
+    def name(self):
+        """The name to attach to the slot with."""
+        return self.shm.name
+
+    @property
+    def seq(self):
+        """The sequence number of the last write."""
+        return int(self.header[SEQ])
+
+    @property
+    def dropped(self):
+        """The number of writes overwritten before they were read."""
+        return int(self.header[DROPPED])
+
+    @property
+    def pending(self):
+        """Whether there are frames that have not been read yet."""
+        return bool(self.header[SEQ] > self.header[READ_SEQ])
+
+    def write(self, frames):
+        """
+        Replace the frames in the slot.
+
+        Args
+        ----
+            frames (list): the uint8 images
+
+        Returns
+        -------
+            seq (int): the sequence number of the write
+
+        """
+        if len(frames) > self.max_frames:
+            raise ValueError(
+                f'{len(frames)} frames do not fit a slot of {self.max_frames}')
+        for frame in frames:
+            if frame.nbytes > self.frame_bytes:
+                raise ValueError(
+                    f'A frame of {frame.nbytes} bytes does not fit a slot of '
+                    f'{self.frame_bytes} bytes')
+        with self.lock:
+            if self.header[SEQ] > self.header[READ_SEQ]:
+                self.header[DROPPED] += 1
+            for i, frame in enumerate(frames):
+                shape = frame.shape + (1,) * (3 - frame.ndim)
+                self.header[SHAPES + 3*i:SHAPES + 3*i + 3] = shape
+                self.data[i, :frame.nbytes] = np.ascontiguousarray(
+                    frame, dtype=np.uint8).reshape(-1)
+            self.header[COUNT] = len(frames)
+            self.header[SEQ] += 1
+            return int(self.header[SEQ])
+
+    def read(self, last_seq=0):
+        """
+        Take a copy of the frames if there is a newer write.
+
+        Args
+        ----
+            last_seq (int): the sequence number of the frames read last
+
+        Returns
+        -------
+            seq (int): the sequence number of the frames
+            frames (list): copies of the frames, or None if there is no
+                write newer than last_seq
+
+        """
+        with self.lock:
+            seq = int(self.header[SEQ])
+            if seq <= last_seq:
+                return last_seq, None
+            frames = []
+            for i in range(int(self.header[COUNT])):
+                h, w, c = self.header[SHAPES + 3*i:SHAPES + 3*i + 3]
+                frame = self.data[i, :h * w * c].reshape(h, w, c).copy()
+                frames.append(frame[:, :, 0] if c == 1 else frame)
+            self.header[READ_SEQ] = seq
+            return seq, frames
+
+    def close(self):
+        """Detach from the slot, and free it if this is the creator."""
+        self.header = None
+        self.data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,161 @@
+"""
+Order strokes and shapes to keep pen-up travel short.
+
+Drawing order is treated as an open travelling salesman problem over the
+start and end points of each path, where a path may also be drawn backwards.
+A greedy nearest neighbour tour is improved with 2-opt, in which reversing a
+run of the tour also reverses the direction of every path in it. Both are
+heuristics, so the given order is kept when it is already shorter.
+
+Everything is evaluated in a fixed order, so the same input always gives the
+same drawing order.
+"""
+
+import numpy as np
+
+from drawing.glyphs import join_strokes, split_strokes
+
+
+def _distance(a, b):
+    """Return the distance between two points, or 0 if either is None."""
+    if a is None or b is None:
+        return 0.0
+    return float(np.hypot(a[0] - b[0], a[1] - b[1]))
+
+
+def order_paths(starts, ends, origin=None, max_passes=50):
+    """
+    Find a drawing order for paths that keeps the travel between them short.
+
+    Args
+    ----
+        starts (np.array): the (n, 2) start point of each path
+        ends (np.array): the (n, 2) end point of each path
+        origin (np.array): where the pen is before the first path, or None
+        max_passes (int): the most 2-opt passes to make over the tour
+
+    Returns
+    -------
+        order (list): the index of each path in drawing order
+        reverse (list): whether each path in order is drawn backwards
+
+    """
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+    n = len(starts)
+    if n == 0:
+        return [], []
+
+    # greedy nearest neighbour tour
+    order = []
+    reverse = []
+    left = np.ones(n, dtype=bool)
+    pen = origin
+    for _ in range(n):
+        if pen is None:
+            best, flip = 0, False
+        else:
+            to_start = np.hypot(*(starts - pen).T)
+            to_end = np.hypot(*(ends - pen).T)
+            to_start[~left] = np.inf
+            to_end[~left] = np.inf
+            best_start = int(np.argmin(to_start))
+            best_end = int(np.argmin(to_end))
+            if to_end[best_end] < to_start[best_start]:
+                best, flip = best_end, True
+            else:
+                best, flip = best_start, False
+        order.append(best)
+        reverse.append(flip)
+        left[best] = False
+        pen = starts[best] if flip else ends[best]
+
+    # 2-opt, reversing order[i:j+1] and the direction of each path in it
+    order = np.array(order)
+    reverse = np.array(reverse)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(n):
+            flip = reverse[:, None]
+            entry = np.where(flip, ends[order], starts[order])
+            leave = np.where(flip, starts[order], ends[order])
+            before = origin if i == 0 else leave[i-1]
+
+            # gain from the new join after the reversed run, for every j >= i
+            tail = np.zeros(n - i)
+            tail[:-1] = np.hypot(*(entry[i+1:] - entry[i]).T) \
+                - np.hypot(*(entry[i+1:] - leave[i:-1]).T)
+            delta = tail
+            if before is not None:
+                delta = delta + np.hypot(*(leave[i:] - before).T) \
+                    - _distance(before, entry[i])
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-9:
+                j += i
+                order[i:j+1] = order[i:j+1][::-1]
+                reverse[i:j+1] = ~reverse[i:j+1][::-1]
+                improved = True
+        if not improved:
+            break
+
+    # never draw in an order longer than the given one
+    if travel_length(starts, ends, order, reverse, origin) > \
+       travel_length(starts, ends, range(n), [False] * n, origin):
+        return list(range(n)), [False] * n
+    return order.tolist(), reverse.tolist()
+
+
+def travel_length(starts, ends, order, reverse, origin=None):
+    """Return the pen-up travel of a drawing order."""
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+    length = 0.0
+    pen = origin
+    for k, flip in zip(order, reverse):
+        length += _distance(pen, ends[k] if flip else starts[k])
+        pen = starts[k] if flip else ends[k]
+    return length
+
+
+def order_strokes(x, y, onboard):
+    """
+    Reorder the strokes of one shape to keep pen-up travel short.
+
+    Args
+    ----
+        x (list): the x points on the board plane
+        y (list): the y points on the board plane
+        onboard (list): whether the pen is on the board at each point
+
+    Returns
+    -------
+        x, y, onboard: the points with the strokes in drawing order
+
+    """
+    strokes = split_strokes(x, y, onboard)
+    if len(strokes) < 2:
+        return np.asarray(x, dtype=float), np.asarray(y, dtype=float), \
+            np.asarray(onboard, dtype=bool)
+    order, reverse = order_paths([s[0] for s in strokes],
+                                 [s[-1] for s in strokes])
+    return join_strokes([strokes[k][::-1] if flip else strokes[k]
+                         for k, flip in zip(order, reverse)])
+
+
+def reverse_strokes(x, y, onboard):
+    """
+    Reverse the drawing direction of a shape.
+
+    Args
+    ----
+        x (list): the x points on the board plane
+        y (list): the y points on the board plane
+        onboard (list): whether the pen is on the board at each point
+
+    Returns
+    -------
+        x, y, onboard: the points drawn from the last to the first
+
+    """
+    strokes = split_strokes(x, y, onboard)
+    return join_strokes([s[::-1] for s in strokes[::-1]])
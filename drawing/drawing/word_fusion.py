@@ -0,0 +1,142 @@
+"""
+Character level fusion of the words read by OCR.
+
+Instead of waiting for several identical reads of a whole word, the last
+few reads vote on each position separately. Every read is taken as a noisy
+observation of each letter: the letter read is right with probability
+1 - e and any other letter is read with probability e / 25, where e is the
+larger of misread_rate and 1 - the confidence of the read. With a uniform
+prior this gives a posterior over the 26 letters at each position, and the
+word is confirmed once every position has a letter above the threshold.
+
+A single misread character then only weakens its own position, and two
+clean reads are enough to confirm a word.
+
+With a dictionary the posterior can also be taken over the dictionary
+words of the right length. When the positions are not all sure yet, the
+word is confirmed as the dictionary word if that word passes the threshold
+and differs from the most likely letters in at most max_edits positions.
+Like the letters, a dictionary word needs at least two reads.
+
+The latest read has to agree with the confirmed word in all but max_edits
+positions, so the reads left over from the previous word on the board do
+not confirm it again when the board changes.
+"""
+
+from collections import deque
+
+import numpy as np
+
+
+class WordFusion:
+    """Confirms words from a stream of OCR reads."""
+
+    def __init__(self, length=6, reads=5, threshold=0.99, misread_rate=0.1,
+                 words=None, max_edits=1):
+        """
+        Create the fusion.
+
+        Args
+        ----
+            length (int): the length of the words
+            reads (int): the number of latest reads that vote
+            threshold (float): the posterior that confirms a letter or word
+            misread_rate (float): the least chance that a letter is misread
+            words (WordIndex): the dictionary to snap to, or None
+            max_edits (int): the most letters changed by snapping
+
+        """
+        self.length = length
+        self.threshold = threshold
+        self.misread_rate = misread_rate
+        self.words = words
+        self.max_edits = max_edits
+        self.reads = deque(maxlen=reads)
+
+    def reset(self):
+        """Forget all reads."""
+        self.reads.clear()
+
+    def log_likelihood(self):
+        """
+        Return the log likelihood of each letter at each position.
+
+        Returns
+        -------
+            log_likelihood (np.array): a (length, 26) array
+
+        """
+        total = np.zeros((self.length, 26))
+        positions = np.arange(self.length)
+        for letters, confidence in self.reads:
+            error = min(max(self.misread_rate, 1.0 - confidence), 0.5)
+            read = np.full((self.length, 26), np.log(error / 25))
+            read[positions, letters] = np.log(1.0 - error)
+            total += read
+        return total
+
+    def posterior(self, log_likelihood=None):
+        """Return the posterior of each letter at each position."""
+        if log_likelihood is None:
+            log_likelihood = self.log_likelihood()
+        odds = np.exp(
+            log_likelihood - log_likelihood.max(axis=1, keepdims=True))
+        return odds / odds.sum(axis=1, keepdims=True)
+
+    def snap(self, log_likelihood, best):
+        """
+        Find the dictionary word that the reads are sure of.
+
+        Returns
+        -------
+            word (str): the dictionary word, or None
+
+        """
+        letters = self.words.letters(self.length)
+        if len(letters) == 0:
+            return None
+        scores = log_likelihood[np.arange(self.length),
+                                letters.astype(np.intp) - 65].sum(axis=1)
+        i = int(np.argmax(scores))
+        odds = np.exp(scores - scores[i])
+        if odds[i] / odds.sum() < self.threshold:
+            return None
+        if np.count_nonzero(letters[i] - 65 != best) > self.max_edits:
+            return None
+        return self.words.word(self.length, i)
+
+    def add(self, word, confidence):
+        """
+        Add a read, and confirm a word if the reads are sure enough.
+
+        Args
+        ----
+            word (str): the word read
+            confidence (float): the confidence of the read
+
+        Returns
+        -------
+            word (str): the confirmed upper case word, or None
+
+        """
+        word = word.upper()
+        if len(word) != self.length or not (word.isascii()
+                                            and word.isalpha()):
+            return None
+        letters = np.frombuffer(word.encode('ascii'), dtype=np.uint8) - 65
+        self.reads.append((letters.astype(np.intp), confidence))
+
+        log_likelihood = self.log_likelihood()
+        posterior = self.posterior(log_likelihood)
+        best = posterior.argmax(axis=1)
+        found = None
+        if posterior[np.arange(self.length), best].min() >= self.threshold:
+            found = bytes((best + 65).astype(np.uint8)).decode('ascii')
+        elif self.words is not None and len(self.reads) > 1:
+            found = self.snap(log_likelihood, best)
+        if found is None:
+            return None
+        if sum(a != b for a, b in zip(word, found)) > self.max_edits:
+            return None
+        self.reset()
+        return found
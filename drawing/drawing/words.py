@@ -0,0 +1,226 @@
+"""
+Offline word dictionary for the hangman game.
+
+The word list is preprocessed into one compact uint8 buffer of upper case
+letters, sorted by word length, and a small table with the offset and count
+of each length bucket. Both are loaded with a memory map, and a word of a
+given length is found with offset arithmetic, so picking a random word is
+O(1) and needs no network.
+
+For pattern queries each length bucket also gets a 26 bit letter presence
+mask per word and a column of letters per position, so a query like
+"B_B_E_ without X, Q or Z" is a few vectorized boolean operations over the
+whole bucket.
+
+The index is built from a plain text word list with the build_words entry
+point, e.g.
+
+    ros2 run drawing build_words data/words.txt data
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+
+
+WORDS_FILE = 'words.npy'
+INDEX_FILE = 'word_index.npy'
+
+
+def build_word_index(words, directory):
+    """
+    Write the word buffer and length index for a list of words.
+
+    Words with anything other than the letters a-z are skipped.
+
+    Args
+    ----
+        words (list): the words of the dictionary
+        directory (str): the directory to write the index in
+
+    Returns
+    -------
+        count (int): the number of words in the index
+
+    """
+    cleaned = sorted({w.strip().upper() for w in words
+                      if w.strip().isascii() and w.strip().isalpha()},
+                     key=lambda w: (len(w), w))
+    max_len = max((len(w) for w in cleaned), default=0)
+
+    # index[length] = [offset of the first letter, number of words]
+    index = np.zeros((max_len + 1, 2), dtype=np.int64)
+    offset = 0
+    for w in cleaned:
+        if index[len(w), 1] == 0:
+            index[len(w), 0] = offset
+        index[len(w), 1] += 1
+        offset += len(w)
+    buffer = np.frombuffer(''.join(cleaned).encode('ascii'), dtype=np.uint8)
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, WORDS_FILE), buffer)
+    np.save(os.path.join(directory, INDEX_FILE), index)
+    return len(cleaned)
+
+
+def default_directory():
+    """Return the directory of the dictionary installed with the package."""
+    from ament_index_python.packages import get_package_share_directory
+    return os.path.join(get_package_share_directory('drawing'), 'data')
+
+
+def letter_mask(letters):
+    """Return the 26 bit presence mask of a set of letters."""
+    mask = 0
+    for letter in letters.upper():
+        mask |= 1 << (ord(letter) - ord('A'))
+    return mask
+
+
+class WordIndex:
+    """A length bucketed word dictionary backed by a memory map."""
+
+    def __init__(self, directory=None):
+        """
+        Load the dictionary.
+
+        Args
+        ----
+            directory (str): the directory of the index, the one installed
+                with the package if None
+
+        """
+        if directory is None:
+            directory = default_directory()
+        self.buffer = np.load(os.path.join(directory, WORDS_FILE),
+                              mmap_mode='r')
+        self.index = np.load(os.path.join(directory, INDEX_FILE))
+        self._masks = {}
+        self._columns = {}
+
+    def count(self, length):
+        """Return the number of words with the given length."""
+        if length >= len(self.index):
+            return 0
+        return int(self.index[length, 1])
+
+    def letters(self, length):
+        """
+        Return the words of a length as a (count, length) uint8 array.
+
+        The array is a view of the memory map, nothing is copied.
+        """
+        start = int(self.index[length, 0]) if self.count(length) else 0
+        stop = start + self.count(length) * length
+        return self.buffer[start:stop].reshape(-1, length)
+
+    def word(self, length, i):
+        """Return the i-th word of the given length."""
+        start = int(self.index[length, 0]) + i * length
+        return self.buffer[start:start + length].tobytes().decode('ascii')
+
+    def masks(self, length):
+        """Return the 26 bit letter presence mask of each word of a length."""
+        if length not in self._masks:
+            bits = np.left_shift(np.uint32(1),
+                                 self.letters(length).astype(np.uint32) - 65)
+            self._masks[length] = np.bitwise_or.reduce(bits, axis=1)
+        return self._masks[length]
+
+    def columns(self, length):
+        """Return the letters at each position as a (length, count) array."""
+        if length not in self._columns:
+            self._columns[length] = np.ascontiguousarray(
+                self.letters(length).T)
+        return self._columns[length]
+
+    def match(self, pattern, excluded='', revealed=False):
+        """
+        Find the words that fit a pattern.
+
+        Args
+        ----
+            pattern (str): the word with '_' for each unknown letter
+            excluded (str): letters that are not in the word
+            revealed (bool): whether the letters of the pattern are at every
+                position they are in the word, as in hangman, so no '_'
+                stands for one of them
+
+        Returns
+        -------
+            match (np.array): a boolean mask over the words of the length of
+                the pattern
+
+        """
+        length = len(pattern)
+        if self.count(length) == 0:
+            return np.zeros(0, dtype=bool)
+        excluded_mask = np.uint32(letter_mask(excluded))
+        match = (self.masks(length) & excluded_mask) == 0
+        columns = self.columns(length)
+        for i, letter in enumerate(pattern.upper()):
+            if letter != '_':
+                match &= columns[i] == ord(letter)
+        if revealed:
+            known = np.uint32(letter_mask(pattern.replace('_', '')))
+            hidden = [i for i, letter in enumerate(pattern) if letter == '_']
+            if known and hidden:
+                bits = np.left_shift(
+                    np.uint32(1), columns[hidden].astype(np.uint32) - 65)
+                match &= (np.bitwise_or.reduce(bits, axis=0) & known) == 0
+        return match
+
+    def query(self, pattern, excluded='', revealed=False):
+        """
+        Find the words that fit a pattern.
+
+        Args
+        ----
+            pattern (str): the word with '_' for each unknown letter
+            excluded (str): letters that are not in the word
+            revealed (bool): whether the letters of the pattern are at every
+                position they are in the word, as in hangman, so no '_'
+                stands for one of them
+
+        Returns
+        -------
+            words (list): the matching upper case words
+
+        """
+        length = len(pattern)
+        found = np.flatnonzero(self.match(pattern, excluded, revealed))
+        return [self.word(length, int(i)) for i in found]
+
+    def random_word(self, length, rng=random):
+        """
+        Pick a random word.
+
+        Args
+        ----
+            length (int): the number of letters in the word
+            rng (random.Random): the random number generator to use
+
+        Returns
+        -------
+            word (str): an upper case word
+
+        """
+        count = self.count(length)
+        if count == 0:
+            raise ValueError(f'There are no {length} letter words')
+        return self.word(length, rng.randrange(count))
+
+
+def main(args=None):
+    """Build the word index from a text file with one word per line."""
+    args = sys.argv[1:] if args is None else args
+    if len(args) != 2:
+        print('usage: build_words WORD_LIST OUTPUT_DIRECTORY')
+        return 1
+    with open(args[0]) as f:
+        count = build_word_index(f.read().split(), args[1])
+    print(f'Wrote {count} words to {args[1]}')
+    return 0
@@ -21,6 +21,13 @@ setup(
              'launch/game_time.launch.xml'
          ]
          ),
+        ('share/' + package_name + '/data',
+         [
+             'data/words.txt',
+             'data/words.npy',
+             'data/word_index.npy'
+         ]
+         ),
     ],
     install_requires=['setuptools'],
     zip_safe=True,
@@ -39,7 +46,11 @@ setup(
             "paddle_ocr = drawing.paddle_ocr:main",
             "hangman = drawing.hangman:main",
             "brain = drawing.brain:main",
-            "image_modification = drawing.image_modification:main"
+            "image_modification = drawing.image_modification:main",
+            "build_words = drawing.words:main",
+            "hangman_sim = drawing.hangman_sim:main",
+            "letter_eval = drawing.letter_eval:main",
+            "ocr_bench = drawing.ocr_bench:main"
         ],
     },
 )
@@ -0,0 +1,32 @@
+import cv2
+import numpy as np
+
+from drawing.board_preprocess import preprocess_frame, PreprocessParams, \
+    STAGES
+
+
+def whiteboard_frame(letter='A'):
+    frame = np.full((480, 640, 3), 60, dtype=np.uint8)
+    corners = np.array([[100, 80], [560, 100], [540, 420], [120, 400]],
+                       dtype=np.int32)
+    cv2.fillPoly(frame, [corners], (235, 235, 235))
+    cv2.putText(frame, letter, (280, 300), cv2.FONT_HERSHEY_SIMPLEX, 5,
+                (20, 20, 20), 4)
+    return frame
+
+
+def test_board_is_warped_and_binarized():
+    timings = {}
+    binary, inverted = preprocess_frame(
+        whiteboard_frame(), PreprocessParams(), timings)
+    assert set(timings) == set(STAGES)
+    assert binary.shape == inverted.shape
+    assert set(np.unique(binary)) <= {0, 255}
+    # there is ink, and the dilated strokes have more of it
+    ink = np.count_nonzero(binary == 0)
+    assert 0 < ink < np.count_nonzero(inverted == 0)
+
+
+def test_no_board():
+    frame = np.full((480, 640, 3), 60, dtype=np.uint8)
+    assert preprocess_frame(frame, PreprocessParams()) == (None, None)
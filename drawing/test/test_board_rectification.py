@@ -0,0 +1,104 @@
+import cv2
+import numpy as np
+import pytest
+
+from drawing.board_preprocess import PreprocessParams
+from drawing.board_rectification import board_homography, BoardRectifier
+
+CAMERA = np.array([[600.0, 0, 320], [0, 600.0, 240], [0, 0, 1]])
+REGION = (0.0, 0.0, 0.4, 0.3)
+
+
+def board_pose(x=-0.2, y=-0.15, z=0.6, tilt=0.1):
+    pose = np.eye(4)
+    pose[:3, :3] = cv2.Rodrigues(np.array([tilt, 0.0, 0.0]))[0]
+    pose[:3, 3] = [x, y, z]
+    return pose
+
+
+def camera_frame(pose):
+    """Render a board with an A in the middle as seen by the camera."""
+    board = np.full((300, 400, 3), 235, dtype=np.uint8)
+    cv2.putText(board, 'A', (140, 220), cv2.FONT_HERSHEY_SIMPLEX, 5,
+                (20, 20, 20), 6)
+    # a board pixel is a millimetre
+    to_board = np.diag([0.001, 0.001, 1.0])
+    homography = board_homography(CAMERA, pose) @ to_board
+    return cv2.warpPerspective(board, homography, (640, 480),
+                               borderValue=(60, 60, 60))
+
+
+def test_board_is_rectified():
+    pose = board_pose()
+    rectifier = BoardRectifier(PreprocessParams(), REGION, 1000.0)
+    assert not rectifier.ready
+    rectifier.set_camera(CAMERA)
+    rectifier.set_pose(pose)
+    assert rectifier.ready
+    binary, inverted = rectifier.crops(camera_frame(pose))
+    assert binary.shape == (300, 400)
+    # the letter is in the middle of the board, the edges are blank
+    ink = binary[5:-5, 5:-5] == 0
+    assert ink[95:245, 115:275].sum() > 0.95 * ink.sum() > 0
+    # the corners of the region are where the board is in the frame
+    corners = rectifier.corners().reshape(4, 2)
+    # the origin of the board is at (-0.2, -0.15, 0.6)
+    assert np.allclose(corners[0], [120, 90])
+
+
+def test_maps_are_kept_while_the_pose_is_stable():
+    rectifier = BoardRectifier(PreprocessParams(), REGION)
+    rectifier.set_camera(CAMERA)
+    assert rectifier.set_pose(board_pose())
+    assert not rectifier.set_pose(board_pose(x=-0.2005))
+    assert not rectifier.set_camera(CAMERA.copy())
+    assert rectifier.set_pose(board_pose(x=-0.21))
+    assert rectifier.set_pose(board_pose(tilt=0.2))
+    assert rectifier.rebuilds == 3
+
+
+def test_board_behind_the_camera():
+    rectifier = BoardRectifier(PreprocessParams(), REGION)
+    rectifier.set_camera(CAMERA)
+    with pytest.raises(ValueError):
+        rectifier.set_pose(board_pose(z=-0.6))
+    assert not rectifier.ready
+
+
+def distort(frame, camera_matrix, distortion):
+    """Return a frame as a camera with lens distortion would see it."""
+    height, width = frame.shape[:2]
+    xs, ys = np.meshgrid(np.arange(width, dtype=np.float32),
+                         np.arange(height, dtype=np.float32))
+    pixels = np.stack((xs, ys), axis=-1).reshape(-1, 1, 2)
+    undistorted = cv2.undistortPoints(
+        pixels, camera_matrix, distortion, P=camera_matrix)
+    maps = undistorted.reshape(height, width, 2)
+    return cv2.remap(frame, maps[..., 0], maps[..., 1], cv2.INTER_LINEAR,
+                     borderValue=(60, 60, 60))
+
+
+def test_raw_frame_is_undistorted_in_the_same_remap():
+    pose = board_pose()
+    distortion = np.array([-0.2, 0.05, 0.0, 0.0, 0.0])
+    frame = camera_frame(pose)
+    raw = distort(frame, CAMERA, distortion)
+
+    rectified = BoardRectifier(PreprocessParams(), REGION, 1000.0)
+    rectified.set_camera(CAMERA)
+    rectified.set_pose(pose)
+    expected, _ = rectified.crops(frame)
+
+    rectifier = BoardRectifier(PreprocessParams(), REGION, 1000.0)
+    rectifier.set_camera(CAMERA, distortion)
+    rectifier.set_pose(pose)
+    binary, _ = rectifier.crops(raw)
+    ignored, _ = rectified.crops(raw)
+    inside = np.s_[5:-5, 5:-5]
+    error = np.mean(binary[inside] != expected[inside])
+    assert error < 0.001
+    assert error < np.mean(ignored[inside] != expected[inside]) / 2
+
+    # zero distortion needs no undistortion
+    assert rectifier.set_camera(CAMERA, np.zeros(5))
+    assert rectifier.distortion is None
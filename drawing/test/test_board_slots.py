@@ -0,0 +1,60 @@
+import cv2
+import numpy as np
+
+from drawing.board_preprocess import preprocess_frame, PreprocessParams
+from drawing.board_slots import EMPTY_CROP, ink_box, is_empty, SlotCropper
+
+from test_board_preprocess import whiteboard_frame
+
+
+# the whole board for both paths
+WHOLE_BOARD = ((0.0, 0.0, 1.0, 1.0), (0.0, 0.0, 1.0, 1.0))
+
+
+def board(text, scale=5, at=(280, 300)):
+    frame = whiteboard_frame('')
+    cv2.putText(frame, text, at, cv2.FONT_HERSHEY_SIMPLEX, scale,
+                (20, 20, 20), 4)
+    return preprocess_frame(frame, PreprocessParams())
+
+
+def test_letter_goes_to_the_letter_path():
+    binary, inverted = board('A')
+    letter, word = SlotCropper(WHOLE_BOARD).crops(binary, inverted)
+    assert is_empty(word)
+    # the crop is cut down to the letter
+    assert letter.size < binary.size / 4
+    assert np.count_nonzero(letter == 0) > 0.9 * np.count_nonzero(
+        binary[10:-10, 10:-10] == 0)
+
+
+def test_word_goes_to_the_word_path():
+    binary, inverted = board('PYTHON', scale=2.2, at=(140, 280))
+    cropper = SlotCropper(WHOLE_BOARD)
+    letter, word = cropper.crops(binary, inverted)
+    assert is_empty(letter)
+    assert word.shape[1] > 3 * word.shape[0]
+    assert (cropper.letters, cropper.words, cropper.empty) == (0, 1, 0)
+
+
+def test_blank_board_runs_neither_path():
+    binary, inverted = board('')
+    cropper = SlotCropper(WHOLE_BOARD)
+    assert cropper.crops(binary, inverted) == (EMPTY_CROP, EMPTY_CROP)
+    assert cropper.empty == 1
+
+
+def test_only_the_slot_is_searched():
+    binary, inverted = board('A')
+    # the letter is in the middle of the board, not on its left
+    cropper = SlotCropper(((0.0, 0.0, 0.3, 1.0), WHOLE_BOARD[1]))
+    letter, _ = cropper.crops(binary, inverted)
+    assert is_empty(letter)
+
+
+def test_specks_are_not_ink():
+    binary = np.full((100, 100), 255, dtype=np.uint8)
+    binary[10, 10] = binary[50, 80] = 0
+    assert ink_box(binary) is None
+    binary[40:60, 45:50] = 0
+    assert ink_box(binary) == (45, 40, 5, 20)
@@ -0,0 +1,76 @@
+import numpy as np
+
+from drawing.board_preprocess import preprocess_frame, PreprocessParams
+from drawing.board_tracker import BoardTracker, LatencyStats
+
+from test_board_preprocess import whiteboard_frame
+
+
+def shifted(frame, dx):
+    moved = np.full_like(frame, 60)
+    moved[:, dx:] = frame[:, :frame.shape[1] - dx]
+    return moved
+
+
+def test_tracked_crops_match_the_search():
+    params = PreprocessParams()
+    frame = whiteboard_frame()
+    tracker = BoardTracker(params)
+    binary, inverted = preprocess_frame(frame, params)
+    for _ in range(3):
+        timings = {}
+        _, corners, tracked_binary, tracked_inverted = tracker.update(
+            frame, timings)
+        assert tracked_binary.shape == binary.shape
+        assert np.mean(tracked_binary != binary) < 0.01
+        assert np.mean(tracked_inverted != inverted) < 0.01
+    # the board is searched for once, then tracked with the same maps
+    assert (tracker.detections, tracker.tracked, tracker.rebuilds) == \
+        (1, 2, 1)
+    assert 'contours' not in timings and 'track' in timings
+
+
+def test_board_is_followed_when_it_moves():
+    tracker = BoardTracker(PreprocessParams())
+    frame = whiteboard_frame()
+    _, before, _, _ = tracker.update(frame)
+    _, after, binary, _ = tracker.update(shifted(frame, 20))
+    assert np.allclose(after - before, [20, 0], atol=1.0)
+    assert binary is not None
+    assert tracker.rebuilds == 2
+
+
+def test_board_is_searched_for_when_lost():
+    tracker = BoardTracker(PreprocessParams())
+    empty = np.full((480, 640, 3), 60, dtype=np.uint8)
+    assert tracker.update(empty)[1] is None
+    assert tracker.update(whiteboard_frame())[1] is not None
+    assert tracker.update(empty)[1] is None
+    assert tracker.detections == 3 and tracker.tracked == 0
+
+
+def test_latency_report():
+    stats = LatencyStats()
+    stats.add({'warp': 0.002, 'threshold': 0.001})
+    stats.add({'warp': 0.004, 'threshold': 0.001})
+    report, fps = stats.report()
+    assert report['warp'] == 3.0
+    assert report['total'] == 4.0
+    assert fps > 0
+    assert stats.frames == 0
+
+
+def test_distortion_is_undone_in_the_warp():
+    camera = np.array([[600.0, 0, 320], [0, 600.0, 240], [0, 0, 1]])
+    distortion = np.array([-0.05, 0.0, 0.0, 0.0, 0.0])
+    tracker = BoardTracker(PreprocessParams())
+    tracker.set_camera(camera, distortion)
+    _, _, binary, _ = tracker.update(whiteboard_frame())
+    assert tracker.camera is not None and binary is not None
+    # the maps are kept until the calibration changes
+    tracker.set_camera(camera, distortion)
+    tracker.update(whiteboard_frame())
+    tracker.set_camera(camera, np.zeros(5))
+    assert tracker.camera is None
+    tracker.update(whiteboard_frame())
+    assert tracker.rebuilds == 2
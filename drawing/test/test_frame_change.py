@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+
+from drawing.frame_change import RecognitionCache, frame_change, frame_key
+
+
+def board(letter_x):
+    frame = np.full((120, 200), 255, dtype=np.uint8)
+    frame[40:80, letter_x:letter_x + 20] = 0
+    return frame
+
+
+def written(letter=None):
+    # a whole 300x420 board crop with a letter at the guess spot
+    frame = np.full((300, 420), 235, dtype=np.uint8)
+    if letter is not None:
+        cv2.putText(frame, letter, (150, 250), cv2.FONT_HERSHEY_SIMPLEX,
+                    1.0, 30, 3)
+    return frame
+
+
+def test_noise_keeps_thumbnail_close():
+    rng = np.random.default_rng(0)
+    frame = written('A')
+    noisy = np.clip(frame + rng.normal(0, 8, frame.shape), 0, 255)
+    assert frame_change(frame_key(frame),
+                        frame_key(noisy.astype(np.uint8))) <= 8
+    assert frame_change(frame_key(board(60)), frame_key(board(140))) > 16
+
+
+def test_cache_reuses_unchanged_frames():
+    cache = RecognitionCache(max_change=16)
+    key = cache.key(board(60))
+    assert cache.lookup('letter', key) is None
+    cache.store('letter', key, [[('A', 0.9)]])
+    assert cache.lookup('letter', cache.key(board(60))) == [[('A', 0.9)]]
+    assert cache.lookup('letter', cache.key(board(140))) is None
+    # another crop never reuses the result of this one
+    assert cache.lookup('word', key) is None
+    assert cache.hits == 1 and cache.misses == 3
+    assert cache.skip_rate == 1 / 4
+
+
+def test_new_letter_at_the_same_spot_misses():
+    cache = RecognitionCache()
+    for old, new in ((None, 'A'), ('E', 'F'), ('O', 'Q'), ('O', 'C')):
+        cache.store('letter', cache.key(written(old)), [[(old, 0.9)]])
+        assert cache.lookup('letter', cache.key(written(new))) is None
+
+
+def test_negative_change_turns_cache_off():
+    cache = RecognitionCache(max_change=-1)
+    key = cache.key(board(60))
+    cache.store('letter', key, [[('A', 0.9)]])
+    assert cache.lookup('letter', key) is None
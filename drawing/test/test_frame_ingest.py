@@ -0,0 +1,53 @@
+import threading
+from types import SimpleNamespace
+
+from drawing.frame_ingest import FrameAge, LatestFrame, stamp_seconds
+
+
+def test_newest_frame_is_taken_and_older_dropped():
+    latest = LatestFrame()
+    assert latest.take() == (None, None)
+    for i in range(3):
+        latest.put(f'frame {i}', float(i))
+    assert latest.take() == ('frame 2', 2.0)
+    assert latest.take() == (None, None)
+    latest.put('frame 3', 3.0)
+    assert latest.take() == ('frame 3', 3.0)
+    assert (latest.received, latest.taken, latest.dropped) == (4, 2, 2)
+
+
+def test_every_frame_is_taken_or_dropped():
+    latest = LatestFrame()
+    taken = []
+
+    def consume():
+        while len(taken) < 100 and latest.received < 10000:
+            frame, _ = latest.take()
+            if frame is not None:
+                taken.append(frame)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    for i in range(10000):
+        latest.put(i, float(i))
+    consumer.join()
+    latest.take()
+    assert taken == sorted(taken)
+    assert latest.taken + latest.dropped == latest.received == 10000
+
+
+def test_frame_age():
+    age = FrameAge(max_age=0.5)
+    assert age.fresh(10.0, 10.1)
+    assert not age.fresh(10.0, 10.9)
+    assert age.stale == 1
+    mean, largest = age.report()
+    assert round(mean) == 500 and round(largest) == 900
+    assert age.report() == (0.0, 0.0)
+    # no bound
+    assert FrameAge(0.0).fresh(0.0, 100.0)
+
+
+def test_stamp_seconds():
+    stamp = SimpleNamespace(sec=12, nanosec=500000000)
+    assert stamp_seconds(stamp) == 12.5
@@ -0,0 +1,50 @@
+from drawing.glyph_atlas import atlas_key, load_atlas, save_atlas
+from drawing.glyphs import hangman_part
+
+import numpy as np
+
+
+def make_alphabet():
+    alphabet = {}
+    for letter in '0|-':
+        xlist, ylist, onboard = hangman_part(letter, 0.001, 1.0)
+        alphabet[letter] = {'xlist': xlist, 'ylist': ylist,
+                            'onboard': onboard}
+    return alphabet
+
+
+def test_round_trip(tmp_path):
+    alphabet = make_alphabet()
+    key = atlas_key('font', 0.001, 1.0, '0|-', 0.0005)
+    save_atlas(str(tmp_path), key, alphabet)
+
+    loaded = load_atlas(str(tmp_path), key)
+    assert set(loaded) == set(alphabet)
+    for letter, glyph in alphabet.items():
+        assert np.allclose(loaded[letter]['xlist'], glyph['xlist'])
+        assert np.allclose(loaded[letter]['ylist'], glyph['ylist'])
+        assert list(loaded[letter]['onboard']) == glyph['onboard']
+
+
+def test_scale_change_invalidates(tmp_path):
+    old_key = atlas_key('font', 0.001, 1.0, '0|-', 0.0005)
+    new_key = atlas_key('font', 0.002, 2.0, '0|-', 0.0005)
+    assert old_key != new_key
+
+    save_atlas(str(tmp_path), old_key, make_alphabet())
+    assert load_atlas(str(tmp_path), new_key) is None
+
+    save_atlas(str(tmp_path), new_key, make_alphabet())
+    assert load_atlas(str(tmp_path), old_key) is None
+    assert load_atlas(str(tmp_path), new_key) is not None
+
+
+def test_font_file_change_invalidates(tmp_path):
+    font = tmp_path / 'font.ttf'
+    font.write_bytes(b'fallback')
+    old_key = atlas_key('font', 0.001, 1.0, '0|-', 0.0005, str(font))
+    assert old_key != atlas_key('font', 0.001, 1.0, '0|-', 0.0005)
+    # the real font installed in place of the fallback
+    font.write_bytes(b'the real font')
+    assert atlas_key('font', 0.001, 1.0, '0|-', 0.0005, str(font)) \
+        != old_key
@@ -0,0 +1,56 @@
+import os
+
+from drawing.glyphs import CLOSEPOLY, CURVE3, LINETO, MOVETO
+from drawing.glyphs import flatten_path, glyph_board_points, join_strokes
+from drawing.glyphs import resolve_font
+
+import numpy as np
+
+
+def test_flatten_curve_within_tolerance():
+    verts = np.array([[0.0, 0.0], [50.0, 100.0], [100.0, 0.0]])
+    codes = np.array([MOVETO, CURVE3, CURVE3])
+    strokes = flatten_path(verts, codes, 0.5)
+
+    assert len(strokes) == 1
+    points = strokes[0]
+    assert np.allclose(points[0], [0.0, 0.0])
+    assert np.allclose(points[-1], [100.0, 0.0])
+    # every point lies on the parabola y = 2x - x^2/50
+    x = points[:, 0]
+    assert np.allclose(points[:, 1], 2*x - x**2/50)
+    # curved, but far from the 2^16 points of the split limit
+    assert 4 < len(points) < 64
+
+
+def test_subpaths_lift_the_pen():
+    verts = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 0.0],
+                      [2.0, 2.0], [3.0, 2.0]])
+    codes = np.array([MOVETO, LINETO, LINETO, CLOSEPOLY, MOVETO, LINETO])
+    strokes = flatten_path(verts, codes, 0.1)
+    assert len(strokes) == 2
+    assert np.allclose(strokes[0], [[0, 0], [1, 0], [1, 1], [0, 0]])
+
+    xlist, ylist, onboard = join_strokes(strokes)
+    assert xlist.tolist() == [0.0, 1.0, 1.0, 0.0, 0.0, 2.0, 2.0, 3.0]
+    assert ylist.tolist() == [0.0, 0.0, 1.0, 0.0, 0.0, 2.0, 2.0, 2.0]
+    assert onboard.tolist() == [True, True, True, True, False, False, True, True]
+
+
+def test_glyph_board_points_are_contiguous_arrays():
+    glyph = {'xlist': [0, 1, 2], 'ylist': (0.5, 1.5, 2.5),
+             'onboard': [1, 0, True]}
+    x, y, onboard = glyph_board_points(glyph)
+    assert x.dtype == np.float64 and y.dtype == np.float64
+    assert onboard.dtype == bool
+    assert x.flags.c_contiguous and y.flags.c_contiguous
+    np.testing.assert_array_equal(x, [0.0, 1.0, 2.0])
+    np.testing.assert_array_equal(y, [0.5, 1.5, 2.5])
+    np.testing.assert_array_equal(onboard, [True, False, True])
+
+
+def test_resolve_font_reports_the_fallback():
+    path, family = resolve_font('No Such Font Family')
+    # matplotlib traces another font, whose family is reported
+    assert family != 'No Such Font Family'
+    assert os.path.isfile(path)
@@ -0,0 +1,46 @@
+from drawing.guess_verification import GuessVerifier
+from drawing.letter_voting import LetterVoter
+from drawing.word_fusion import WordFusion
+
+
+def verifier():
+    return GuessVerifier(LetterVoter.from_targets(0.5, 1.0), WordFusion(),
+                         threshold=0.5, word_confidence=0.75)
+
+
+def test_letter_is_confirmed_by_steady_readings():
+    guesses = verifier()
+    needed = guesses.letter_voter.readings_needed
+    confirmed = [guesses.letter([[('A', 0.9)]], 0.5 * i)
+                 for i in range(needed)]
+    assert confirmed == [None] * (needed - 1) + ['A']
+
+
+def test_letter_results_that_do_not_count():
+    guesses = verifier()
+    for i, result in enumerate([None, [], [[('AB', 0.9)]], [[('1', 0.9)]],
+                                [[('A', 0.5)]], [[('É', 0.9)]]] * 4):
+        assert guesses.letter(result, 0.5 * i) is None
+    assert not guesses.building(10.0)
+
+
+def test_zero_is_read_as_o():
+    guesses = verifier()
+    confirmed = [guesses.letter([[('0', 0.9)]], 0.5 * i) for i in range(10)]
+    assert 'O' in confirmed
+
+
+def test_word_is_confirmed_above_its_own_threshold():
+    guesses = verifier()
+    # confident enough for a letter, but not for a word
+    for _ in range(3):
+        assert guesses.word([[('BABIES', 0.7)]]) is None
+    assert guesses.word([[('BABIES', 0.95)]]) is None
+    assert guesses.word([[('BABIES', 0.95)]]) == 'BABIES'
+
+
+def test_word_results_that_do_not_count():
+    guesses = verifier()
+    for result in (None, [[('BABY', 0.95)]], [[('BAB1ES', 0.95)]]) * 3:
+        assert guesses.word(result) is None
+    assert len(guesses.word_fusion.reads) == 0
@@ -0,0 +1,54 @@
+from drawing.hangman_game import HangmanGame
+from drawing.hangman_sim import letter_msg_size, run_script
+
+
+def test_letter_guesses():
+    game = HangmanGame('babies')
+    assert game.evaluate_guess('b') == (
+        'letter in word', ['B', 'B'], [0, 2], [1, 1])
+    assert game.word_status == ['B', '_', 'B', '_', '_', '_']
+    assert not game.is_new_guess('B')
+
+    assert game.evaluate_guess('x') == (
+        'wrong guess', ['X', '0'], [1, 0], [0, 2])
+    assert game.current_wrong_guesses == 1
+    assert not game.is_new_guess('X')
+
+
+def test_word_guesses():
+    game = HangmanGame('BABIES')
+    outcome, letters, positions, mode = game.evaluate_guess('LOVELY')
+    assert (outcome, letters, positions, mode) == (
+        'word incorrect', ['0'], [0], [2])
+
+    game.evaluate_guess('A')
+    outcome, letters, positions, mode = game.evaluate_guess('BABIES')
+    assert outcome == 'winning'
+    assert positions == [0, 2, 3, 4, 5]
+    assert game.check_word() and game.over
+
+
+def test_five_wrong_guesses_lose():
+    game = HangmanGame('BABIES')
+    for letter in 'QWRTY':
+        game.evaluate_guess(letter)
+    assert game.lost and game.over and not game.game_won
+
+
+def test_letter_msg_size():
+    # header, letters (count, length, 'A\0', pad), positions (count, one
+    # int64), mode (count, pad to 8, one int64), game_id (int64)
+    assert letter_msg_size(['A'], [1], [1]) == 4 + (4 + 4 + 2 + 2) \
+        + (4 + 8) + (4 + 4 + 8) + 8
+    # header, letters (count), positions (count), mode (count), game_id
+    # (pad to 8, int64)
+    assert letter_msg_size([], [], []) == 4 + 4 + 4 + 4 + (4 + 8)
+
+
+def test_scripted_games():
+    report = run_script(['BABIES B A I E S', 'BABIES Q W R T Y U',
+                         'BABIES B B BABIES'])
+    assert report['games'] == 3
+    assert report['won'] == 2
+    assert report['lost'] == 1
+    assert report['ignored_guesses'] == 1
@@ -0,0 +1,47 @@
+from drawing.hangman_sessions import SessionManager
+
+
+def test_games_are_separate():
+    sessions = SessionManager(lambda: 'BABIES')
+    assert sessions.play(1, 'B')[1][0] == 'letter in word'
+    assert sessions.play(2, 'X')[1][0] == 'wrong guess'
+    assert sessions.get(1).word_status[0] == 'B'
+    assert sessions.get(2).word_status[0] == '_'
+    assert sessions.get(2).current_wrong_guesses == 1
+    # the same guess twice is only played once
+    assert sessions.play(1, 'B')[1] is None
+
+
+def test_finished_games_are_evicted():
+    sessions = SessionManager(lambda: 'BABIES', finished_limit=2)
+    for game_id in range(3):
+        assert sessions.play(game_id, 'BABIES')[1][0] == 'winning'
+        # a finished game ignores further guesses
+        assert sessions.play(game_id, 'X')[1] is None
+    assert 0 not in sessions
+    assert 1 in sessions and 2 in sessions
+    assert sessions.evicted == 1
+
+
+def test_play_returns_the_game_it_finished():
+    sessions = SessionManager(lambda: 'BABIES', finished_limit=0)
+    game, result = sessions.play(1, 'BABIES')
+    assert result[0] == 'winning'
+    # evicted as soon as it ended, the played game is still reported
+    assert 1 not in sessions
+    assert game.game_won and game.word == 'BABIES'
+
+
+def test_least_recently_used_game_is_evicted():
+    evicted = []
+    sessions = SessionManager(
+        lambda: 'BABIES', max_sessions=2,
+        on_evict=lambda game_id, game: evicted.append(
+            (game_id, game.word_status[1])))
+    sessions.play(1, 'A')
+    sessions.play(2, 'A')
+    sessions.play(1, 'B')
+    sessions.play(3, 'A')
+    assert 2 not in sessions
+    assert 1 in sessions and 3 in sessions
+    assert evicted == [(2, 'A')]
@@ -0,0 +1,135 @@
+import uuid
+
+import numpy as np
+import pytest
+
+from drawing.image_channel import HEAD_SLOT, ImageChannel, PIN
+
+
+@pytest.fixture
+def channel():
+    name = f'test_channel_{uuid.uuid4().hex[:8]}'
+    writer = ImageChannel(name, create=True, slots=3, max_frames=2,
+                          frame_bytes=64 * 64 * 3)
+    reader = ImageChannel(name)
+    yield writer, reader
+    reader.close()
+    writer.close()
+
+
+def test_reader_gets_views_of_the_latest_frames(channel):
+    writer, reader = channel
+    assert reader.read() == (0, None)
+    gray = np.arange(32 * 48, dtype=np.uint8).reshape(32, 48)
+    color = np.full((16, 8, 3), 7, dtype=np.uint8)
+    assert writer.write([gray, color], stamp=12.5) == 1
+    seq, frames = reader.read()
+    assert seq == 1
+    assert reader.last_stamp == 12.5
+    np.testing.assert_array_equal(frames[0], gray)
+    np.testing.assert_array_equal(frames[1], color)
+    # the frames are views of the shared memory, not copies
+    assert not frames[0].flags.owndata and not frames[0].flags.writeable
+    # nothing new to read
+    assert reader.read() == (1, None)
+
+
+def test_latest_write_wins(channel):
+    writer, reader = channel
+    for value in range(5):
+        writer.write([np.full((4, 4), value, dtype=np.uint8)])
+    seq, frames = reader.read()
+    assert seq == 5 and frames[0][0, 0] == 4
+    assert reader.skipped == 4
+
+
+def test_pinned_frames_are_not_overwritten(channel):
+    writer, reader = channel
+    writer.write([np.full((4, 4), 1, dtype=np.uint8)])
+    _, frames = reader.read()
+    for value in range(2, 10):
+        writer.write([np.full((4, 4), value, dtype=np.uint8)])
+        assert (frames[0] == 1).all()
+    seq, frames = reader.read()
+    assert seq == 9 and (frames[0] == 9).all()
+
+
+def test_frames_must_fit(channel):
+    writer, _ = channel
+    with pytest.raises(ValueError):
+        writer.write([np.zeros((128, 128, 3), dtype=np.uint8)])
+    with pytest.raises(ValueError):
+        writer.write([np.zeros((4, 4), dtype=np.uint8)] * 3)
+
+
+def test_attach_before_the_writer():
+    with pytest.raises(FileNotFoundError):
+        ImageChannel(f'test_channel_{uuid.uuid4().hex[:8]}')
+
+
+def test_reader_notices_a_restarted_writer():
+    name = f'test_channel_{uuid.uuid4().hex[:8]}'
+    writer = ImageChannel(name, create=True, slots=3, frame_bytes=64)
+    reader = ImageChannel(name)
+    writer.write([np.full((4, 4), 1, dtype=np.uint8)])
+    assert reader.read()[0] == 1 and reader.alive
+    writer.close()
+    assert not reader.alive
+
+    writer = ImageChannel(name, create=True, slots=3, frame_bytes=64)
+    writer.write([np.full((4, 4), 2, dtype=np.uint8)])
+    # the old block is gone, attach to the new one
+    reader.close()
+    reader = ImageChannel(name)
+    seq, frames = reader.read()
+    assert seq == 1 and (frames[0] == 2).all()
+    reader.close()
+    writer.close()
+
+
+def test_replacing_a_stale_block_tells_its_reader():
+    name = f'test_channel_{uuid.uuid4().hex[:8]}'
+    crashed = ImageChannel(name, create=True, slots=3, frame_bytes=64)
+    reader = ImageChannel(name)
+    # a new writer takes over the block a crashed writer left behind
+    writer = ImageChannel(name, create=True, slots=3, frame_bytes=64)
+    assert not reader.alive and writer.alive
+    reader.close()
+    writer.close()
+    # unmap the block of the crashed writer without unlinking the new one
+    crashed.owner = False
+    crashed.close()
+
+
+class RacingHeader:
+    """A channel header that lets the writer write before each slot read."""
+
+    def __init__(self, header, writer):
+        self.header = header
+        self.writer = writer
+
+    def __getitem__(self, key):
+        if key == HEAD_SLOT:
+            self.writer.write([np.full((4, 4), 99, dtype=np.uint8)])
+        return self.header[key]
+
+    def __setitem__(self, key, value):
+        self.header[key] = value
+
+
+def test_a_read_that_gives_up_keeps_the_last_frames_pinned(channel):
+    writer, reader = channel
+    writer.write([np.full((4, 4), 1, dtype=np.uint8)])
+    _, frames = reader.read()
+    pinned = int(reader.header[PIN])
+    writer.write([np.full((4, 4), 2, dtype=np.uint8)])
+    header, reader.header = reader.header, RacingHeader(
+        reader.header, writer)
+    # the writer publishes again every time the reader looks for the head
+    assert reader.read() == (1, None)
+    reader.header = header
+    assert int(header[PIN]) == pinned
+    assert (frames[0] == 1).all()
+    for value in range(3, 10):
+        writer.write([np.full((4, 4), value, dtype=np.uint8)])
+        assert (frames[0] == 1).all()
@@ -0,0 +1,52 @@
+import string
+
+import cv2
+import numpy as np
+import pytest
+
+from drawing.letter_classifier import LetterClassifier, render_letter
+from drawing.letter_eval import evaluate
+
+
+@pytest.fixture(scope='module')
+def classifier():
+    return LetterClassifier.from_templates()
+
+
+def board_crop(letter, font=cv2.FONT_HERSHEY_DUPLEX):
+    # larger, off centre and light on dark, unlike the templates
+    image = render_letter(letter, font, 3, height=120)
+    image = cv2.copyMakeBorder(image, 10, 30, 40, 5, cv2.BORDER_CONSTANT,
+                               value=255)
+    return cv2.bitwise_not(image)
+
+
+def test_classifies_board_crops(classifier):
+    found = [classifier.classify(board_crop(letter))
+             for letter in string.ascii_uppercase]
+    assert [letter for letter, _ in found] == list(string.ascii_uppercase)
+    assert np.mean([confidence for _, confidence in found]) > 0.8
+
+
+def test_blank_crop_has_no_confidence(classifier):
+    blank = np.full((60, 60), 255, dtype=np.uint8)
+    assert classifier.classify(blank)[1] == 0.0
+
+
+def test_from_folder(tmp_path):
+    for letter in 'AB':
+        (tmp_path / letter).mkdir()
+        cv2.imwrite(str(tmp_path / letter / '0.png'), board_crop(letter))
+    (tmp_path / 'notes.txt').write_text('not a letter')
+    classifier = LetterClassifier.from_folder(str(tmp_path), k=1)
+    assert classifier.classify(board_crop('B'))[0] == 'B'
+    with pytest.raises(ValueError):
+        LetterClassifier.from_folder(str(tmp_path / 'A'))
+
+
+def test_evaluate_fast_path(classifier):
+    letters = list('HELLO')
+    report = evaluate([board_crop(letter) for letter in letters], letters,
+                      classifier, threshold=0.5)
+    assert report['fast']['accuracy'] == 1.0
+    assert 'paddle' not in report
@@ -0,0 +1,67 @@
+import pytest
+
+from drawing.letter_voting import LetterVoter, readings_needed
+
+
+def test_readings_needed():
+    assert readings_needed(0.01, 0.1) == 2
+    assert readings_needed(0.001, 0.1) == 3
+    assert readings_needed(0.01, 0.0) == 1
+
+
+def test_steady_letter_confirmed_at_target_latency():
+    voter = LetterVoter.from_targets(period=0.5, target_latency=1.0)
+    assert voter.readings_needed == 3
+    assert voter.add('a', 0.8, 0.0) is None
+    assert voter.add('a', 0.8, 0.5) is None
+    assert voter.add('a', 0.8, 1.0) == 'A'
+    # the evidence is used up by the confirmation
+    assert len(voter) == 0
+
+
+def test_letter_read_with_gaps_is_confirmed():
+    voter = LetterVoter.from_targets(period=0.5, target_latency=2.0)
+    assert voter.readings_needed == 5
+    # dropped readings and a misread between the readings of the letter
+    readings = [(0.0, 'K'), (1.0, 'K'), (1.5, 'K'), (2.0, 'X'), (3.0, 'K')]
+    for stamp, letter in readings:
+        assert voter.add(letter, 0.8, stamp) is None
+    assert voter.add('K', 0.8, 4.0) == 'K'
+
+
+def test_old_readings_expire():
+    voter = LetterVoter.from_targets(period=0.5, target_latency=1.0)
+    voter.add('B', 0.8, 0.0)
+    voter.add('B', 0.8, 0.5)
+    # a stale partial vote does not help much later
+    assert voter.add('B', 0.8, 10.0) is None
+    assert voter.evidence(10.0)[1] == pytest.approx(0.8)
+
+
+def test_misreads_do_not_confirm():
+    voter = LetterVoter.from_targets(period=0.5, target_latency=1.0)
+    letters = [voter.add(letter, 0.9, 0.5 * i)
+               for i, letter in enumerate('CDEFGH')]
+    assert letters == [None] * 6
+
+
+def test_ring_buffer_wraps():
+    voter = LetterVoter(threshold=100.0, half_life=1.0, window=1.0,
+                        capacity=4)
+    for i in range(10):
+        voter.add('E', 1.0, float(i))
+    assert len(voter) == 4
+    assert voter.evidence(9.0)[4] == pytest.approx(1.5)
+
+
+def test_late_readings_count_no_more_than_fresh_ones():
+    voter = LetterVoter(threshold=100.0, half_life=1.0, window=10.0)
+    voter.add('E', 1.0, 5.0)
+    # a reading stamped before the one already added
+    voter.add('E', 1.0, 3.0)
+    assert voter.evidence(3.0)[4] == pytest.approx(2.0)
+
+
+def test_rejects_non_letters():
+    with pytest.raises(ValueError):
+        LetterVoter(1.0, 1.0, 1.0).add('7', 0.9, 0.0)
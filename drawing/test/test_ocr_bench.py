@@ -0,0 +1,47 @@
+import numpy as np
+
+from drawing.board_preprocess import PreprocessParams
+from drawing.board_slots import SlotCropper
+from drawing.letter_classifier import LetterClassifier
+from drawing.ocr_bench import benchmark, Pipeline
+
+from test_board_preprocess import whiteboard_frame
+
+
+BLANK = np.full((480, 640, 3), 60, dtype=np.uint8)
+
+
+class FixedPipeline(Pipeline):
+    """Takes 2 ms to warp a board, and 1 ms to find there is none."""
+
+    def run(self, frame, stamp):
+        if frame is BLANK:
+            return {'resize': 0.001}, None, []
+        return {'resize': 0.001, 'warp': 0.002}, ('A', ''), []
+
+
+def test_frames_without_a_board_are_left_out_of_the_stages():
+    frames = [('0.png', whiteboard_frame()), ('1.png', BLANK),
+              ('2.png', BLANK), ('3.png', whiteboard_frame())]
+    report = benchmark(frames, {}, FixedPipeline(PreprocessParams()))
+    assert report['frames'] == 4
+    assert report['boards_found'] == 2
+    assert report['stage_ms']['warp'] == 2.0
+    assert report['stage_ms']['resize'] == 1.0
+    assert report['accuracy'] is None
+
+
+def test_letters_are_read_from_the_frames():
+    pipeline = Pipeline(
+        PreprocessParams(), classifier=LetterClassifier.from_templates(),
+        fast_confidence=0.5, period=0.5,
+        slots=SlotCropper(((0.0, 0.0, 1.0, 1.0), (0.0, 0.0, 1.0, 1.0))))
+    frames = [(f'{i}.png', BLANK if i % 2 else whiteboard_frame())
+              for i in range(6)]
+    labels = {name: 'A' for name, frame in frames if frame is not BLANK}
+    report = benchmark(frames, labels, pipeline, period=0.5)
+    assert report['boards_found'] == 3
+    assert report['accuracy'] == 1.0
+    # only the letter slot has ink narrow enough for its path
+    assert report['crops_recognized'] == 3
+    assert report['stage_ms']['recognition'] > 0.0
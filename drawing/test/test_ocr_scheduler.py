@@ -0,0 +1,101 @@
+import cv2
+import numpy as np
+import pytest
+
+from drawing.frame_change import frame_key, frames_changed
+from drawing.letter_voting import LetterVoter
+from drawing.ocr_scheduler import OcrScheduler
+
+
+def run_until(scheduler, start, stop, step=0.05):
+    """Tick the scheduler and return the times of the runs."""
+    runs = []
+    now = start
+    while now < stop:
+        if scheduler.due(now):
+            scheduler.ran(now)
+            runs.append(now)
+        now = round(now + step, 6)
+    return runs
+
+
+def test_idle_rate_without_activity():
+    scheduler = OcrScheduler(idle_rate=0.5, burst_rate=4.0)
+    assert len(run_until(scheduler, 0.0, 10.0)) == 5
+
+
+def test_activity_bursts_then_settles():
+    scheduler = OcrScheduler(idle_rate=0.5, burst_rate=4.0, burst_time=2.0)
+    scheduler.ran(0.0)
+    scheduler.activity(0.5)
+    # the burst starts at once instead of after the idle period
+    assert scheduler.due(0.5)
+    assert scheduler.rate(0.5) == 4.0
+    runs = run_until(scheduler, 0.5, 2.5)
+    assert len(runs) == 8
+    assert scheduler.rate(3.0) == 0.5
+
+
+def written(letter):
+    # a whole 300x420 board crop with a letter at the guess spot
+    frame = np.full((300, 420), 235, dtype=np.uint8)
+    cv2.putText(frame, letter, (150, 250), cv2.FONT_HERSHEY_SIMPLEX, 1.0,
+                30, 3)
+    return frame
+
+
+def test_one_letter_change_starts_a_burst():
+    scheduler = OcrScheduler(idle_rate=0.5, burst_rate=4.0)
+    scheduler.ran(0.0)
+    rng = np.random.default_rng(0)
+    last_keys = [frame_key(written('O'))]
+    noisy = np.clip(written('O') + rng.normal(0, 4, (300, 420)), 0, 255)
+    assert not frames_changed([frame_key(noisy.astype(np.uint8))],
+                              last_keys, 8)
+    # the tail of the Q is enough to burst
+    if frames_changed([frame_key(written('Q'))], last_keys, 8):
+        scheduler.activity(0.5)
+    assert scheduler.bursting(0.5) and scheduler.due(0.5)
+
+
+def test_published_backs_off():
+    scheduler = OcrScheduler(idle_rate=0.5, burst_rate=4.0, backoff_time=3.0)
+    scheduler.activity(0.0)
+    scheduler.published(1.0)
+    assert not scheduler.bursting(1.0)
+    # activity while the robot writes is ignored
+    scheduler.activity(2.0)
+    assert scheduler.rate(2.0) == 0.5
+    scheduler.activity(4.5)
+    assert scheduler.rate(4.5) == 4.0
+
+
+def test_budget_caps_burst_rate():
+    scheduler = OcrScheduler(idle_rate=0.5, burst_rate=4.0, budget=0.5)
+    scheduler.ran(0.0, cost=0.5)
+    scheduler.activity(0.0)
+    assert scheduler.rate(0.0) == 1.0
+    assert scheduler.load(0.0) == pytest.approx(0.5)
+    # never slower than idle
+    scheduler.add_cost(100.0)
+    assert scheduler.rate(0.0) == 0.5
+
+
+def test_letter_is_confirmed_at_the_capped_rate():
+    # a run costs 1 s, so the budget allows one run every 2 s in a burst
+    scheduler = OcrScheduler(idle_rate=0.25, burst_rate=2.0, budget=0.5,
+                             burst_time=30.0)
+    scheduler.add_cost(1.0)
+    scheduler.activity(0.0)
+    runs = run_until(scheduler, 0.0, 12.0)
+    assert runs == [0.0, 2.0, 4.0, 6.0, 8.0, 10.0]
+
+    # tuned for the burst rate, too few readings fit in the window
+    voter = LetterVoter.from_targets(1.0 / scheduler.burst_rate, 2.0)
+    assert [voter.add('A', 0.9, now) for now in runs] == [None] * len(runs)
+
+    voter.reset()
+    assert voter.retune(1.0 / scheduler.capped_rate())
+    confirmed = [voter.add('A', 0.9, now) for now in runs]
+    assert confirmed.index('A') == voter.readings_needed - 1
+    assert voter.expected_latency <= 4.0
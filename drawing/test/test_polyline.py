@@ -0,0 +1,19 @@
+from drawing.polyline import rdp_mask, simplify_board_points
+
+import numpy as np
+
+
+def test_collinear_points_removed():
+    points = np.array([[0.0, 0.0], [1.0, 0.0], [2.0, 0.0], [3.0, 1.0]])
+    assert list(rdp_mask(points, 0.01)) == [True, False, True, True]
+
+
+def test_pen_changes_are_kept():
+    x = [0.0, 1.0, 2.0, 2.0, 5.0, 5.0, 6.0, 7.0]
+    y = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+    onboard = [True, True, True, False, False, True, True, True]
+    x, y, onboard, removed = simplify_board_points(x, y, onboard, 0.001)
+
+    assert removed == 2
+    assert x.tolist() == [0.0, 2.0, 2.0, 5.0, 5.0, 7.0]
+    assert onboard.tolist() == [True, True, False, False, True, True]
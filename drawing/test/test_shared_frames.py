@@ -0,0 +1,53 @@
+import multiprocessing
+
+import numpy as np
+
+from drawing.shared_frames import SharedFrameSlot
+
+
+def test_read_returns_latest_frames():
+    slot = SharedFrameSlot(multiprocessing.Lock(), max_frames=2,
+                           frame_bytes=64 * 64 * 3)
+    try:
+        gray = np.arange(32 * 48, dtype=np.uint8).reshape(32, 48)
+        color = np.full((16, 8, 3), 7, dtype=np.uint8)
+        assert slot.write([gray, color]) == 1
+        seq, frames = slot.read()
+        assert seq == 1
+        np.testing.assert_array_equal(frames[0], gray)
+        np.testing.assert_array_equal(frames[1], color)
+        # nothing new to read
+        assert slot.read(seq) == (1, None)
+    finally:
+        slot.close()
+
+
+def test_unread_frames_are_dropped():
+    slot = SharedFrameSlot(multiprocessing.Lock(), max_frames=1,
+                           frame_bytes=16)
+    try:
+        for value in range(3):
+            slot.write([np.full((4, 4), value, dtype=np.uint8)])
+        assert slot.dropped == 2
+        assert slot.pending
+        seq, frames = slot.read()
+        assert seq == 3 and frames[0][0, 0] == 2
+        assert not slot.pending
+        slot.write([np.zeros((4, 4), dtype=np.uint8)])
+        assert slot.dropped == 2
+    finally:
+        slot.close()
+
+
+def test_attach_by_name():
+    lock = multiprocessing.Lock()
+    slot = SharedFrameSlot(lock, max_frames=1, frame_bytes=16)
+    other = SharedFrameSlot(lock, max_frames=1, frame_bytes=16,
+                            name=slot.name)
+    try:
+        slot.write([np.ones((2, 2), dtype=np.uint8)])
+        seq, frames = other.read()
+        assert seq == 1 and frames[0].sum() == 4
+    finally:
+        other.close()
+        slot.close()
@@ -0,0 +1,48 @@
+from drawing.stroke_order import order_paths, reverse_strokes, travel_length
+
+import numpy as np
+import time
+
+
+def test_zig_zag_is_untangled():
+    # four dashes along a line, given out of order and some backwards
+    starts = np.array([[0.3, 0.0], [0.0, 0.0], [0.29, 0.0], [0.1, 0.0]])
+    ends = np.array([[0.4, 0.0], [0.09, 0.0], [0.2, 0.0], [0.19, 0.0]])
+    order, reverse = order_paths(starts, ends)
+
+    before = travel_length(starts, ends, range(4), [False] * 4)
+    after = travel_length(starts, ends, order, reverse)
+    assert after < before
+    assert after < 0.05
+
+
+def test_deterministic_and_fast():
+    rng = np.random.default_rng(0)
+    starts = rng.uniform(0, 0.5, (50, 2))
+    ends = starts + rng.uniform(-0.05, 0.05, (50, 2))
+
+    start_time = time.perf_counter()
+    first = order_paths(starts, ends)
+    elapsed = time.perf_counter() - start_time
+    assert first == order_paths(starts, ends)
+    assert sorted(first[0]) == list(range(50))
+    assert elapsed < 1.0
+
+
+def test_reverse_strokes():
+    x = [0.0, 1.0, 1.0, 2.0, 2.0, 3.0]
+    y = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+    onboard = [True, True, False, False, True, True]
+    x, y, onboard = reverse_strokes(x, y, onboard)
+    assert x.tolist() == [3.0, 2.0, 2.0, 1.0, 1.0, 0.0]
+    assert onboard.tolist() == [True, True, False, False, True, True]
+
+
+def test_never_longer_than_given_order():
+    # the greedy tour and 2-opt end up longer than the given order
+    starts = np.array([[7.0, 8.0], [4.0, 7.0], [2.0, 4.0], [9.0, 3.0]])
+    ends = np.array([[0.0, 7.0], [3.0, 4.0], [9.0, 3.0], [2.0, 2.0]])
+    order, reverse = order_paths(starts, ends)
+
+    given = travel_length(starts, ends, range(4), [False] * 4)
+    assert travel_length(starts, ends, order, reverse) <= given
@@ -0,0 +1,38 @@
+from drawing.word_fusion import WordFusion
+from drawing.words import build_word_index, WordIndex
+
+
+def test_two_clean_reads_confirm():
+    fusion = WordFusion()
+    assert fusion.add('babies', 0.95) is None
+    assert fusion.add('BABIES', 0.95) == 'BABIES'
+    assert len(fusion.reads) == 0
+
+
+def test_one_misread_character_does_not_reset():
+    fusion = WordFusion()
+    assert fusion.add('BABIES', 0.9) is None
+    assert fusion.add('BAPIES', 0.9) is None
+    # only the third position is still unsure
+    assert fusion.add('BABIES', 0.9) == 'BABIES'
+
+
+def test_wrong_length_is_ignored():
+    fusion = WordFusion()
+    assert fusion.add('BABY', 0.99) is None
+    assert fusion.add('BAB1ES', 0.99) is None
+    assert len(fusion.reads) == 0
+
+
+def test_snap_to_dictionary(tmp_path):
+    build_word_index(['babies', 'garden', 'pencil'], str(tmp_path))
+    words = WordIndex(str(tmp_path))
+    plain = WordFusion()
+    fusion = WordFusion(words=words)
+    for read in ('GARDEM', 'GARDEN'):
+        assert plain.add(read, 0.9) is None
+    assert fusion.add('GARDEM', 0.9) is None
+    assert fusion.add('GARDEN', 0.9) == 'GARDEN'
+    # too far from every word to snap
+    fusion.add('XYZZYQ', 0.9)
+    assert fusion.add('XYZZYW', 0.9) is None
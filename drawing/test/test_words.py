@@ -0,0 +1,48 @@
+from drawing.words import build_word_index, WordIndex
+
+import os
+import random
+
+
+DATA = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+
+def test_length_buckets(tmp_path):
+    count = build_word_index(
+        ['babies', 'cat', 'dog', 'Lovely', "don't", 'cat'], str(tmp_path))
+    words = WordIndex(str(tmp_path))
+
+    assert count == 4
+    assert words.count(3) == 2
+    assert words.count(6) == 2
+    assert words.count(9) == 0
+    assert [words.word(3, i) for i in range(2)] == ['CAT', 'DOG']
+    assert words.letters(6).shape == (2, 6)
+
+
+def test_random_word_covers_bucket(tmp_path):
+    build_word_index(['babies', 'lovely', 'cat'], str(tmp_path))
+    words = WordIndex(str(tmp_path))
+    rng = random.Random(0)
+    picked = {words.random_word(6, rng) for _ in range(50)}
+    assert picked == {'BABIES', 'LOVELY'}
+
+
+def test_packaged_dictionary():
+    words = WordIndex(DATA)
+    assert words.count(6) > 500
+    assert len(words.random_word(6)) == 6
+
+
+def test_pattern_query(tmp_path):
+    build_word_index(['babies', 'bobbed', 'rubber', 'barber', 'babble'],
+                     str(tmp_path))
+    words = WordIndex(str(tmp_path))
+
+    assert words.query('B_B_E_') == ['BABIES', 'BOBBED']
+    assert words.query('B_B_E_', excluded='D') == ['BABIES']
+    assert words.query('______', excluded='AIO') == ['RUBBER']
+    assert words.query('____') == []
+    # a revealed B is at every position of a B in the word
+    assert words.query('B_B_E_', revealed=True) == ['BABIES']
+    assert words.query('______', revealed=True) == words.query('______')